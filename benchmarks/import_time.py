@@ -0,0 +1,101 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Import-time benchmark
+
+Measures the time of importing bennchplot in fresh interpreters, as reported
+by `python -X importtime`, and checks which heavy modules are loaded. Exits
+with status 1 if `import bennchplot` exceeds the time limit or loads any of
+the heavy modules, or if constructing a `Plot` from the microcircuit example
+loads the plotting libraries.
+
+    python benchmarks/import_time.py [--repeat N] [--limit SECONDS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must not be loaded by `import bennchplot`
+HEAVY = ['pandas', 'matplotlib', 'matplotlib.pyplot', 'tol_colors', 'yaml']
+
+# modules that must not be loaded by constructing a `Plot`, i.e. before
+# anything is plotted
+PLOTTING = ['matplotlib', 'matplotlib.pyplot', 'tol_colors']
+
+EXAMPLE = os.path.join(ROOT, 'examples', 'microcircuit',
+                       '8d196bc5-b5f5-448b-8571-bf695ed64d4a.csv')
+
+# statements with the modules they must not load
+STATEMENTS = {
+    'import bennchplot': ('import bennchplot', HEAVY),
+    'from bennchplot import Plot': ('from bennchplot import Plot', []),
+    'Plot(...)': ('from bennchplot import Plot\n'
+                  f'Plot(x_axis=["num_nvp"], data_file={EXAMPLE!r})',
+                  PLOTTING),
+}
+
+
+def measure(statement):
+    """
+    Import time in seconds and loaded heavy modules of a statement.
+    """
+    modules = list(dict.fromkeys(HEAVY + PLOTTING))
+    code = (f'{statement}\nimport sys\n'
+            f'print(",".join(m for m in {modules!r} if m in sys.modules))')
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, env=env,
+                          check=True)
+    total = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, where
+        # nested imports are indented
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].startswith(' bennchplot'):
+            total += int(fields[1])
+    loaded = [m for m in proc.stdout.strip().split(',') if m]
+    return total * 1e-6, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import-time benchmark')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of fresh interpreters per statement')
+    parser.add_argument('--limit', type=float, default=0.05,
+                        help='time limit of `import bennchplot` in seconds')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, (statement, forbidden) in STATEMENTS.items():
+        results = [measure(statement) for _ in range(args.repeat)]
+        median = statistics.median(t for t, _ in results)
+        loaded = results[-1][1]
+        print(f'{name:32s} {median * 1e3:8.1f} ms  '
+              f'loaded: {", ".join(loaded) or "-"}')
+        if statement == 'import bennchplot':
+            failed |= median > args.limit
+        failed |= any(m in loaded for m in forbidden)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
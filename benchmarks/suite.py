@@ -0,0 +1,317 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Benchmark suite of beNNch-plot's hot paths
+
+Runs every benchmark on synthetic result files (see `synthetic`), measuring
+wall-clock time over several repeats and peak Python memory (tracemalloc,
+which includes numpy and pandas buffers) in a separate run. Results are
+stored as JSON named after the current commit, such that runs on different
+commits can be compared:
+
+    python benchmarks/suite.py --size medium
+    python benchmarks/suite.py --compare results/old.json results/new.json
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+import numpy as np
+matplotlib.use('Agg')
+from matplotlib.figure import Figure  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from bennchplot import Plot  # noqa: E402
+from bennchplot import (confidence, loader, planner, robust,  # noqa: E402
+                        schema)
+import synthetic  # noqa: E402
+
+SIZES = {
+    'small': {'configurations': 8, 'repetitions': 3, 'files': 1,
+              'extra_columns': 0, 'ranks_per_node': 4},
+    'medium': {'configurations': 64, 'repetitions': 10, 'files': 8,
+               'extra_columns': 10, 'ranks_per_node': 32},
+    'large': {'configurations': 512, 'repetitions': 20, 'files': 32,
+              'extra_columns': 50, 'ranks_per_node': 128},
+}
+
+# per-rank data cover at most this many configurations (1, 2, ... nodes)
+MAX_RANK_CONFIGURATIONS = 32
+
+BENCHMARKS = {}
+
+
+def benchmark(setup):
+    """
+    Register a benchmark.
+
+    The decorated function receives a dictionary with the paths of the
+    result files (`files`) and of the per-rank timer dumps (`rank_files`),
+    does any preparation that is not to be measured and returns the
+    function to be timed.
+    """
+    BENCHMARKS[setup.__name__] = setup
+    return setup
+
+
+@benchmark
+def parse(data):
+    kwargs = schema.read_csv_kwargs(schema.select_columns())
+    return lambda: loader.read_data_files(data['files'], **kwargs)
+
+
+@benchmark
+def aggregate(data):
+    columns = schema.select_columns()
+    df = loader.read_data_files(data['files'],
+                                **schema.read_csv_kwargs(columns))
+    return lambda: schema.aggregate(schema.normalize(df, columns), columns)
+
+
+@benchmark
+def aggregate_robust(data):
+    columns = schema.select_columns()
+    df = schema.normalize(loader.read_data_files(
+        data['files'], **schema.read_csv_kwargs(columns)), columns)
+    return lambda: robust.aggregate(df, columns, method='iqr')
+
+
+@benchmark
+def load_data(data):
+    return lambda: Plot('num_nodes', data_file=data['files'])
+
+
+@benchmark
+def load_data_compact(data):
+    return lambda: Plot('num_nodes', data_file=data['files'], compact=True)
+
+
+@benchmark
+def derived_quantities(data):
+    B = Plot('num_nodes', data_file=data['files'])
+
+    def run():
+        B.invalidate_derived()
+        B.compute_derived_quantities()
+    return run
+
+
+@benchmark
+def confidence_intervals(data):
+    B = Plot('num_nodes', data_file=data['files'])
+    # intervals of derived quantities must not depend on whether they were
+    # materialized in df before
+    names = ['sim_factor', 'frac_phase_update']
+    before = confidence.confidence_intervals(B, names, seed=0)
+    for name in names + ['time_phase_total']:
+        B.get_quantity(name)
+    after = confidence.confidence_intervals(B, names, seed=0)
+    for name in names:
+        if not np.allclose(np.subtract(*before[name]),
+                           np.subtract(*after[name]), equal_nan=True):
+            raise RuntimeError(f'Confidence intervals of {name} change '
+                               'when it is materialized.')
+
+    def run():
+        B.invalidate_derived()
+        B.compute_confidence_intervals(['time_simulate', 'sim_factor',
+                                        'phase_total_factor'])
+    return run
+
+
+def _render(B, draw):
+    fig = Figure()
+    draw(B, fig.add_subplot())
+    fig.savefig(io.BytesIO(), format='png')
+
+
+@benchmark
+def plot_main(data):
+    B = Plot('num_nodes', data_file=data['files'])
+    return lambda: _render(B, lambda B, ax: B.plot_main(
+        ['sim_factor', 'phase_total_factor'], ax, error=True))
+
+
+@benchmark
+def plot_fractions(data):
+    B = Plot('num_nodes', data_file=data['files'])
+    return lambda: _render(B, lambda B, ax: B.plot_fractions(
+        ax, ['frac_phase_update', 'frac_phase_deliver',
+             'frac_phase_communicate', 'frac_phase_collocate'], error=True))
+
+
+@benchmark
+def scaling_model(data):
+    B = Plot('num_nodes', data_file=data['files'])
+    return lambda: planner.ScalingModel(B)
+
+
+@benchmark
+def rank_imbalance(data):
+    B = Plot('num_nodes', data_file=data['files'])
+    return lambda: B.load_rank_data(data['rank_files'])
+
+
+def measure(setup, data, repeat):
+    """
+    Time and peak memory of a benchmark.
+    """
+    run = setup(data)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    run = setup(data)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time_min': min(times), 'time_median': statistics.median(times),
+            'peak_memory': peak}
+
+
+def commit():
+    """
+    Short hash of the checked out commit, marked if the tree is modified.
+    """
+    def git(*args):
+        return subprocess.run(['git', '-C', HERE, *args], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    try:
+        rev = git('rev-parse', '--short', 'HEAD')
+        dirty = git('status', '--porcelain', '--untracked-files=no')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return rev + ('-dirty' if dirty else '')
+
+
+def run(params, repeat, selected=None):
+    """
+    Run the benchmarks on synthetic data of the given size.
+
+    Returns
+    -------
+    report : dict
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        sizes = {k: v for k, v in params.items() if k != 'ranks_per_node'}
+        data = {
+            # per-rank data match the configurations of the result files
+            'files': synthetic.write(directory,
+                                     tasks_per_node=params['ranks_per_node'],
+                                     **sizes),
+            'rank_files': synthetic.write_ranks(
+                os.path.join(directory, 'ranks'),
+                configurations=min(params['configurations'],
+                                   MAX_RANK_CONFIGURATIONS),
+                repetitions=params['repetitions'],
+                ranks_per_node=params['ranks_per_node']),
+        }
+        for name, setup in BENCHMARKS.items():
+            if selected and name not in selected:
+                continue
+            results[name] = measure(setup, data, repeat)
+            print(f'{name:24s} {results[name]["time_median"] * 1e3:10.1f} ms'
+                  f' {results[name]["peak_memory"] / 2**20:10.1f} MiB')
+    return {'commit': commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'params': params,
+            'repeat': repeat,
+            'results': results}
+
+
+def compare(old_file, new_file):
+    """
+    Print the ratios of times and peak memory of two reports.
+    """
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    if old['params'] != new['params']:
+        print('Warning: reports were created with different data sizes.')
+    print(f'{"":24s} {old["commit"]:>12s} {new["commit"]:>12s} {"ratio":>7s}')
+    for name, result in new['results'].items():
+        if name not in old['results']:
+            continue
+        before = old['results'][name]
+        for key, unit, scale in [('time_median', 'ms', 1e3),
+                                 ('peak_memory', 'MiB', 2.**-20)]:
+            print(f'{name + " " + unit:24s} {before[key] * scale:12.1f} '
+                  f'{result[key] * scale:12.1f} '
+                  f'{result[key] / before[key]:7.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark suite of beNNch-plot's hot paths")
+    parser.add_argument('--size', choices=SIZES, default='small',
+                        help='preset size of the synthetic data')
+    for key in SIZES['small']:
+        parser.add_argument('--' + key.replace('_', '-'), type=int,
+                            help=f'override the {key} of the preset size')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed runs per benchmark')
+    parser.add_argument('--benchmark', action='append',
+                        choices=list(BENCHMARKS),
+                        help='run only the given benchmark(s)')
+    parser.add_argument('--output-dir', default=os.path.join(HERE, 'results'),
+                        help='directory of the JSON reports')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two reports instead of running')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    params = dict(SIZES[args.size])
+    for key in params:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    report = run(params, args.repeat, args.benchmark)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir,
+                        f'{report["commit"]}-{args.size}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Generators of synthetic beNNch result files
+
+The files have the columns written by beNNch for NEST 3 (see the files in
+`examples`). Configurations differ in the number of nodes; times decrease
+with the number of nodes following Amdahl's law with multiplicative noise
+between repetitions.
+"""
+import os
+import uuid as uuid_
+
+import numpy as np
+import pandas as pd
+
+PHASES = {'wall_time_phase_update': 0.45, 'wall_time_phase_deliver': 0.35,
+          'wall_time_phase_communicate': 0.15,
+          'wall_time_phase_collocate': 0.05}
+
+TIMERS = ['wall_time_create', 'wall_time_connect',
+          'wall_time_communicate_target_data', 'wall_time_gather_spike_data',
+          'wall_time_gather_target_data', 'wall_time_communicate_prepare',
+          'py_time_network', 'py_time_simulate', 'py_time_presimulate',
+          'py_time_create', 'py_time_connect']
+
+MEMORY = ['base_memory', 'network_memory', 'init_memory', 'total_memory']
+
+COUNTERS = ['num_connections', 'local_spike_counter', 'e_counter']
+
+
+def generate(configurations=16, repetitions=5, extra_columns=0,
+             tasks_per_node=2, seed=0):
+    """
+    Synthetic raw benchmark data.
+
+    Attributes
+    ----------
+    configurations : int
+        number of configurations, with 1, 2, ... nodes
+    repetitions : int
+        number of repetitions per configuration
+    extra_columns : int
+        number of additional timer columns unknown to `schema`, which are
+        to be skipped when parsing
+    tasks_per_node : int
+        number of MPI processes per node
+    seed : int
+        seed of the random number generator
+
+    Returns
+    -------
+    df : pandas.DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    n = configurations * repetitions
+    nodes = np.repeat(np.arange(1, configurations + 1), repetitions)
+
+    def noisy(values):
+        return values * rng.lognormal(0., 0.05, n)
+
+    columns = {
+        'rng_seed': rng.integers(1, 1000, n),
+        'num_nodes': nodes,
+        'threads_per_task': np.full(n, 8),
+        'tasks_per_node': np.full(n, tasks_per_node),
+        'model_time_sim': np.full(n, 1000.),
+    }
+    sim = noisy(20. * (0.05 + 0.95 / nodes))
+    columns['wall_time_sim'] = sim
+    for phase, fraction in PHASES.items():
+        columns[phase] = noisy(sim * fraction)
+    for timer in TIMERS:
+        columns[timer] = noisy(np.full(n, 5.) / nodes)
+    for k in range(extra_columns):
+        columns[f'wall_time_extra_{k}'] = noisy(np.ones(n))
+    for memory in MEMORY:
+        columns[memory] = noisy(1.6e7 / nodes)
+    for counter in COUNTERS:
+        columns[counter] = np.round(noisy(np.full(n, 3e8)))
+    return pd.DataFrame(columns)
+
+
+def generate_ranks(configurations=8, repetitions=3, ranks_per_node=16,
+                   seed=0):
+    """
+    Synthetic per-rank timer dumps, see `bennchplot.imbalance`.
+
+    Every rank has a random load factor, such that the imbalance ratio
+    grows with the number of ranks.
+
+    Attributes
+    ----------
+    configurations : int
+        number of configurations, with 1, 2, ... nodes
+    repetitions : int
+        number of repetitions per configuration
+    ranks_per_node : int
+        number of MPI ranks per node
+    seed : int
+        seed of the random number generator
+
+    Returns
+    -------
+    df : pandas.DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    nodes = np.arange(1, configurations + 1)
+    ranks = nodes * ranks_per_node
+    # one block of rows per configuration and repetition
+    block_nodes = np.repeat(nodes, repetitions)
+    block_ranks = np.repeat(ranks, repetitions)
+    n = block_ranks.sum()
+    row_nodes = np.repeat(block_nodes, block_ranks)
+    starts = np.cumsum(block_ranks) - block_ranks
+    rank = np.arange(n) - np.repeat(starts, block_ranks)
+    seeds = np.repeat(np.tile(np.arange(repetitions), configurations),
+                      block_ranks)
+
+    columns = {
+        'rng_seed': seeds,
+        'num_nodes': row_nodes,
+        'threads_per_task': np.full(n, 8),
+        'tasks_per_node': np.full(n, ranks_per_node),
+        'model_time_sim': np.full(n, 1000.),
+        'rank': rank,
+    }
+    load = rng.lognormal(0., 0.1, n)
+    sim = 20. * (0.05 + 0.95 / row_nodes)
+    for phase, fraction in PHASES.items():
+        columns[phase] = sim * fraction * load * rng.lognormal(0., 0.02, n)
+    return pd.DataFrame(columns)
+
+
+def write(directory, files=1, **kwargs):
+    """
+    Write synthetic result files, named by UUID as done by beNNch.
+
+    Every file holds the same configurations with different noise.
+
+    Attributes
+    ----------
+    directory : str
+        output directory, created if necessary
+    files : int
+        number of files
+    kwargs
+        passed to `generate`
+
+    Returns
+    -------
+    paths : list
+        paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    seed = kwargs.pop('seed', 0)
+    paths = []
+    for k in range(files):
+        path = os.path.join(directory, f'{uuid_.UUID(int=seed + k)}.csv')
+        generate(seed=seed + k, **kwargs).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def write_ranks(directory, **kwargs):
+    """
+    Write a synthetic per-rank timer dump.
+
+    Attributes
+    ----------
+    directory : str
+        output directory, created if necessary
+    kwargs
+        passed to `generate_ranks`
+
+    Returns
+    -------
+    paths : list
+        paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'ranks.csv')
+    generate_ranks(**kwargs).to_csv(path, index=False)
+    return [path]
@@ -16,7 +16,30 @@ SPDX-License-Identifier: GPL-3.0-or-later
 """
 # __init__.py
 
+import importlib
+
 # Version of the benchplot package
 __version__ = "0.1"
 
-from .bennchplot import Plot
+# Public names and the modules defining them. Modules are imported on first
+# access, such that `import bennchplot` does not load pandas or matplotlib.
+_LAZY = {
+    'Plot': ('.bennchplot', 'Plot'),
+    'register_derived': ('.derived', 'register'),
+    'ResultStore': ('.store', 'ResultStore'),
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module, attr = _LAZY[name]
+        value = getattr(importlib.import_module(module, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -18,17 +18,41 @@ SPDX-License-Identifier: GPL-3.0-or-later
 """
 Class for benchmarking plots
 """
-import pandas as pd
-import matplotlib
-from matplotlib import pyplot as plt
-from matplotlib import gridspec
 import numpy as np
-import yaml
-import os
+import pandas as pd
+import time
 try:
     from . import plot_params as pp
+    from . import loader
+    from . import cache as cache_
+    from . import schema
+    from . import derived
+    from . import online
+    from . import scaling
+    from . import confidence
+    from . import imbalance
+    from . import columnar
+    from . import dashboard
+    from . import metadata as metadata_
+    from . import robust
+    from . import timers
+    from . import planner
 except ImportError:
     import plot_params as pp
+    import loader
+    import cache as cache_
+    import schema
+    import derived
+    import online
+    import scaling
+    import confidence
+    import imbalance
+    import columnar
+    import dashboard
+    import metadata as metadata_
+    import robust
+    import timers
+    import planner
 
 
 class Plot():
@@ -41,30 +65,105 @@ class Plot():
         variable to be plotted on x-axis
     x_ticks : str, optional
 
-    data_file : str, optional
-        path to data
+    data_file : str or list, optional
+        path to data; a single csv file, a directory of beNNch result
+        files, a glob pattern or a list of any of those
     matplotlib_params : dict, optional
         parameters passed to matplotlib
     color_params : dict, optional
-        unique colors for variables
+        unique colors for variables, `plot_params.color_params` if not given
     additional_params : dict, optional
         additional parameters used for plotting
     label_params : dict, optional
         labels used when plotting
     time_scaling : int, optional
         scaling parameter for simulation time
+    df : pandas.DataFrame, optional
+        raw benchmark data, used instead of reading data_file
+    detailed_timers : bool, optional
+        whether to aggregate the timers of the individual update phases
+    quantities : list, optional
+        quantities to be loaded and aggregated, given by their canonical
+        names in `schema.SCHEMA` or by the names of derived quantities,
+        which are resolved to the measured quantities they depend on; all
+        known quantities if not given. Restricting the quantities reduces
+        parse time and memory.
+    max_workers : int, optional
+        number of workers used to read multiple data files concurrently
+    cache : str or cache.FrameCache, optional
+        directory (or cache object) in which aggregated data are cached;
+        if a matching entry exists, reading and aggregating the data is
+        skipped; not used in incremental mode. A `cache.CompactCache`
+        memory-maps cached data instead of reading them.
+    incremental : bool, optional
+        whether to keep running aggregates, such that rows appended to the
+        data files or new files can be added with `update` or `watch`
+        without reprocessing the data read before; `raw_df` is not kept in
+        this mode
+    chunksize : int, optional
+        if given, data files are streamed in chunks of at most chunksize
+        rows, which are folded into running aggregates, see
+        `load_data`; `raw_df` is not kept in this mode
+    ci_params : dict, optional
+        method ('bootstrap' or 't'), confidence level, number of bootstrap
+        replicates and random seed of confidence intervals, see
+        `confidence.confidence_intervals`
+    compact : bool, optional
+        whether to pack the aggregated data into one contiguous buffer with
+        float64 quantities down-cast to float32, see
+        `columnar.ColumnStore`; columns of `df` are then views of that
+        buffer, which reduces memory when many plots are held at once
+    metadata : dict, optional
+        required metadata values of the runs to be loaded; a list of values
+        selects runs matching any of them. Runs are selected by their
+        metadata sidecars before their result files are parsed, see
+        `metadata`; given raw data are filtered by their metadata columns.
+    group_by : list, optional
+        metadata keys by which configurations are distinguished in addition
+        to `schema.GROUP_KEYS`, e.g. the NEST version; these become
+        categorical columns of `df`. Every run needs a value of each key.
+    aggregation_params : dict, optional
+        method ('mean', 'median', 'trimmed' or 'iqr') and parameters of the
+        aggregation of repetitions, see `robust.aggregate`; values removed
+        by robust methods are listed in `rejected`, which is None if the
+        aggregated data are loaded from the cache. Robust methods need all
+        repetitions at once and are not available for chunked or
+        incremental loading.
+    power_model : float or callable, optional
+        power drawn per node in W, or a function of the arrays
+        `num_nodes`, `tasks_per_node` and `threads_per_task` returning it;
+        required for the energy quantities `energy_to_solution` and
+        `energy_per_model_time`
+
+    Derived quantities, such as `sim_factor`, are computed on first access
+    via `get_quantity` (as done by the plotting functions) and stored as
+    columns of `df`. They are recomputed if `df` or `time_scaling` change.
+    Further derived quantities can be added with `register_derived`.
+    Confidence intervals are computed likewise by `get_confidence_interval`
+    and stored as `<quantity>_ci_low` and `<quantity>_ci_high`.
    """
 
     def __init__(self, x_axis,
                  x_ticks='data',
                  data_file='/path/to/data',
                  matplotlib_params=pp.matplotlib_params,
-                 color_params=pp.color_params,
+                 color_params=None,
                  additional_params=pp.additional_params,
                  label_params=pp.label_params,
                  time_scaling=1,
                  df=None,
-                 detailed_timers=True):
+                 detailed_timers=True,
+                 quantities=None,
+                 max_workers=None,
+                 cache=None,
+                 incremental=False,
+                 chunksize=None,
+                 ci_params=pp.ci_params,
+                 compact=False,
+                 metadata=None,
+                 group_by=None,
+                 aggregation_params=pp.aggregation_params,
+                 power_model=None):
 
         self.x_axis = x_axis
         self.x_ticks = x_ticks
@@ -72,242 +171,840 @@ class Plot():
         self.additional_params = additional_params
         self.color_params = color_params
         self.label_params = label_params
-        self.time_scaling = time_scaling
+        self._time_scaling = time_scaling
+        self.derived = dict(derived.REGISTRY)
         self.df = df
+        self.power_model = power_model
         self.detailed_timers = detailed_timers
+        self.quantities = quantities
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.chunksize = chunksize
+        self.ci_params = ci_params
+        self.compact = compact
+        self.metadata = metadata
+        self.group_by = list(group_by or [])
+        self.aggregation_params = aggregation_params
+        self.rejected = None
+        self.raw_df = None
+        self._aggregator = None
+        self._offsets = {}
+
+        if cache is not None and not isinstance(cache, cache_.FrameCache):
+            cache = cache_.FrameCache(cache)
+        if incremental:
+            cache = None
+        self.cache = cache
+
+        if self.cache is not None:
+            key = self.cache_key(data_file)
+            cached = self.cache.load(key)
+            if cached is not None:
+                self.df = cached
+                self._compact()
+                return
+
         self.load_data(data_file)
-        self.compute_derived_quantities()
+
+        if self.cache is not None:
+            self.cache.store(key, self.df)
+        self._compact()
+
+    @classmethod
+    def from_store(cls, store, x_axis, uuids=None, metadata=None,
+                   where=None, **kwargs):
+        """
+        Create a plot from benchmark data selected in a result store.
+
+        Attributes
+        ----------
+        store : store.ResultStore
+            store holding the benchmark data
+        x_axis : str or list
+            variable to be plotted on x-axis
+        uuids : list, optional
+            UUIDs of runs to select
+        metadata : dict, optional
+            required metadata values of the selected runs
+        where : dict, optional
+            required values of configuration columns
+        kwargs
+            further arguments passed to `Plot`
+
+        Raises
+        ------
+        ValueError
+            if no benchmark data match the selection
+        """
+        df = store.query(uuids=uuids, metadata=metadata,
+                         with_metadata=bool(kwargs.get('group_by')),
+                         **(where or {}))
+        if not len(df):
+            raise ValueError(f'No benchmark data in {store.path} match '
+                             f'uuids={uuids}, metadata={metadata}, '
+                             f'where={where}.')
+        return cls(x_axis, df=df, **kwargs)
+
+    @property
+    def df(self):
+        """
+        Aggregated benchmark data including derived quantities computed so
+        far.
+        """
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        self._df = df
+        self._materialized = set()
+
+    @property
+    def color_params(self):
+        """
+        Colors of the variables, `plot_params.color_params` if not given.
+
+        The default colour table is resolved on first use, as it loads
+        matplotlib.
+        """
+        if self._color_params is None:
+            self._color_params = pp.color_params
+        return self._color_params
+
+    @color_params.setter
+    def color_params(self, color_params):
+        self._color_params = color_params
+
+    @property
+    def power_model(self):
+        """
+        Power drawn per node, registered as derived quantity
+        `power_per_node`.
+        """
+        return self._power_model
+
+    @power_model.setter
+    def power_model(self, power_model):
+        self._power_model = power_model
+        self.derived.pop('power_per_node', None)
+        if callable(power_model):
+            self.derived['power_per_node'] = derived.Derived(
+                'power_per_node',
+                lambda q: np.broadcast_to(np.asarray(power_model(
+                    q['num_nodes'], q['tasks_per_node'],
+                    q['threads_per_task']), dtype=float),
+                    np.shape(q['num_nodes'])),
+                depends=('num_nodes', 'tasks_per_node', 'threads_per_task'))
+        elif power_model is not None:
+            self.derived['power_per_node'] = derived.Derived(
+                'power_per_node',
+                lambda q: np.full(np.shape(q['num_nodes']),
+                                  float(power_model)),
+                depends=('num_nodes',))
+        self.invalidate_derived()
+
+    @property
+    def group_keys(self):
+        """
+        Columns identifying a configuration of the aggregated data.
+        """
+        return schema.GROUP_KEYS + self.group_by
+
+    @property
+    def time_scaling(self):
+        """
+        Quotient between the units of wall-clock and model time.
+        """
+        return self._time_scaling
+
+    @time_scaling.setter
+    def time_scaling(self, time_scaling):
+        if self._df is not None and 'model_time_sim' in self._df:
+            self._df['model_time_sim'] *= self._time_scaling / time_scaling
+        self._time_scaling = time_scaling
+        self.invalidate_derived()
+
+    def cache_key(self, data_file):
+        """
+        Compute the key identifying the processed data in the cache.
+
+        The key depends on the content of the input data and their metadata
+        sidecars and on all options that influence aggregation and derived
+        quantities.
+
+        Attributes
+        ----------
+        data_file : str or list
+            data file(s) to be loaded, ignored if a dataframe was given
+        """
+        if self.df is not None:
+            return self.cache.key(df=self.df, **self._cache_options())
+        try:
+            files = loader.resolve_data_files(data_file)
+        except FileNotFoundError:
+            print('File could not be found')
+            quit()
+        sidecars = [s for s in map(metadata_.sidecar, files) if s]
+        return self.cache.key(data_files=files + sidecars,
+                              **self._cache_options())
+
+    def _cache_options(self):
+        return {'detailed_timers': self.detailed_timers,
+                'time_scaling': self.time_scaling,
+                'quantities': self.quantities,
+                'metadata': self.metadata,
+                'group_by': self.group_by,
+                'aggregation_params': self.aggregation_params}
+
+    def _resolve(self, data_file):
+        """
+        Data files of the runs with the required metadata, and the metadata
+        of all runs.
+        """
+        files = loader.resolve_data_files(data_file)
+        meta = metadata_.read_metadata(files, max_workers=self.max_workers)
+        if self.metadata:
+            selected = set(metadata_.select(meta, self.metadata))
+            files = [f for f in files if loader.run_uuid(f) in selected]
+        return files, meta
+
+    def _with_metadata(self, df, meta=None):
+        """
+        Attach the metadata of the runs to normalized raw data, or, if they
+        are not given, select rows by the metadata columns of the data.
+        """
+        if meta is not None:
+            if len(meta.columns) and 'uuid' in df:
+                df = metadata_.attach(df, meta)
+        elif self.metadata:
+            df = metadata_.filter_rows(df, self.metadata)
+        missing = [k for k in self.group_by if k not in df]
+        if missing:
+            raise ValueError(f'The data have no metadata {missing} to '
+                             'group by.')
+        # configurations with missing keys would be dropped by groupby
+        incomplete = df[self.group_by].isna().any(axis=1)
+        if incomplete.any():
+            runs = (sorted(map(str, pd.unique(df.loc[incomplete, 'uuid'])))
+                    if 'uuid' in df else f'{incomplete.sum()} rows')
+            raise ValueError(f'Runs lack metadata {self.group_by} to group '
+                             f'by: {runs}.')
+        return df
 
     def load_data(self, data_file):
         """
         Load data to dataframe, to be used later when plotting.
 
-        Group the data by specified operations.
+        Only the columns of the requested quantities are parsed, using the
+        compact dtypes and column aliases defined in `schema`. Repetitions
+        of each configuration are aggregated to mean and standard
+        deviation, stored as `<quantity>` and `<quantity>_std`, or with
+        the robust method set in `aggregation_params`, see `robust`.
+
+        If several data files are given, they are read concurrently and
+        combined before grouping; each row of the combined raw data, kept
+        as `raw_df`, is tagged with the UUID of its source file. The
+        metadata sidecars of the files are read as well (see `metadata`)
+        and attached to `raw_df` as categorical columns; runs lacking the
+        required `metadata` are skipped without parsing their files, and
+        configurations are further split by the keys of `group_by`.
+
+        If `chunksize` is set, the files are instead read one after another
+        in chunks of at most `chunksize` rows, and each chunk is folded into
+        running means and variances (see `online.OnlineAggregator`). Peak
+        memory is then independent of the size and number of files: it is
+        bounded by roughly `chunksize * n_columns * 8` bytes for the chunk
+        being parsed plus `3 * n_configurations * n_quantities * 8` bytes
+        for the running aggregates, where n_columns is the number of parsed
+        columns, n_configurations the number of distinct configurations
+        and n_quantities the number of aggregated quantities.
 
         Attributes
         ----------
-        data_file : str
-            data file to be loaded and later plotted
+        data_file : str or list
+            data file(s) to be loaded and later plotted, see
+            `loader.resolve_data_files`
 
         Raises
         ------
         ValueError
         """
+        columns = schema.select_columns(self._measured_quantities(),
+                                        self.detailed_timers)
+        self._columns = columns
+        method = self.aggregation_params['method']
+        streamed = self.chunksize is not None and self.df is None
+        if method != 'mean' and (self.incremental or streamed):
+            raise ValueError(f'Aggregation method {method!r} is not '
+                             'available for chunked or incremental '
+                             'loading.')
+
+        if self.incremental:
+            self._aggregator = online.OnlineAggregator(columns,
+                                                       self.group_keys)
+            raw_df, self.df = self.df, None
+            try:
+                if raw_df is None:
+                    self.update(data_file=data_file)
+                else:
+                    self.update(df=raw_df)
+            except FileNotFoundError:
+                print('File could not be found')
+                quit()
+            return
+
+        if self.chunksize is not None and self.df is None:
+            aggregator = online.OnlineAggregator(columns, self.group_keys)
+            try:
+                files, meta = self._resolve(data_file)
+                if not files:
+                    raise ValueError('No run has the required metadata.')
+                for chunk in loader.iter_data_chunks(
+                        files, self.chunksize,
+                        **schema.read_csv_kwargs(columns)):
+                    aggregator.update(self._with_metadata(
+                        schema.normalize(chunk, columns), meta))
+            except FileNotFoundError:
+                print('File could not be found')
+                quit()
+            self.df = aggregator.result()
+            self.df['model_time_sim'] /= self.time_scaling
+            return
+
+        meta = None
         if self.df is None:
             try:
-                self.df = pd.read_csv(data_file, delimiter=',')
+                files, meta = self._resolve(data_file)
+                if not files:
+                    raise ValueError('No run has the required metadata.')
+                self.df = loader.read_data_files(
+                    files, max_workers=self.max_workers,
+                    **schema.read_csv_kwargs(columns))
             except FileNotFoundError:
                 print('File could not be found')
                 quit()
 
+        selected = [c.name for c in columns]
         for py_timer in ['py_time_create', 'py_time_connect']:
-            if py_timer not in self.df:
-                self.df[py_timer] = np.nan
+            if py_timer in selected and py_timer not in self.df:
                 raise ValueError('Warning! Python timers are not found. ' +
                                  'Construction time measurements will not ' +
                                  'be accurate.')
 
-        dict_ = {'num_nodes': 'first',
-                 'threads_per_task': 'first',
-                 'tasks_per_node': 'first',
-                 'model_time_sim': 'first',
-                 'time_construction_create': ['mean', 'std'],
-                 'time_construction_connect': ['mean', 'std'],
-                 'time_simulate': ['mean', 'std'],
-                 'time_collocate_spike_data': ['mean', 'std'],
-                 'time_communicate_spike_data': ['mean', 'std'],
-                 'time_deliver_spike_data': ['mean', 'std'],
-                 'time_update': ['mean', 'std'],
-                 'time_communicate_target_data': ['mean', 'std'],
-                 'time_gather_spike_data': ['mean', 'std'],
-                 'time_gather_target_data': ['mean', 'std'],
-                 'time_communicate_prepare': ['mean', 'std'],
-                 'py_time_create': ['mean', 'std'],
-                 'py_time_connect': ['mean', 'std'],
-                 'base_memory': ['mean', 'std'],
-                 'network_memory': ['mean', 'std'],
-                 'init_memory': ['mean', 'std'],
-                 'total_memory': ['mean', 'std'],
-                 'num_connections': ['mean', 'std'],
-                 'local_spike_counter': ['mean', 'std'],
-                 }
-
-        col = ['num_nodes', 'threads_per_task', 'tasks_per_node',
-               'model_time_sim', 'time_construction_create',
-               'time_construction_create_std', 'time_construction_connect',
-               'time_construction_connect_std', 'time_simulate',
-               'time_simulate_std',
-               'time_communicate_prepare',
-               'time_communicate_prepare_std',
-               'py_time_create', 'py_time_create_std',
-               'py_time_connect', 'py_time_connect_std',
-               'base_memory', 'base_memory_std',
-               'network_memory', 'network_memory_std',
-               'init_memory', 'init_memory_std',
-               'total_memory', 'total_memory_std',
-               'num_connections', 'num_connections_std',
-               'local_spike_counter', 'local_spike_counter_std']
-
-        if self.detailed_timers:
-            dict_.update({
-                'time_collocate_spike_data': ['mean', 'std'],
-                'time_communicate_spike_data': ['mean', 'std'],
-                'time_deliver_spike_data': ['mean', 'std'],
-                # 'time_update_spike_data': ['mean', 'std'],
-                'time_communicate_target_data': ['mean', 'std'],
-                'time_gather_spike_data': ['mean', 'std'],
-                'time_gather_target_data': ['mean', 'std']})
-
-            col = ['num_nodes', 'threads_per_task', 'tasks_per_node',
-                   'model_time_sim', 'time_construction_create',
-                   'time_construction_create_std', 'time_construction_connect',
-                   'time_construction_connect_std', 'time_simulate',
-                   'time_simulate_std', 'time_collocate_spike_data',
-                   'time_collocate_spike_data_std', 'time_communicate_spike_data',
-                   'time_communicate_spike_data_std', 'time_deliver_spike_data',
-                   'time_deliver_spike_data_std',
-                   # 'time_update_spike_data',
-                   # 'time_update_spike_data_std',
-                   'time_communicate_target_data',
-                   'time_communicate_target_data_std',
-                   'time_gather_spike_data',
-                   'time_gather_spike_data_std',
-                   'time_gather_target_data',
-                   'time_gather_target_data_std',
-                   'time_communicate_prepare',
-                   'time_communicate_prepare_std',
-                   'py_time_create', 'py_time_create_std',
-                   'py_time_connect', 'py_time_connect_std',
-                   'base_memory', 'base_memory_std',
-                   'network_memory', 'network_memory_std',
-                   'init_memory', 'init_memory_std',
-                   'total_memory', 'total_memory_std',
-                   'num_connections', 'num_connections_std',
-                   'local_spike_counter', 'local_spike_counter_std']
-
-        self.df = self.df.drop('rng_seed', axis=1).groupby(
-            ['num_nodes',
-             'threads_per_task',
-             'tasks_per_node',
-             'model_time_sim'], as_index=False).agg(dict_)
+        self.raw_df = self._with_metadata(schema.normalize(self.df, columns),
+                                          meta)
+        self.df, self.rejected = robust.aggregate(
+            self.raw_df, columns, self.group_keys, **self.aggregation_params)
+        if method == 'iqr':
+            # confidence intervals are computed from retained repetitions
+            self.raw_df = self.raw_df.drop(
+                index=self.rejected['row'].unique())
+        self.df['model_time_sim'] /= self.time_scaling
 
-    def compute_derived_quantities(self):
+    def update(self, data_file=None, df=None):
         """
-        Do computations to get parameters needed for plotting.
+        Add new benchmark data in incremental mode.
+
+        Only rows appended to known data files since the last update, rows
+        of new data files and the given rows are processed. Derived
+        quantities are recomputed on next access.
+
+        Attributes
+        ----------
+        data_file : str or list, optional
+            data file(s) to check for new rows, see
+            `loader.resolve_data_files`
+        df : pandas.DataFrame, optional
+            new raw benchmark data
+
+        Returns
+        -------
+        updated : bool
+            whether new data were found
+
+        Raises
+        ------
+        ValueError
+        FileNotFoundError
         """
+        if not self.incremental:
+            raise ValueError('Updating data requires incremental mode.')
 
-        self.df['num_nvp'] = (
-            self.df['threads_per_task'] * self.df['tasks_per_node']
-        )
+        frames = [] if df is None else [(df, None)]
+        if data_file is not None:
+            kwargs = schema.read_csv_kwargs(self._columns)
+            files, meta = self._resolve(data_file)
+            # offsets are only advanced once all files have been read, such
+            # that no rows are lost if reading one of them fails
+            offsets = {}
+            for path in files:
+                offset, header = self._offsets.get(path, (0, None))
+                new_rows, offset, header = loader.read_new_rows(
+                    path, offset, header, **kwargs)
+                offsets[path] = (offset, header)
+                if new_rows is not None:
+                    frames.append((new_rows, meta))
+            self._offsets.update(offsets)
+        if not frames:
+            return False
+
+        for frame, meta in frames:
+            self._aggregator.update(self._with_metadata(
+                schema.normalize(frame, self._columns), meta))
+        self.df = self._aggregator.result()
         self.df['model_time_sim'] /= self.time_scaling
-        self.df['sim_factor'] = (self.df['time_simulate']['mean'].values /
-                                 self.df['model_time_sim'].values.flatten())
-        self.df['sim_factor_std'] = (self.df['time_simulate']['std'].values /
-                                     self.df['model_time_sim'].values.flatten())
-        if self.detailed_timers:
-            self.df['time_construction_create+time_construction_connect'] = (
-                self.df['py_time_create'] + self.df['py_time_connect'])
-            self.df['time_construction_create+time_construction_connect_std'] = (
-                np.sqrt((self.df['time_construction_create_std']**2 +
-                         self.df['time_construction_connect_std']**2)))
-
-            self.df['time_phase_total'] = (
-                # self.df['time_update_spike_data'] +
-                self.df['time_communicate_spike_data'] +
-                self.df['time_deliver_spike_data'] +
-                self.df['time_collocate_spike_data'])
-            self.df['time_phase_total_std'] = \
-                np.sqrt(
-                # self.df['time_update_spike_data_std']**2 +
-                self.df['time_communicate_spike_data_std']**2 +
-                self.df['time_deliver_spike_data_std']**2 +
-                self.df['time_collocate_spike_data_std']**2
-            )
-            self.df['phase_total_factor'] = (
-                self.df['time_phase_total'] /
-                self.df['model_time_sim'])
-            self.df['phase_total_factor_std'] = (
-                self.df['time_phase_total_std'] /
-                self.df['model_time_sim'])
-
-            for phase in ['update', 'communicate', 'deliver', 'collocate']:
-                self.df['phase_' + phase + '_factor'] = (
-                    self.df['time_' + phase + '_spike_data'] /
-                    self.df['model_time_sim'])
-
-                self.df['phase_' + phase + '_factor' + '_std'] = (
-                    self.df['time_' + phase + '_spike_data' + '_std'] /
-                    self.df['model_time_sim'])
-
-                self.df['frac_phase_' + phase] = (
-                    100 * self.df['time_' + phase + '_spike_data'] /
-                    self.df['time_phase_total'])
-
-                self.df['frac_phase_' + phase + '_std'] = (
-                    100 * self.df['time_' + phase + '_spike_data' + '_std'] /
-                    self.df['time_phase_total'])
-        self.df['total_memory_per_node'] = (self.df['total_memory']['mean'].values /
-                                            self.df['num_nodes'].values.flatten())
-        self.df['total_memory_per_node_std'] = (self.df['total_memory']['std'].values /
-                                                self.df['num_nodes'].values.flatten())
+        self._compact()
+        return True
+
+    def _compact(self):
+        """
+        Pack the aggregated data if requested, see `compact`.
+        """
+        if self.compact and self.df is not None:
+            self.df = columnar.ColumnStore.from_frame(self.df).to_frame()
+
+    def watch(self, data_file, callback=None, interval=5.,
+              max_updates=None):
+        """
+        Poll data files and update the data whenever new rows arrive.
+
+        Runs until interrupted or until max_updates updates happened.
+
+        Attributes
+        ----------
+        data_file : str or list
+            data file(s) to watch; directories and glob patterns are
+            re-evaluated on every poll to pick up new files
+        callback : callable, optional
+            called with this plot object after every update, e.g. to redraw
+            a figure
+        interval : float
+            seconds between polls
+        max_updates : int, optional
+            number of updates after which to return
+
+        Raises
+        ------
+        ValueError
+            if a data file has been truncated or rewritten, see
+            `loader.read_new_rows`
+        """
+        updates = 0
+        while max_updates is None or updates < max_updates:
+            try:
+                updated = self.update(data_file=data_file)
+            except FileNotFoundError:
+                updated = False
+            if updated:
+                updates += 1
+                if callback is not None:
+                    callback(self)
+            if max_updates is None or updates < max_updates:
+                time.sleep(interval)
+
+    def _measured_quantities(self):
+        """
+        Measured quantities needed for the requested quantities.
+        """
+        if self.quantities is None:
+            return None
+        required = derived.requirements(self.quantities, self.derived)
+        measured = []
+        for name in required:
+            if name.endswith('_std'):
+                name = name[:-len('_std')]
+            if name not in schema.GROUP_KEYS and name not in measured:
+                measured.append(name)
+        return measured
+
+    def load_rank_data(self, data_file=None, df=None, timers=None):
+        """
+        Add load-imbalance statistics from per-rank timer dumps.
+
+        The timers are reduced over MPI ranks and threads as described in
+        `imbalance`; the statistics are added to `df` as columns
+        `<timer>_min`, `<timer>_max`, `<timer>_mean` and
+        `<timer>_imbalance` (max / mean) and their `_std` companions,
+        matched to the configurations of the aggregated data.
+
+        Attributes
+        ----------
+        data_file : str or list, optional
+            per-rank data file(s), see `loader.resolve_data_files`
+        df : pandas.DataFrame, optional
+            raw per-rank data, used instead of reading data_file
+        timers : list, optional
+            timers to be analyzed; the timers of the update phases if not
+            given
+
+        Returns
+        -------
+        columns : list
+            names of the added columns
+
+        Raises
+        ------
+        FileNotFoundError
+        ValueError
+        """
+        if df is None:
+            df = imbalance.read_rank_data(data_file, timers,
+                                          max_workers=self.max_workers)
+        else:
+            df = imbalance.normalize(df)
+        stats = imbalance.imbalance(df, timers or imbalance.PHASE_TIMERS)
+        stats['model_time_sim'] /= self.time_scaling
+        columns = [c for c in stats if c not in schema.GROUP_KEYS]
+        matched = pd.MultiIndex.from_frame(stats[schema.GROUP_KEYS]).isin(
+            pd.MultiIndex.from_frame(self._df[schema.GROUP_KEYS]))
+        if not matched.any():
+            raise ValueError('The per-rank data match none of the '
+                             'configurations of the aggregated data.')
+        self._df = self._df.drop(
+            columns=[c for c in columns if c in self._df]).merge(
+            stats, on=schema.GROUP_KEYS, how='left')
+        return columns
+
+    def register_derived(self, name, func, depends=()):
+        """
+        Register a derived quantity for this plot.
+
+        Attributes
+        ----------
+        name : str
+            name of the quantity
+        func : callable
+            function receiving a mapping `q`, from which other quantities
+            are retrieved as arrays via `q['name']`, and returning the
+            values of the new quantity
+        depends : list of str
+            names of quantities accessed by func
+        """
+        derived.register(name, func, depends, registry=self.derived)
+        self.invalidate_derived()
+
+    def invalidate_derived(self):
+        """
+        Remove all derived quantities computed so far from `df`.
+        """
+        if self._df is not None and self._materialized:
+            self._df.drop(columns=list(self._materialized), inplace=True)
+        self._materialized = set()
+
+    def get_quantity(self, name):
+        """
+        Return a quantity, computing it first if it is derived.
+
+        Attributes
+        ----------
+        name : str
+            name of a column of `df` or of a registered derived quantity
+
+        Returns
+        -------
+        values : pandas.Series
+
+        Raises
+        ------
+        KeyError
+        """
+        if name not in self.df:
+            quantities = derived.Quantities(
+                lambda n: self.df[n].to_numpy(), self.derived)
+            # resolves name together with all derived quantities it needs
+            quantities[name]
+            for n, values in quantities.computed.items():
+                self.df[n] = values
+                self._materialized.add(n)
+        return self.df[name]
+
+    def compute_derived_quantities(self):
+        """
+        Compute all registered derived quantities available for the data.
+
+        Derived quantities are computed on demand by the plotting
+        functions; this computes all of them at once, e.g. for inspecting
+        `df`, and adds them to `df` in one step.
+        """
+        quantities = derived.Quantities(
+            lambda n: self.df[n].to_numpy(), self.derived)
+        for name in self.derived:
+            required = derived.requirements([name], self.derived)
+            if name not in self.df and all(r in self.df for r in required):
+                quantities[name]
+        if quantities.computed:
+            self._df = pd.concat([self._df, pd.DataFrame(
+                quantities.computed, index=self._df.index)], axis=1)
+            self._materialized.update(quantities.computed)
+
+    def get_confidence_interval(self, name):
+        """
+        Return the confidence interval of a quantity's mean.
+
+        Intervals are computed from the repetitions in `raw_df` as set in
+        `ci_params`, see `confidence.confidence_intervals`, and stored as
+        columns `<name>_ci_low` and `<name>_ci_high` of `df`.
+
+        Attributes
+        ----------
+        name : str
+            name of a measured or derived quantity
+
+        Returns
+        -------
+        low, high : pandas.Series
+
+        Raises
+        ------
+        ValueError
+        """
+        low, high = name + '_ci_low', name + '_ci_high'
+        if low not in self.df:
+            self.compute_confidence_intervals([name])
+        return self.df[low], self.df[high]
+
+    def compute_confidence_intervals(self, quantities):
+        """
+        Compute confidence intervals of several quantities at once.
+
+        The resampled data are shared between all quantities, which is
+        faster than computing them one by one.
+
+        Attributes
+        ----------
+        quantities : list
+            names of measured or derived quantities
+
+        Raises
+        ------
+        ValueError
+        """
+        intervals = confidence.confidence_intervals(
+            self, quantities, **self.ci_params)
+        columns = {}
+        for name, (low, high) in intervals.items():
+            columns[name + '_ci_low'] = low
+            columns[name + '_ci_high'] = high
+        self._df = pd.concat([self._df.drop(
+            columns=[c for c in columns if c in self._df]), pd.DataFrame(
+                columns, index=self._df.index)], axis=1)
+        self._materialized.update(columns)
+
+    def _error(self, name, error):
+        """
+        Error bar extents of a quantity, see `plot_main`.
+        """
+        if error == 'ci':
+            values = self.get_quantity(name).to_numpy()
+            low, high = self.get_confidence_interval(name)
+            return np.vstack([values - low.to_numpy(),
+                              high.to_numpy() - values])
+        return self.get_quantity(name + '_std').to_numpy()
+
+    def _x_values(self):
+        """
+        Values of the variable plotted on the x-axis.
+        """
+        x_axis = self.x_axis
+        if isinstance(x_axis, str):
+            x_axis = [x_axis]
+        for x in x_axis:
+            self.get_quantity(x)
+        if len(x_axis) == 1:
+            # a view of the column, unlike selecting a sub-frame
+            return self.df[x_axis[0]].to_numpy()
+        return self.df[x_axis].to_numpy().squeeze(axis=1)
 
     def plot_fractions(self, axis, fill_variables,
                        interpolate=False, step=None, log=False, alpha=1.,
-                       error=False):
+                       error=False, facet=None):
         """
         Fill area between curves.
 
+        The stacked layers are computed at once and drawn as a single
+        polygon collection, error bars as a single line collection; legend
+        entries are provided by zero-size proxy patches. Configurations
+        for which any of the variables is not finite are left out.
+
         axis : Matplotlib axes object
         fill_variables : list
             variables (e.g. timers) to be plotted as fill  between graph and
             x axis
         interpolate : bool, default
-            whether to interpolate between the curves
+            kept for compatibility with `fill_between`, where it has no
+            effect without `where`
         step : {'pre', 'post', 'mid'}, optional
             should the filling be a step function
         log : bool, default
             whether the x-axes should have logarithmic scale
         alpha, int, default
             alpha value of fill_between plot
-        error : bool
-            whether plot should have error bars
-        """
-
-        fill_height = 0
-        for fill in fill_variables:
-            axis.fill_between(self.df[self.x_axis].to_numpy().squeeze(axis=1),
-                              fill_height,
-                              self.df[fill].to_numpy() + fill_height,
-                              label=self.label_params[fill],
-                              facecolor=self.color_params[fill],
-                              interpolate=interpolate,
-                              step=step,
-                              alpha=alpha,
-                              linewidth=0.5,
-                              edgecolor='#444444')
-            if error:
-                axis.errorbar(self.df[self.x_axis].to_numpy().squeeze(axis=1),
-                              self.df[fill].to_numpy() + fill_height,
-                              yerr=self.df[fill + '_std'].to_numpy(),
-                              capsize=3,
-                              capthick=1,
-                              color='k',
-                              fmt='none')
-            fill_height += self.df[fill].to_numpy()
+        error : bool or 'ci'
+            whether plot should have error bars showing the standard
+            deviation, or confidence intervals if 'ci'
+        facet : str or list, optional
+            columns of `df` (e.g. 'threads_per_task' or metadata) whose
+            values are drawn on separate axes; axis is then a list of axes,
+            one per facet. Stacked areas of several series on one axis
+            would overlap, hence there is no `hue` as in `plot_main`.
+
+        Raises
+        ------
+        ValueError
+        """
+        for ax, _, _, series in self._facets(axis, facet):
+            self._plot_fractions(ax, fill_variables, series[0], step, log,
+                                 alpha, error)
+
+    def _plot_fractions(self, axis, fill_variables, rows, step, log, alpha,
+                        error):
+        """
+        Stacked areas of the rows at the given positions, or of all rows.
+        """
+        # matplotlib is loaded already, as the axis was created with it
+        from matplotlib import cbook
+        from matplotlib.collections import LineCollection, PolyCollection
+        from matplotlib.patches import Rectangle
+
+        rows = slice(None) if rows is None else rows
+        x = self._x_values()[rows]
+        heights = np.stack([self.get_quantity(fill).to_numpy(dtype=float)[rows]
+                            for fill in fill_variables])
+        top = np.cumsum(heights, axis=0)
+        bottom = np.vstack([np.zeros_like(x, dtype=float), top[:-1]])
+        valid = np.isfinite(x) & np.all(np.isfinite(top), axis=0)
+        if not valid.any():
+            raise ValueError('None of the configurations has finite values '
+                             f'of all of {list(fill_variables)}.')
+        x, top, bottom = x[valid], top[:, valid], bottom[:, valid]
+
+        xs, tops, bottoms = x, top, bottom
+        if step is not None:
+            n = len(fill_variables)
+            stepped = cbook.STEP_LOOKUP_MAP['steps-' + step](x, *top, *bottom)
+            xs, tops, bottoms = stepped[0], stepped[1:n + 1], stepped[n + 1:]
+        # outline of every layer: along its top, back along its bottom
+        verts = np.concatenate([
+            np.stack([np.broadcast_to(xs, tops.shape), tops], axis=-1),
+            np.stack([np.broadcast_to(xs[::-1], bottoms.shape),
+                      bottoms[:, ::-1]], axis=-1)], axis=1)
+
+        colors = [self.color_params[fill] for fill in fill_variables]
+        axis.add_collection(PolyCollection(verts,
+                                           facecolors=colors,
+                                           edgecolors='#444444',
+                                           linewidths=0.5,
+                                           alpha=alpha))
+        for fill, color in zip(fill_variables, colors):
+            axis.add_patch(Rectangle((xs[0], 0), 0, 0,
+                                     label=self.label_params[fill],
+                                     facecolor=color,
+                                     edgecolor='#444444',
+                                     linewidth=0.5,
+                                     alpha=alpha))
+
+        if error:
+            errors = np.stack([
+                np.broadcast_to(self._error(fill, error)[..., rows],
+                                (2, len(valid)))
+                for fill in fill_variables])[..., valid]
+            low = top - errors[:, 0]
+            high = top + errors[:, 1]
+            X = np.broadcast_to(x, top.shape)
+            shown = np.isfinite(low) & np.isfinite(high)
+            X, low, high = X[shown], low[shown], high[shown]
+            segments = np.stack([np.stack([X, low], axis=-1),
+                                 np.stack([X, high], axis=-1)], axis=1)
+            axis.add_collection(LineCollection(segments, colors='k'))
+            # caps as in errorbar with capsize=3 and capthick=1
+            axis.plot(np.concatenate([X, X]), np.concatenate([low, high]),
+                      linestyle='none', marker='_', markersize=6,
+                      markeredgewidth=1, color='k')
+        axis.autoscale_view()
 
         if self.x_ticks == 'data':
-            axis.set_xticks(self.df[self.x_axis].to_numpy().squeeze(axis=1))
+            axis.set_xticks(self._x_values()[rows])
         else:
             axis.set_xticks(self.x_ticks)
 
         if log:
+            # matplotlib is loaded already, as the axis was created with it
+            from matplotlib.ticker import ScalarFormatter
             axis.set_xscale('log')
             axis.tick_params(bottom=False, which='minor')
-            axis.get_xaxis().set_major_formatter(
-                matplotlib.ticker.ScalarFormatter())
+            axis.get_xaxis().set_major_formatter(ScalarFormatter())
+
+    def _split(self, by):
+        """
+        Row positions of the series given by the values of some columns.
+
+        The rows are grouped once by a group index and sorted by group and
+        x-axis value, such that every series is a slice of that order.
+
+        Attributes
+        ----------
+        by : str or list
+            columns of `df`, e.g. configuration keys or metadata
+
+        Returns
+        -------
+        levels : list of tuple
+            values of the columns per series, sorted
+        rows : list of numpy.ndarray
+            row positions of each series, ordered by x-axis value
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        for b in by:
+            self.get_quantity(b)
+        grouped = self.df.groupby(by, sort=True, observed=True)
+        codes = grouped.ngroup().to_numpy()
+        levels = [v if isinstance(v, tuple) else (v,)
+                  for v in grouped.size().index]
+        # rows with missing values of a column have code -1 and are left out
+        order = np.lexsort((self._x_values(), codes))
+        bounds = np.searchsorted(codes[order], np.arange(len(levels) + 1))
+        return levels, [order[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def _series_label(self, by, values):
+        by = [by] if isinstance(by, str) else list(by)
+        return ', '.join(f'{self.label_params.get(b, b)} {v}'
+                         for b, v in zip(by, values))
+
+    def _facets(self, axis, facet, by=()):
+        """
+        Pair the axes with the facets and series of the data.
+
+        Returns
+        -------
+        facets : list
+            (axis, facet values, levels of the series, rows of the series)
+            per facet; without facet, the single axis with all rows
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if facet is None:
+            if not by:
+                return [(axis, (), [()], [None])]
+            levels, rows = self._split(by)
+            return [(axis, (), levels, rows)]
+        facet = [facet] if isinstance(facet, str) else list(facet)
+        levels, rows = self._split(facet + by)
+        n = len(facet)
+        values = list(dict.fromkeys(level[:n] for level in levels))
+        axes = np.ravel(axis)
+        if len(axes) < len(values):
+            raise ValueError(f'{len(values)} facets need as many axes, got '
+                             f'{len(axes)}.')
+        facets = []
+        for ax, value in zip(axes, values):
+            series = [(level[n:], r) for level, r in zip(levels, rows)
+                      if level[:n] == value]
+            facets.append((ax, value, [s[0] for s in series],
+                           [s[1] for s in series]))
+            ax.set_title(self._series_label(facet, value))
+        return facets
 
     def plot_main(self, quantities, axis, log=(False, False),
-                  error=False, fmt='none', label=None, color=None):
+                  error=False, fmt='none', label=None, color=None,
+                  hue=None, facet=None):
         """
         Main plotting function.
 
@@ -315,30 +1012,73 @@ class Plot():
         ----------
         quantities : list
             list with plotting quantities
-        axis : axis object
-            axis object used when plotting
+        axis : axis object or list
+            axis object used when plotting; one per facet if facet is given
         log : tuple of bools, default
             whether x and y axis should have logarithmic scale
-        error : bool, default
-            whether or not to plot error bars
+        error : bool or 'ci', default
+            whether or not to plot error bars showing the standard
+            deviation, or confidence intervals if 'ci'
         fmt : string
             matplotlib format string (fmt) for defining line style
+        hue : str or list, optional
+            columns of `df` (e.g. 'threads_per_task' or metadata) whose
+            values are drawn as separate lines in different colours;
+            quantities are then distinguished by line style
+        facet : str or list, optional
+            columns of `df` whose values are drawn on separate axes
+
+        Raises
+        ------
+        ValueError
         """
+        x = self._x_values()
+        if facet is not None or hue is not None:
+            colors = {}
+            styles = ['-', '--', ':', '-.']
+            for ax, _, levels, series in self._facets(axis, facet,
+                                                      hue or ()):
+                for i, y in enumerate(quantities):
+                    values = self.get_quantity(y).to_numpy()
+                    errors = self._error(y, error) if error else None
+                    y_label = self.label_params[y] if label is None else label
+                    y_color = self.color_params[y] if color is None else color
+                    for level, rows in zip(levels, series):
+                        style = dict(label=y_label, color=y_color)
+                        if hue is not None:
+                            # one colour per series, same in all facets
+                            style['color'] = colors.setdefault(
+                                level, pp.bright[len(colors) % len(pp.bright)])
+                            style['label'] = self._series_label(hue, level)
+                            if len(quantities) > 1:
+                                style['label'] = f'{y_label}, {style["label"]}'
+                            style['linestyle'] = styles[i % len(styles)]
+                        ax.plot(x[rows], values[rows], marker=None,
+                                linewidth=2, **style)
+                        if error:
+                            ax.errorbar(x[rows], values[rows],
+                                        yerr=errors[..., rows], marker=None,
+                                        capsize=3, capthick=1,
+                                        color=style['color'], fmt=fmt)
+                self._format_x_axis(ax, x[np.concatenate(series)], log[0])
+                if log[1]:
+                    ax.set_yscale('log')
+            return
 
         for y in quantities:
             label = self.label_params[y] if label is None else label
             color = self.color_params[y] if color is None else color
-            axis.plot(self.df[self.x_axis].to_numpy().squeeze(axis=1),
-                      self.df[y].to_numpy(),
+            axis.plot(x,
+                      self.get_quantity(y).to_numpy(),
                       marker=None,
                       label=label,
                       color=color,
                       linewidth=2)
             if error:
                 axis.errorbar(
-                    self.df[self.x_axis].to_numpy().squeeze(axis=1),
-                    self.df[y].to_numpy(),
-                    yerr=self.df[y + '_std'].to_numpy(),
+                    x,
+                    self.get_quantity(y).to_numpy(),
+                    yerr=self._error(y, error),
                     marker=None,
                     capsize=3,
                     capthick=1,
@@ -346,7 +1086,7 @@ class Plot():
                     fmt=fmt)
 
         if self.x_ticks == 'data':
-            axis.set_xticks(self.df[self.x_axis].to_numpy().squeeze(axis=1))
+            axis.set_xticks(x)
         else:
             axis.set_xticks(self.x_ticks)
 
@@ -356,6 +1096,478 @@ class Plot():
             axis.tick_params(bottom=False, which='minor')
             axis.set_yscale('log')
 
+    def plot_speedup(self, quantities, axis, error=False, ideal=True,
+                     fit=None, log=(False, False)):
+        """
+        Plot speedup relative to the smallest configuration.
+
+        Attributes
+        ----------
+        quantities : list
+            timers or derived times, e.g. 'time_simulate' or 'sim_factor'
+        axis : axis object
+            axis object used when plotting
+        error : bool, default
+            whether or not to plot error bars
+        ideal : bool, default
+            whether to plot the ideal (linear) speedup
+        fit : {'amdahl'}, optional
+            scaling model fitted to each quantity and plotted alongside
+        log : tuple of bools, default
+            whether x and y axis should have logarithmic scale
+        """
+        x = self._x_values()
+        df = scaling.analyze(self, quantities)
+        for y in quantities:
+            color = self.color_params.get(y)
+            axis.plot(x, df[y + '_speedup'], label=self.label_params.get(y, y),
+                      color=color, linewidth=2)
+            if error:
+                axis.errorbar(x, df[y + '_speedup'],
+                              yerr=df[y + '_speedup_std'],
+                              capsize=3, capthick=1, color=color, fmt='none')
+        r = x / x.min()
+        if fit == 'amdahl':
+            result = scaling.fit(self, quantities, model='amdahl')
+            r_fine = np.geomspace(r.min(), r.max(), 100)
+            for y in quantities:
+                s = result.loc[y, 's']
+                axis.plot(r_fine * x.min(), 1. / (s + (1. - s) / r_fine),
+                          color=self.color_params.get(y), linestyle='--',
+                          label=f'Amdahl fit, s = {s:.3f}')
+        elif fit is not None:
+            raise ValueError(f'Unknown scaling model {fit!r}.')
+        if ideal:
+            axis.plot(x, r, color='k', linestyle=':', label='Ideal')
+
+        self._format_x_axis(axis, x, log[0])
+        if log[1]:
+            axis.set_yscale('log')
+
+    def plot_efficiency(self, quantities, axis, mode='strong', error=False,
+                        log=False):
+        """
+        Plot parallel efficiency relative to the smallest configuration.
+
+        Attributes
+        ----------
+        quantities : list
+            timers or derived times, e.g. 'time_simulate' or 'sim_factor'
+        axis : axis object
+            axis object used when plotting
+        mode : {'strong', 'weak'}
+            scaling mode, see `scaling.efficiency`
+        error : bool, default
+            whether or not to plot error bars
+        log : bool, default
+            whether the x-axis should have logarithmic scale
+        """
+        x = self._x_values()
+        df = scaling.analyze(self, quantities, mode=mode)
+        for y in quantities:
+            color = self.color_params.get(y)
+            axis.plot(x, df[y + '_efficiency'],
+                      label=self.label_params.get(y, y),
+                      color=color, linewidth=2)
+            if error:
+                axis.errorbar(x, df[y + '_efficiency'],
+                              yerr=df[y + '_efficiency_std'],
+                              capsize=3, capthick=1, color=color, fmt='none')
+        axis.axhline(1., color='k', linestyle=':', linewidth=1)
+        self._format_x_axis(axis, x, log)
+
+    def plot_imbalance(self, axis, timers=None, kind='ratio', error=False,
+                       log=(False, False)):
+        """
+        Plot load imbalance between ranks, see `load_rank_data`.
+
+        Attributes
+        ----------
+        axis : axis object
+            axis object used when plotting
+        timers : list, optional
+            timers with imbalance statistics; the timers of the update
+            phases if not given
+        kind : {'ratio', 'range'}
+            'ratio' plots the imbalance ratio max / mean; 'range' plots the
+            mean over ranks with a band from the minimum to the maximum
+        error : bool, default
+            whether or not to plot error bars (standard deviation over
+            repetitions)
+        log : tuple of bools, default
+            whether x and y axis should have logarithmic scale
+
+        Raises
+        ------
+        ValueError
+        """
+        if timers is None:
+            timers = [t for t in imbalance.PHASE_TIMERS
+                      if t + '_imbalance' in self.df]
+        x = self._x_values()
+        for t in timers:
+            color = self.color_params.get(t)
+            label = self.label_params.get(t, t)
+            if kind == 'ratio':
+                y = self.df[t + '_imbalance'].to_numpy()
+                axis.plot(x, y, label=label, color=color, linewidth=2)
+                yerr = self.df[t + '_imbalance_std'].to_numpy()
+            elif kind == 'range':
+                y = self.df[t + '_mean'].to_numpy()
+                axis.plot(x, y, label=label, color=color, linewidth=2)
+                axis.fill_between(x, self.df[t + '_min'].to_numpy(),
+                                  self.df[t + '_max'].to_numpy(),
+                                  color=color, alpha=0.3, linewidth=0)
+                yerr = self.df[t + '_mean_std'].to_numpy()
+            else:
+                raise ValueError(f'Unknown kind {kind!r}, use "ratio" or '
+                                 '"range".')
+            if error:
+                axis.errorbar(x, y, yerr=yerr, capsize=3, capthick=1,
+                              color=color, fmt='none')
+        if kind == 'ratio':
+            axis.axhline(1., color='k', linestyle=':', linewidth=1)
+
+        self._format_x_axis(axis, x, log[0])
+        if log[1]:
+            axis.set_yscale('log')
+
+    def plot_heatmap(self, quantity, axis, x='threads_per_task',
+                     y='tasks_per_node', facet=None, log=False,
+                     cmap='viridis', annotate=True):
+        """
+        Plot a quantity on a 2-D grid of configurations.
+
+        All facets share one colour scale. Grid cells without a
+        configuration are left empty.
+
+        Attributes
+        ----------
+        quantity : str
+            quantity to be shown, e.g. 'sim_factor'
+        axis : axis object or list
+            axis object used when plotting; one per facet if facet is given
+        x, y : str
+            columns of `df` along the axes of the grid
+        facet : str or list, optional
+            columns of `df` whose values are drawn on separate axes, e.g.
+            'num_nodes'
+        log : bool, default
+            whether the colour scale is logarithmic
+        cmap : str
+            matplotlib colour map
+        annotate : bool, default
+            whether to write the values into the cells
+
+        Returns
+        -------
+        image : matplotlib.image.AxesImage
+            image of the last facet, e.g. for adding a colour bar
+
+        Raises
+        ------
+        ValueError
+        """
+        # matplotlib is loaded already, as the axis was created with it
+        from matplotlib.colors import LogNorm, Normalize
+
+        values = self.get_quantity(quantity).to_numpy(dtype=float)
+        xs = self.get_quantity(x).to_numpy()
+        ys = self.get_quantity(y).to_numpy()
+        x_levels, x_index = np.unique(xs, return_inverse=True)
+        y_levels, y_index = np.unique(ys, return_inverse=True)
+        finite = values[np.isfinite(values)]
+        norm = (LogNorm if log else Normalize)(
+            vmin=finite.min() if len(finite) else None,
+            vmax=finite.max() if len(finite) else None)
+
+        image = None
+        for ax, _, _, series in self._facets(axis, facet):
+            rows = np.arange(len(values)) if series[0] is None else series[0]
+            cells = y_index[rows] * len(x_levels) + x_index[rows]
+            if len(np.unique(cells)) < len(cells):
+                raise ValueError(f'Several configurations share a cell of '
+                                 f'the {x} x {y} grid, split them by facet.')
+            grid = np.full(len(y_levels) * len(x_levels), np.nan)
+            grid[cells] = values[rows]
+            grid = grid.reshape(len(y_levels), len(x_levels))
+            image = ax.imshow(grid, cmap=cmap, norm=norm, origin='lower',
+                              aspect='auto', interpolation='nearest')
+            if annotate:
+                # dark text on light cells and vice versa
+                rgb = image.cmap(norm(grid))[..., :3]
+                light = rgb @ np.array([0.299, 0.587, 0.114]) > 0.5
+                for i, j in zip(*np.nonzero(np.isfinite(grid))):
+                    ax.text(j, i, f'{grid[i, j]:.3g}', ha='center',
+                            va='center', fontsize='small',
+                            color='k' if light[i, j] else 'w')
+            ax.set_xticks(np.arange(len(x_levels)))
+            ax.set_xticklabels([str(v) for v in x_levels])
+            ax.set_yticks(np.arange(len(y_levels)))
+            ax.set_yticklabels([str(v) for v in y_levels])
+            ax.set_xlabel(self.label_params.get(x, x))
+            ax.set_ylabel(self.label_params.get(y, y))
+        return image
+
+    def plot_pareto(self, axis, cost='node_hours_per_model_time',
+                    time='sim_factor', target=None, annotate=True,
+                    log=(True, True)):
+        """
+        Plot cost against time of all configurations with the Pareto front.
+
+        Configurations on the front, for which no other one is both faster
+        and cheaper, are connected and labelled by their resources.
+
+        Attributes
+        ----------
+        axis : axis object
+            axis object used when plotting
+        cost : str
+            cost quantity, e.g. 'node_hours', 'core_hours' or
+            'energy_per_model_time'
+        time : str
+            time quantity, e.g. 'sim_factor' or 'time_to_solution'
+        target : float, optional
+            largest acceptable time, drawn as vertical line
+        annotate : bool, default
+            whether to label configurations on the front
+        log : tuple of bools, default
+            whether x and y axis should have logarithmic scale
+        """
+        t = self.get_quantity(time).to_numpy(dtype=float)
+        c = self.get_quantity(cost).to_numpy(dtype=float)
+        front = planner.pareto(t, c)
+        axis.scatter(t[~front], c[~front], color='#BBBBBB', s=20,
+                     label='Configurations')
+        order = np.flatnonzero(front)[np.argsort(t[front])]
+        axis.step(t[order], c[order], where='post', color='k', marker='o',
+                  markersize=4, label='Pareto front')
+        if annotate:
+            keys = [k for k in ('num_nodes', 'tasks_per_node',
+                                'threads_per_task') if k in self.df]
+            values = self.df[keys].to_numpy()
+            for i in order:
+                axis.annotate(' x '.join(str(v) for v in values[i]),
+                              (t[i], c[i]), textcoords='offset points',
+                              xytext=(4, 4), fontsize='x-small')
+        if target is not None:
+            axis.axvline(target, color='k', linestyle=':', linewidth=1)
+        axis.set_xlabel(self.label_params.get(time, time))
+        axis.set_ylabel(self.label_params.get(cost, cost))
+        if log[0]:
+            axis.set_xscale('log')
+        if log[1]:
+            axis.set_yscale('log')
+
+    def cheapest(self, target, cost='node_hours_per_model_time',
+                 time='sim_factor'):
+        """
+        Cheapest configuration meeting a time target.
+
+        Attributes
+        ----------
+        target : float
+            largest acceptable time, e.g. real-time factor
+        cost : str
+            cost quantity, see `plot_pareto`
+        time : str
+            time quantity, see `plot_pareto`
+
+        Returns
+        -------
+        configuration : pandas.Series
+            configuration keys, time and cost
+
+        Raises
+        ------
+        ValueError
+        """
+        t = self.get_quantity(time).to_numpy(dtype=float)
+        c = self.get_quantity(cost).to_numpy(dtype=float)
+        meets = (t <= target) & np.isfinite(c)
+        if not meets.any():
+            raise ValueError(f'No configuration has {time} <= {target}.')
+        best = np.flatnonzero(meets)[np.argmin(c[meets])]
+        keys = [k for k in self.group_keys if k in self.df]
+        return self.df.iloc[best][keys + [time, cost]]
+
+    def timer_breakdown(self, tree=None):
+        """
+        Times of the nodes of the timer hierarchy, see `timers.breakdown`.
+
+        Attributes
+        ----------
+        tree : timers.Timer, optional
+            root of the hierarchy, `timers.TREE` if not given
+
+        Returns
+        -------
+        structure : pandas.DataFrame
+            nodes with their parent, depth and kind
+        values : pandas.DataFrame
+            times of the nodes per configuration, including the residuals
+            `<timer>_unaccounted`
+
+        Raises
+        ------
+        ValueError
+        """
+        return timers.breakdown(self.get_quantity,
+                                timers.TREE if tree is None else tree)
+
+    def dominant_timers(self, root=None, tree=None):
+        """
+        Table of the timer dominating the wall time per configuration.
+
+        Attributes
+        ----------
+        root : str, optional
+            timer whose subtree is considered, e.g. 'time_simulate' for the
+            dominant phase of state propagation; the root of the hierarchy
+            if not given
+        tree : timers.Timer, optional
+            root of the hierarchy, `timers.TREE` if not given
+
+        Returns
+        -------
+        table : pandas.DataFrame
+            configuration keys and x-axis values, the dominant leaf timer
+            (`phase`) with its label, time, fraction of the time of root
+            and path in the hierarchy
+
+        Raises
+        ------
+        ValueError
+        """
+        structure, values = self.timer_breakdown(tree)
+        table = timers.dominant(structure, values, root)
+        table.insert(1, 'label', [self._timer_label(p) if p else None
+                                  for p in table['phase']])
+        x_axis = [self.x_axis] if isinstance(self.x_axis, str) else self.x_axis
+        columns = list(dict.fromkeys(
+            [k for k in self.group_keys if k in self.df] + list(x_axis)))
+        keys = pd.DataFrame({c: self.get_quantity(c).to_numpy()
+                             for c in columns})
+        return pd.concat([keys, table], axis=1)
+
+    def _timer_label(self, name):
+        if name.endswith(timers.RESIDUAL_SUFFIX):
+            parent = name[:-len(timers.RESIDUAL_SUFFIX)]
+            return self.label_params.get(parent, parent) + ' (unaccounted)'
+        return self.label_params.get(name, name)
+
+    def plot_timer_breakdown(self, axis, root=None, tree=None, fraction=True,
+                             width=0.8):
+        """
+        Plot the timer hierarchy as icicles, one per configuration.
+
+        Every configuration gets a slot on the x-axis, in which the levels
+        of the hierarchy are drawn as adjacent columns from left (root) to
+        right (leaves); a node spans the extent of its time within its
+        parent. Residuals `<timer>_unaccounted` are hatched; negative
+        residuals, where children overlap, are drawn with zero height.
+
+        Attributes
+        ----------
+        axis : axis object
+            axis object used when plotting
+        root : str, optional
+            timer whose subtree is drawn; the root of the hierarchy if not
+            given
+        tree : timers.Timer, optional
+            root of the hierarchy, `timers.TREE` if not given
+        fraction : bool, default
+            whether times are shown in percent of the time of root
+        width : float, default
+            width of the icicle in a slot of width 1
+
+        Raises
+        ------
+        ValueError
+        """
+        structure, values = self.timer_breakdown(tree)
+        if root is None:
+            root = structure['name'].iloc[0]
+        structure = timers.subtree(structure, root)
+        depth = structure['depth'] - structure['depth'].min()
+        column_width = width / (depth.max() + 1)
+        x = self._x_values()
+        slots = np.arange(len(x))
+        scale = 1.
+        if fraction:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                scale = 100. / values[root].to_numpy()
+
+        # lower edge of the next child of every node
+        following = {}
+        for (name, parent, kind), level in zip(
+                structure[['name', 'parent', 'kind']].to_numpy(), depth):
+            height = np.nan_to_num(
+                np.clip(values[name].to_numpy() * scale, 0., None))
+            bottom = following.get(parent, np.zeros(len(x)))
+            following[parent] = bottom + height
+            following[name] = bottom
+            position = slots - width / 2 + (level + 0.5) * column_width
+            if kind == 'residual':
+                style = dict(color='white', hatch='///')
+            else:
+                style = dict(color=self.color_params.get(name))
+            axis.bar(position, height, width=column_width, bottom=bottom,
+                     edgecolor='#444444', linewidth=0.5,
+                     label=self._timer_label(name), **style)
+
+        axis.set_xticks(slots)
+        axis.set_xticklabels([f'{v:g}' if np.issubdtype(type(v), np.number)
+                              else str(v) for v in x])
+
+    def _format_x_axis(self, axis, x, log):
+        """
+        Set ticks and scale of the x-axis.
+        """
+        if log:
+            axis.set_xscale('log')
+            axis.tick_params(bottom=False, which='minor')
+        if self.x_ticks == 'data':
+            axis.set_xticks(x)
+        else:
+            axis.set_xticks(self.x_ticks)
+        if log:
+            from matplotlib.ticker import ScalarFormatter
+            axis.get_xaxis().set_major_formatter(ScalarFormatter())
+
+    def export_dashboard(self, path, quantities=None, fill_variables=None,
+                         x_axes=None, error=True, **kwargs):
+        """
+        Write the aggregated data as an interactive HTML dashboard.
+
+        The page is self-contained and shows the quantities as
+        `plot_main` and the fill variables as `plot_fractions`, with the
+        x-axis, scales, error bars and configuration filters selectable
+        in the browser, see `dashboard`.
+
+        Attributes
+        ----------
+        path : str
+            path of the HTML file
+        quantities : list, optional
+            quantities of the main panel, see `dashboard.payload`
+        fill_variables : list, optional
+            quantities of the fraction panel, see `dashboard.payload`
+        x_axes : list, optional
+            variables selectable as x-axis, see `dashboard.payload`
+        error : bool or 'ci'
+            whether error bars show the standard deviation, or confidence
+            intervals if 'ci'
+        kwargs
+            title and axis labels passed to `dashboard.export`
+
+        Raises
+        ------
+        ValueError
+        """
+        dashboard.export(self, path, quantities, fill_variables, x_axes,
+                         error, **kwargs)
+
     def merge_legends(self, ax1, ax2):
         """
         Merge legends from two axes, display them in the first
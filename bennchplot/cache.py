@@ -0,0 +1,376 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+On-disk caches of aggregated benchmark data and rendered figures
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+try:
+    from . import columnar
+except ImportError:
+    import columnar
+
+# Bump whenever the layout of the cached frames changes.
+CACHE_VERSION = 3
+
+
+def hash_files(files, block_size=2**20):
+    """
+    Compute a digest of the content of the given files.
+
+    Attributes
+    ----------
+    files : list
+        paths of files to be hashed, in a fixed order
+    block_size : int
+        number of bytes read at once
+
+    Returns
+    -------
+    digest : str
+    """
+    h = hashlib.sha256()
+    for path in files:
+        h.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+def hash_frame(df):
+    """
+    Compute a digest of the content of a dataframe.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+
+    Returns
+    -------
+    digest : str
+    """
+    h = hashlib.sha256()
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class _DirectoryCache():
+    """
+    Size-bounded directory of cache entries named `<key><suffix>`.
+    """
+
+    suffix = ''
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = os.fspath(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def _entries(self):
+        return glob.glob(os.path.join(self.cache_dir, '*' + self.suffix))
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+        """
+        entries = []
+        for path in self._entries():
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        for path in self._entries():
+            os.remove(path)
+
+
+class FrameCache(_DirectoryCache):
+    """
+    Size-bounded cache of dataframes stored as Feather files.
+
+    Entries are keyed by a content hash of the input data and the options
+    used to process it. When the total size of the cache exceeds
+    `max_bytes`, the least recently used entries are removed.
+
+    Attributes
+    ----------
+    cache_dir : str
+        directory holding the cached frames, created if necessary
+    max_bytes : int, optional
+        upper bound for the total size of all cached frames
+    """
+
+    suffix = '.feather'
+
+    def __init__(self, cache_dir, max_bytes=256 * 2**20):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError('Caching requires pyarrow, install it with ' +
+                              '`pip install bennchplot[cache]`.')
+        super().__init__(cache_dir, max_bytes)
+
+    def key(self, data_files=None, df=None, **options):
+        """
+        Compute the cache key for given input data and options.
+
+        Attributes
+        ----------
+        data_files : list, optional
+            input files, hashed by content
+        df : pandas.DataFrame, optional
+            input data, hashed by content if no files are given
+        options
+            processing options influencing the cached result
+
+        Returns
+        -------
+        key : str
+        """
+        if data_files is not None:
+            data_hash = hash_files(data_files)
+        else:
+            data_hash = hash_frame(df)
+        options['cache_version'] = CACHE_VERSION
+        h = hashlib.sha256(data_hash.encode())
+        h.update(json.dumps(options, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def load(self, key):
+        """
+        Load a cached frame.
+
+        Attributes
+        ----------
+        key : str
+            cache key as returned by `key`
+
+        Returns
+        -------
+        df : pandas.DataFrame or None
+            cached frame, None if there is no entry for key
+        """
+        path = self._path(key)
+        try:
+            df = pd.read_feather(path)
+        except (FileNotFoundError, OSError):
+            return None
+        # mark entry as recently used
+        os.utime(path)
+        return df
+
+    def store(self, key, df):
+        """
+        Store a frame and evict old entries if the cache is full.
+
+        Attributes
+        ----------
+        key : str
+            cache key as returned by `key`
+        df : pandas.DataFrame
+            frame to be stored
+        """
+        df = df.reset_index(drop=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.to_feather(tmp)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+
+class CompactCache(FrameCache):
+    """
+    Size-bounded cache of dataframes stored as compact column stores.
+
+    Works like `FrameCache` without requiring pyarrow, but loaded frames
+    are zero-copy views of read-only memory-mapped files, see
+    `columnar.ColumnStore`; float64 quantities are stored as float32.
+
+    Attributes
+    ----------
+    cache_dir : str
+        directory holding the cached frames, created if necessary
+    max_bytes : int, optional
+        upper bound for the total size of all cached frames
+    """
+
+    suffix = '.columns'
+
+    def __init__(self, cache_dir, max_bytes=256 * 2**20):
+        _DirectoryCache.__init__(self, cache_dir, max_bytes)
+
+    def load(self, key):
+        """
+        Load a cached frame, memory-mapped.
+
+        Attributes
+        ----------
+        key : str
+            cache key as returned by `key`
+
+        Returns
+        -------
+        df : pandas.DataFrame or None
+            cached frame, None if there is no entry for key
+        """
+        path = self._path(key)
+        try:
+            store = columnar.ColumnStore.load(path, mmap=True)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)
+        return store.to_frame()
+
+    def store(self, key, df):
+        """
+        Store a frame and evict old entries if the cache is full.
+
+        Attributes
+        ----------
+        key : str
+            cache key as returned by `key`
+        df : pandas.DataFrame
+            frame to be stored
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            columnar.ColumnStore.from_frame(df).save(tmp)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+
+class RenderCache(_DirectoryCache):
+    """
+    Size-bounded cache of rendered figure files.
+
+    Entries are keyed by a fingerprint of everything a figure depends on,
+    see `render.figure_key`. On a hit, the cached file is copied to the
+    requested output path instead of rendering the figure again.
+
+    Attributes
+    ----------
+    cache_dir : str
+        directory holding the cached figures, created if necessary
+    max_bytes : int, optional
+        upper bound for the total size of all cached figures
+    """
+
+    suffix = '.figure'
+
+    def __init__(self, cache_dir, max_bytes=2**30):
+        super().__init__(cache_dir, max_bytes)
+
+    def key(self, data_hash, **options):
+        """
+        Compute the cache key of a figure.
+
+        Attributes
+        ----------
+        data_hash : str
+            digest of the input data, see `render.data_digest`
+        options
+            figure specification and parameters influencing the figure
+
+        Returns
+        -------
+        key : str
+        """
+        h = hashlib.sha256(data_hash.encode())
+        h.update(json.dumps(options, sort_keys=True, default=repr).encode())
+        return h.hexdigest()
+
+    def fetch(self, key, output):
+        """
+        Copy a cached figure to its output path.
+
+        Attributes
+        ----------
+        key : str
+            cache key as returned by `key`
+        output : str
+            path of the output file
+
+        Returns
+        -------
+        hit : bool
+            whether the figure was found in the cache
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return False
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            shutil.copyfile(path, output)
+        except FileNotFoundError:
+            # evicted concurrently
+            return False
+        os.utime(path)
+        return True
+
+    def store(self, key, output):
+        """
+        Add a rendered figure and evict old entries if the cache is full.
+
+        Attributes
+        ----------
+        key : str
+            cache key as returned by `key`
+        output : str
+            path of the rendered figure
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(output, tmp)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
@@ -0,0 +1,111 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Command line interface for rendering figures in batch
+"""
+import argparse
+import os
+import sys
+
+import yaml
+
+try:
+    from . import render
+except ImportError:
+    import render
+
+
+def load_spec(spec_file):
+    """
+    Read figure specifications from a YAML file.
+
+    The file contains a mapping `figures` from figure names to figure
+    specifications as described in `render`. Relative data paths are
+    interpreted relative to the specification file.
+
+    Attributes
+    ----------
+    spec_file : str
+        path to YAML file
+
+    Returns
+    -------
+    figures : dict
+    """
+    with open(spec_file) as f:
+        figures = yaml.safe_load(f)['figures']
+
+    base = os.path.dirname(os.path.abspath(spec_file))
+    for spec in figures.values():
+        plot = spec.get('plot', {})
+        data_file = plot.get('data_file')
+        if isinstance(data_file, str):
+            plot['data_file'] = os.path.join(base, data_file)
+        elif isinstance(data_file, list):
+            plot['data_file'] = [os.path.join(base, d) for d in data_file]
+    return figures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bennchplot',
+        description='Render beNNch benchmark figures described in a YAML '
+                    'figure specification.')
+    parser.add_argument('spec', help='YAML file with figure specifications')
+    parser.add_argument('data', nargs='*',
+                        help='data sets (csv files, directories or glob '
+                             'patterns) to render every figure for; '
+                             'defaults to the data given in the '
+                             'specification')
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help='directory for rendered figures')
+    parser.add_argument('-f', '--format', default='pdf',
+                        help='file format of rendered figures')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of worker processes, defaults to the '
+                             'number of processors')
+    parser.add_argument('--cache-dir', default=None,
+                        help='directory of a render cache; figures whose '
+                             'data, specification and parameters did not '
+                             'change are copied from it instead of being '
+                             'rendered')
+    parser.add_argument('--figure', action='append', dest='figure_names',
+                        help='render only the named figure; can be given '
+                             'multiple times')
+    args = parser.parse_args(argv)
+
+    figures = load_spec(args.spec)
+    if args.figure_names:
+        unknown = set(args.figure_names) - set(figures)
+        if unknown:
+            parser.error(f'unknown figures {sorted(unknown)}')
+        figures = {name: figures[name] for name in args.figure_names}
+
+    errors = render.render_all(figures,
+                               data_files=args.data or None,
+                               output_dir=args.output_dir,
+                               fmt=args.format,
+                               max_workers=args.jobs,
+                               cache=args.cache_dir)
+    for output, message in errors:
+        print(f'{output}: {message}', file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
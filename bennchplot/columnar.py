@@ -0,0 +1,219 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Compact columnar storage of aggregated benchmark data
+
+All columns of a table are packed into one contiguous byte buffer, each at
+an aligned offset, with a flat index from column name to dtype and offset.
+Columns are retrieved as zero-copy views of the buffer; categorical columns
+are stored as their codes, with the categories kept in the index. The
+buffer can be written to and memory-mapped from a binary file:
+
+    magic (8 bytes) | header length (8 bytes, little endian) | JSON header |
+    padding to 64 bytes | buffer
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import schema
+except ImportError:
+    import schema
+
+MAGIC = b'BNPLCOL1'
+ALIGNMENT = 64
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class ColumnStore():
+    """
+    Table of equally long columns packed into one contiguous buffer.
+
+    Attributes
+    ----------
+    buffer : numpy.ndarray
+        uint8 array holding all columns, possibly memory-mapped
+    index : dict
+        column name to (dtype, byte offset)
+    length : int
+        number of rows
+    categories : dict, optional
+        categories of categorical columns by name, whose codes are stored
+        in the buffer
+    """
+
+    def __init__(self, buffer, index, length, categories=None):
+        self.buffer = buffer
+        self.index = index
+        self.length = length
+        self.categories = categories or {}
+
+    @classmethod
+    def from_frame(cls, df, downcast=True):
+        """
+        Pack the columns of a dataframe.
+
+        Attributes
+        ----------
+        df : pandas.DataFrame
+            table with numeric or categorical columns
+        downcast : bool
+            whether to store float64 columns other than the grouping keys
+            as float32, which suffices for plotting
+
+        Returns
+        -------
+        store : ColumnStore
+        """
+        arrays = {}
+        categories = {}
+        for name in df.columns:
+            if isinstance(df[name].dtype, pd.CategoricalDtype):
+                categories[str(name)] = df[name].cat.categories.tolist()
+                arrays[str(name)] = np.ascontiguousarray(
+                    df[name].cat.codes.to_numpy())
+                continue
+            values = df[name].to_numpy()
+            if (downcast and values.dtype == np.float64 and
+                    name not in schema.GROUP_KEYS):
+                values = values.astype(np.float32)
+            arrays[str(name)] = np.ascontiguousarray(values)
+
+        index = {}
+        offset = 0
+        for name, values in arrays.items():
+            offset = _align(offset)
+            index[name] = (values.dtype.str, offset)
+            offset += values.nbytes
+        buffer = np.zeros(_align(offset), dtype=np.uint8)
+        for name, values in arrays.items():
+            start = index[name][1]
+            buffer[start:start + values.nbytes] = values.view(np.uint8)
+        return cls(buffer, index, len(df), categories)
+
+    def __getitem__(self, name):
+        """
+        Zero-copy view of a column, the codes of a categorical column.
+        """
+        dtype, offset = self.index[name]
+        return np.frombuffer(self.buffer, dtype=dtype, count=self.length,
+                             offset=offset)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def columns(self):
+        """
+        Names of the columns.
+        """
+        return list(self.index)
+
+    @property
+    def nbytes(self):
+        """
+        Size of the buffer in bytes.
+        """
+        return self.buffer.nbytes
+
+    def to_frame(self):
+        """
+        Dataframe whose columns are views of the buffer, without copying.
+
+        Returns
+        -------
+        df : pandas.DataFrame
+        """
+        columns = {}
+        for name in self.index:
+            if name in self.categories:
+                columns[name] = pd.Categorical.from_codes(
+                    self[name], self.categories[name])
+            else:
+                columns[name] = self[name]
+        return pd.DataFrame(columns, copy=False)
+
+    def save(self, path):
+        """
+        Write the store to a binary file.
+
+        Attributes
+        ----------
+        path : str
+            path of the file
+        """
+        header = json.dumps({'length': self.length,
+                             'index': self.index,
+                             'categories': self.categories}).encode()
+        start = _align(len(MAGIC) + 8 + len(header))
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            f.write(b'\0' * (start - len(MAGIC) - 8 - len(header)))
+            f.write(self.buffer.tobytes())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Read a store written by `save`.
+
+        Attributes
+        ----------
+        path : str
+            path of the file
+        mmap : bool
+            whether to memory-map the buffer read-only instead of reading
+            it into memory
+
+        Returns
+        -------
+        store : ColumnStore
+
+        Raises
+        ------
+        ValueError
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a column store file.')
+            size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(size))
+            start = _align(len(MAGIC) + 8 + size)
+            if not mmap:
+                f.seek(start)
+                buffer = np.frombuffer(f.read(), dtype=np.uint8)
+        if mmap:
+            if os.path.getsize(path) == start:
+                buffer = np.zeros(0, dtype=np.uint8)
+            else:
+                buffer = np.memmap(path, dtype=np.uint8, mode='r',
+                                   offset=start)
+        index = {name: (dtype, offset)
+                 for name, (dtype, offset) in header['index'].items()}
+        return cls(buffer, index, header['length'],
+                   header.get('categories'))
@@ -0,0 +1,299 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Detection of performance regressions between benchmark runs
+
+Runs are aligned on their configuration keys (`Plot.group_keys`) and held
+in arrays of shape (runs, configurations, quantities), such that all runs,
+configurations and quantities are tested against the baseline at once.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from . import stats
+except ImportError:
+    import stats
+
+
+def align(plots, quantities):
+    """
+    Align the aggregated data of several plots on their configurations.
+
+    Attributes
+    ----------
+    plots : list of Plot
+        plot objects holding aggregated data
+    quantities : list
+        measured or derived quantities; derived quantities need a
+        registered `<name>_std` companion
+
+    Returns
+    -------
+    index : pandas.MultiIndex
+        union of the configurations of all plots, sorted
+    mean, std, n : numpy.ndarray
+        means, standard deviations and numbers of repetitions, shape
+        (runs, configurations, quantities); NaN (zero repetitions) where a
+        configuration is missing from a run. The numbers of values
+        `<name>_count` of robust aggregation are used where available.
+
+    Raises
+    ------
+    ValueError
+    """
+    keys = plots[0].group_keys
+    if any(B.group_keys != keys for B in plots):
+        raise ValueError('Runs grouped by different keys cannot be '
+                         'compared.')
+    frames = []
+    for B in plots:
+        if 'num_repetitions' not in B.df:
+            raise ValueError('Comparing runs requires the numbers of '
+                             'repetitions, aggregate the data with '
+                             'Plot.load_data.')
+        columns = {}
+        for q in quantities:
+            columns[q] = B.get_quantity(q).to_numpy(dtype=float)
+            columns[q + '_std'] = B.get_quantity(q + '_std').to_numpy(
+                dtype=float)
+            count = q + '_count' if q + '_count' in B.df else 'num_repetitions'
+            columns[q + '_count'] = B.df[count].to_numpy()
+        index = pd.MultiIndex.from_frame(B.df[keys])
+        frames.append(pd.DataFrame(columns, index=index))
+
+    index = frames[0].index
+    for frame in frames[1:]:
+        index = index.union(frame.index)
+    index = index.sort_values()
+    frames = [frame.reindex(index) for frame in frames]
+
+    stds = [q + '_std' for q in quantities]
+    mean = np.stack([frame[quantities].to_numpy() for frame in frames])
+    std = np.stack([frame[stds].to_numpy() for frame in frames])
+    counts = [q + '_count' for q in quantities]
+    n = np.stack([frame[counts].fillna(0).to_numpy(dtype=float)
+                  for frame in frames])
+    return index, mean, std, n
+
+
+def welch(mean_a, std_a, n_a, mean_b, std_b, n_b):
+    """
+    Welch's unequal variances t-test.
+
+    Attributes
+    ----------
+    mean_a, std_a, n_a : numpy.ndarray
+        means, standard deviations and sample sizes of the first samples
+    mean_b, std_b, n_b : numpy.ndarray
+        same for the second samples, broadcastable to the first
+
+    Returns
+    -------
+    t, dof, p : numpy.ndarray
+        t statistic, Welch-Satterthwaite degrees of freedom and two-sided
+        p-value; NaN where a sample has fewer than two values
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var_a = std_a**2 / n_a
+        var_b = std_b**2 / n_b
+        t = (mean_b - mean_a) / np.sqrt(var_a + var_b)
+        dof = (var_a + var_b)**2 / (var_a**2 / (n_a - 1) +
+                                    var_b**2 / (n_b - 1))
+    valid = (n_a > 1) & (n_b > 1) & np.isfinite(t) & np.isfinite(dof)
+    t = np.where(valid, t, np.nan)
+    dof = np.where(valid, dof, np.nan)
+    p = np.full(t.shape, np.nan)
+    p[valid] = stats.t_sf2(t[valid], dof[valid])
+    return t, dof, p
+
+
+def benjamini_hochberg(p):
+    """
+    Adjust p-values for the false discovery rate (Benjamini-Hochberg).
+
+    Attributes
+    ----------
+    p : numpy.ndarray
+        p-values of any shape; NaN entries are not counted as tests
+
+    Returns
+    -------
+    q : numpy.ndarray
+        adjusted p-values, same shape as p
+    """
+    p = np.asarray(p, dtype=float)
+    flat = p.ravel()
+    valid = np.flatnonzero(np.isfinite(flat))
+    order = valid[np.argsort(flat[valid])]
+    m = len(order)
+    adjusted = flat[order] * m / np.arange(1, m + 1)
+    adjusted = np.minimum.accumulate(adjusted[::-1])[::-1]
+    q = np.full(flat.shape, np.nan)
+    q[order] = np.minimum(adjusted, 1.)
+    return q.reshape(p.shape)
+
+
+def compare(plots, quantities, labels=None, alpha=0.05, min_change=0.):
+    """
+    Test benchmark runs for performance changes against a baseline.
+
+    Every run is compared with the first one for every configuration and
+    quantity by Welch's t-test. The p-values of all tests of the call are
+    adjusted for the false discovery rate. Since all quantities of interest
+    (times, memory) are lower-is-better, a significant increase is reported
+    as a regression.
+
+    Attributes
+    ----------
+    plots : list of Plot
+        plot objects of the runs, baseline first; results from a
+        `ResultStore` can be compared via `Plot.from_store`
+    quantities : list
+        measured or derived quantities, e.g. 'time_simulate',
+        'time_deliver_spike_data' or 'total_memory_per_node'
+    labels : list, optional
+        names of the runs, e.g. software versions; their positions if not
+        given
+    alpha : float
+        false discovery rate
+    min_change : float
+        minimal relative change of the mean for a significant change to be
+        reported as regression or improvement
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        one row per run (except the baseline), configuration and quantity,
+        with the means `baseline` and `mean`, the relative `change`,
+        the effect size `cohens_d`, the Welch test results `t`, `dof`,
+        `p_value`, the adjusted `q_value`, and the flags `significant`,
+        `regression` and `improvement`
+
+    Raises
+    ------
+    ValueError
+    """
+    if len(plots) < 2:
+        raise ValueError('At least two runs are needed for a comparison.')
+    if labels is None:
+        labels = list(range(len(plots)))
+    if len(labels) != len(plots):
+        raise ValueError('Number of labels does not match number of runs.')
+
+    index, mean, std, n = align(plots, quantities)
+    base_mean, base_std, base_n = mean[:1], std[:1], n[:1]
+    mean, std, n = mean[1:], std[1:], n[1:]
+
+    t, dof, p = welch(base_mean, base_std, base_n, mean, std, n)
+    q = benjamini_hochberg(p)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = mean / base_mean - 1.
+        pooled = np.sqrt(((base_n - 1) * base_std**2 + (n - 1) * std**2) /
+                         (base_n + n - 2))
+        cohens_d = (mean - base_mean) / pooled
+    significant = q < alpha
+
+    runs, configs, n_quantities = mean.shape
+    keys = index.to_frame(index=False)
+    df = pd.DataFrame({
+        'run': np.repeat(labels[1:], configs * n_quantities),
+        **{k: np.tile(np.repeat(keys[k].to_numpy(), n_quantities), runs)
+           for k in index.names},
+        'quantity': np.tile(quantities, runs * configs),
+        'baseline': np.broadcast_to(base_mean, mean.shape).ravel(),
+        'mean': mean.ravel(),
+        'change': change.ravel(),
+        'cohens_d': cohens_d.ravel(),
+        't': t.ravel(),
+        'dof': dof.ravel(),
+        'p_value': p.ravel(),
+        'q_value': q.ravel(),
+        'significant': significant.ravel(),
+        'regression': (significant & (change > min_change)).ravel(),
+        'improvement': (significant & (change < -min_change)).ravel(),
+    })
+    return df
+
+
+def plot_regressions(result, quantity, axis, x_axis='num_nodes',
+                     cmap='RdBu_r', limit=None):
+    """
+    Plot relative changes of a quantity for all runs and configurations.
+
+    Changes are shown as a colour map with one row per run; significant
+    regressions are marked by upward, significant improvements by downward
+    triangles.
+
+    Attributes
+    ----------
+    result : pandas.DataFrame
+        output of `compare`
+    quantity : str
+        quantity to be shown
+    axis : axis object
+        axis object used when plotting
+    x_axis : str or list
+        configuration keys labelling the columns, which have to
+        distinguish all configurations of a run
+    cmap : str
+        diverging matplotlib colour map
+    limit : float, optional
+        largest relative change covered by the colour map; the largest
+        absolute change if not given
+
+    Returns
+    -------
+    image : matplotlib.image.AxesImage
+        e.g. for adding a colour bar
+
+    Raises
+    ------
+    ValueError
+    """
+    if isinstance(x_axis, str):
+        x_axis = [x_axis]
+    result = result[result['quantity'] == quantity]
+    if result.duplicated(['run'] + x_axis).any():
+        raise ValueError(f'Configurations of a run share values of {x_axis}, '
+                         'add the keys distinguishing them to x_axis.')
+    runs = pd.unique(result['run'])
+    change = result.pivot(index='run', columns=x_axis,
+                          values='change').reindex(runs)
+    flags = result.assign(flag=result['regression'].astype(int) -
+                          result['improvement'].astype(int))
+    flags = flags.pivot(index='run', columns=x_axis,
+                        values='flag').reindex(runs)
+    if limit is None:
+        limit = np.nanmax(np.abs(change.to_numpy()))
+
+    image = axis.imshow(change.to_numpy(), cmap=cmap, vmin=-limit,
+                        vmax=limit, aspect='auto', origin='upper',
+                        interpolation='nearest')
+    rows, columns = np.indices(flags.shape)
+    for flag, marker in [(1, '^'), (-1, 'v')]:
+        mask = flags.to_numpy() == flag
+        axis.scatter(columns[mask], rows[mask], marker=marker, color='k',
+                     s=20)
+    axis.set_yticks(np.arange(len(runs)))
+    axis.set_yticklabels([str(r) for r in runs])
+    axis.set_xticks(np.arange(change.shape[1]))
+    axis.set_xticklabels([', '.join(str(v) for v in np.atleast_1d(c))
+                          for c in change.columns])
+    axis.set_xlabel(', '.join(x_axis))
+    return image
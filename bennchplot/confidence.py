@@ -0,0 +1,240 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Confidence intervals of aggregated and derived quantities
+
+Repetitions of all configurations are arranged in a padded array of shape
+(configurations, repetitions, quantities), such that resampling is done for
+all configurations at once. Derived quantities are evaluated on the
+resampled means, which accounts for correlations between the quantities
+they combine (e.g. the phase timers summed up in `time_phase_total`).
+"""
+import numpy as np
+
+try:
+    from . import derived
+    from . import robust
+    from . import schema
+    from . import stats
+except ImportError:
+    import derived
+    import robust
+    import schema
+    import stats
+
+METHODS = ('bootstrap', 't')
+
+
+def group_values(raw_df, names, keys=None):
+    """
+    Arrange repetitions of each configuration in a padded array.
+
+    Configurations are ordered as in the output of `schema.aggregate`, see
+    `robust.group_rows`.
+
+    Attributes
+    ----------
+    raw_df : pandas.DataFrame
+        normalized raw benchmark data
+    names : list of str
+        measured quantities
+    keys : list, optional
+        columns identifying a configuration, see `schema.aggregate`
+
+    Returns
+    -------
+    values : numpy.ndarray
+        shape (configurations, max. repetitions, quantities), padded with
+        NaN
+    counts : numpy.ndarray
+        number of repetitions per configuration
+
+    Raises
+    ------
+    ValueError
+    """
+    _, values, rows = robust.group_rows(raw_df, names,
+                                        keys or schema.GROUP_KEYS)
+    return values, (rows >= 0).sum(axis=1)
+
+
+def bootstrap_means(values, counts, n_boot, rng):
+    """
+    Bootstrap replicates of the means of all configurations.
+
+    For every replicate and configuration, as many repetitions as were
+    measured are drawn with replacement. The same draws are used for all
+    quantities, preserving their correlations. Missing values are left out
+    of the means.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        padded repetitions as returned by `group_values`
+    counts : numpy.ndarray
+        number of repetitions per configuration
+    n_boot : int
+        number of bootstrap replicates
+    rng : numpy.random.Generator
+        random number generator
+
+    Returns
+    -------
+    means : numpy.ndarray
+        shape (n_boot, configurations, quantities)
+    """
+    n_groups, n_reps, n_quantities = values.shape
+    draws = (rng.random((n_boot, n_groups, n_reps)) *
+             counts[None, :, None]).astype(np.intp)
+    used = np.arange(n_reps)[None, None, :] < counts[None, :, None]
+    groups = np.arange(n_groups)[None, :, None]
+    means = np.empty((n_boot, n_groups, n_quantities))
+    for k in range(n_quantities):
+        sample = values[groups, draws, k]
+        valid = used & np.isfinite(sample)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[..., k] = (np.where(valid, sample, 0.).sum(axis=2) /
+                             valid.sum(axis=2))
+    return means
+
+
+def t_means(values, n_boot, rng):
+    """
+    Draws from the t sampling distribution of the means.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        padded repetitions as returned by `group_values`
+    n_boot : int
+        number of draws
+    rng : numpy.random.Generator
+        random number generator
+
+    Returns
+    -------
+    means : numpy.ndarray
+        shape (n_boot, configurations, quantities)
+    """
+    n = np.sum(np.isfinite(values), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(values, axis=1)
+        sem = np.nanstd(values, axis=1, ddof=1) / np.sqrt(n)
+        t = rng.standard_t(np.where(n > 1, n - 1, np.nan),
+                           size=(n_boot,) + mean.shape)
+    return mean + sem * t
+
+
+def t_interval(values, confidence):
+    """
+    Confidence interval of the mean based on Student's t-distribution.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        padded repetitions as returned by `group_values`
+    confidence : float
+        confidence level
+
+    Returns
+    -------
+    low, high : numpy.ndarray
+        shape (configurations, quantities)
+    """
+    n = np.sum(np.isfinite(values), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(values, axis=1)
+        sem = np.nanstd(values, axis=1, ddof=1) / np.sqrt(n)
+        t = stats.t_ppf(0.5 + confidence / 2., np.where(n > 1, n - 1, np.nan))
+    return mean - t * sem, mean + t * sem
+
+
+def confidence_intervals(B, names, method='bootstrap', confidence=0.95,
+                         n_boot=1000, seed=None):
+    """
+    Confidence intervals of measured and derived quantities of a plot.
+
+    Attributes
+    ----------
+    B : Plot
+        plot object holding the aggregated (`df`) and raw data (`raw_df`)
+    names : list of str
+        measured or derived quantities
+    method : {'bootstrap', 't'}
+        'bootstrap' resamples repetitions (percentile intervals); 't' uses
+        intervals based on Student's t-distribution for measured quantities
+        and propagates them to derived quantities by sampling the means
+        from their t sampling distributions
+    confidence : float
+        confidence level
+    n_boot : int
+        number of bootstrap replicates or t samples
+    seed : int, optional
+        seed of the random number generator
+
+    Returns
+    -------
+    intervals : dict
+        pairs of arrays (low, high) by quantity
+
+    Raises
+    ------
+    ValueError
+    """
+    if method not in METHODS:
+        raise ValueError(f'Unknown method {method!r}, use one of {METHODS}.')
+    if B.raw_df is None:
+        raise ValueError('Confidence intervals require the raw data, which '
+                         'are not kept for cached, chunked or incremental '
+                         'loading.')
+
+    required = derived.requirements(names, B.derived)
+    measured = [n for n in required
+                if n in B.raw_df and n not in B.group_keys]
+    values, counts = group_values(B.raw_df, measured, B.group_keys)
+
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        samples = bootstrap_means(values, counts, n_boot, rng)
+    else:
+        samples = t_means(values, n_boot, rng)
+    index = {n: i for i, n in enumerate(measured)}
+
+    def lookup(name):
+        if name in index:
+            return samples[..., index[name]]
+        # derived quantities materialized in df are point estimates, they
+        # are recomputed from the samples instead
+        if name in B.derived:
+            raise KeyError(name)
+        return B.df[name].to_numpy()
+
+    quantities = derived.Quantities(lookup, B.derived)
+    alpha = 1. - confidence
+    intervals = {}
+    if method == 't':
+        low, high = t_interval(values, confidence)
+    for name in names:
+        if method == 't' and name in index:
+            intervals[name] = (low[:, index[name]], high[:, index[name]])
+            continue
+        sample = np.broadcast_to(quantities[name],
+                                 (n_boot, len(counts)))
+        intervals[name] = tuple(np.nanquantile(
+            sample, [alpha / 2., 1. - alpha / 2.], axis=0))
+    return intervals
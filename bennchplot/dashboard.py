@@ -0,0 +1,569 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Export of aggregated benchmark data to an interactive HTML dashboard
+
+The dashboard is a single HTML file without external resources. It holds
+the aggregated data as a payload of one contiguous buffer of little-endian
+columns (see `columnar.ColumnStore`), encoded in base64, together with the
+labels and colours of the quantities. The page draws the quantities as in
+`Plot.plot_main` and the fractions as in `Plot.plot_fractions` in the
+browser, where the x-axis, the shown quantities, logarithmic scales, error
+bars and filters on the configuration keys can be changed without Python.
+Configurations differing in the `group_by` metadata of the plot, exported
+as category codes, are drawn as separate lines.
+"""
+import base64
+import html
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import columnar
+    from . import derived
+    from . import schema
+except ImportError:
+    import columnar
+    import derived
+    import schema
+
+# candidates for the x-axis in addition to the x-axis of the plot
+X_AXES = ['num_nodes', 'num_nvp']
+
+# quantities initially shown if the quantities are not given
+SHOWN = ['sim_factor', 'phase_total_factor']
+
+# dtypes the page can decode, see `TEMPLATE`
+DTYPES = ('<f4', '<f8', '<i4')
+
+
+def _available(B, name):
+    # evaluated without materializing derived quantities in `B.df`, such
+    # that confidence intervals are computed before any of them
+    quantities = derived.Quantities(lambda n: B.df[n].to_numpy(), B.derived)
+    try:
+        values = np.asarray(quantities[name], dtype=float)
+    except KeyError:
+        return False
+    return bool(np.isfinite(values).any())
+
+
+def _hex(color):
+    # matplotlib is loaded already, as the colour tables use it
+    from matplotlib.colors import to_hex
+    return to_hex(color)
+
+
+def payload(B, quantities=None, fill_variables=None, x_axes=None,
+            error=True):
+    """
+    Payload of the dashboard.
+
+    Attributes
+    ----------
+    B : Plot
+        plot holding the aggregated data
+    quantities : list, optional
+        quantities selectable in the main panel, all initially shown; if
+        not given, all quantities with a colour in `B.color_params` which
+        are available in the data, apart from fractions, of which those in
+        `SHOWN` are initially shown
+    fill_variables : list, optional
+        quantities stacked in the fraction panel; the available
+        `frac_phase_*` quantities if not given
+    x_axes : list, optional
+        variables selectable as x-axis; the x-axis of `B` and those of
+        `X_AXES` available in the data if not given
+    error : bool or 'ci'
+        whether error bars show the standard deviation or confidence
+        intervals if 'ci'; error bars can be switched off in the page
+
+    Returns
+    -------
+    payload : dict
+        JSON-serializable payload
+
+    Raises
+    ------
+    ValueError
+    """
+    if quantities is None:
+        quantities = [q for q in B.color_params
+                      if not q.startswith('frac_') and _available(B, q)]
+        shown = [q for q in SHOWN if q in quantities] or quantities[:1]
+    else:
+        shown = list(quantities)
+    if fill_variables is None:
+        fill_variables = [q for q in B.color_params
+                          if q.startswith('frac_phase_') and _available(B, q)]
+    if x_axes is None:
+        x_axes = [B.x_axis] if isinstance(B.x_axis, str) else list(B.x_axis)
+        x_axes += [x for x in X_AXES if x not in x_axes and _available(B, x)]
+    names = list(dict.fromkeys(quantities + fill_variables))
+    if not names:
+        raise ValueError('None of the quantities is available in the data.')
+    # configurations differing in the group_by metadata are drawn as
+    # separate series
+    series = [k for k in B.group_by if k in B.df]
+    keys = [k for k in schema.GROUP_KEYS if k in B.df] + series
+    keys += [x for x in x_axes if x not in keys]
+
+    errors = {}
+    if error == 'ci':
+        missing = [n for n in names if n + '_ci_low' not in B.df]
+        if missing:
+            B.compute_confidence_intervals(missing)
+        errors = {n: {'low': n + '_ci_low', 'high': n + '_ci_high'}
+                  for n in names}
+    elif error:
+        errors = {n: {'std': n + '_std'} for n in names
+                  if _available(B, n + '_std')}
+
+    columns = keys + names + [c for e in errors.values() for c in e.values()]
+    frame = {}
+    categories = {}
+    for name in dict.fromkeys(columns):
+        values = B.get_quantity(name)
+        if name in series:
+            # category codes, labelled by the categories in the page
+            values = values.astype('category')
+            categories[name] = [str(c) for c in values.cat.categories]
+            values = values.cat.codes
+        values = values.to_numpy()
+        if (np.issubdtype(values.dtype, np.integer) and
+                np.abs(values).max(initial=0) < 2**31):
+            frame[name] = values.astype('<i4')
+        else:
+            frame[name] = values.astype('<f8')
+    store = columnar.ColumnStore.from_frame(pd.DataFrame(frame))
+    unsupported = {dtype for dtype, _ in store.index.values()} - set(DTYPES)
+    if unsupported:
+        raise ValueError(f'Cannot export columns of dtypes {unsupported}.')
+
+    labels = {n: B.label_params.get(n, n) for n in keys + names}
+    return {
+        'length': store.length,
+        'index': store.index,
+        'buffer': base64.b64encode(store.buffer.tobytes()).decode('ascii'),
+        'keys': keys,
+        'series': series,
+        'categories': categories,
+        'x_axes': x_axes,
+        'quantities': quantities,
+        'shown': shown,
+        'fractions': fill_variables,
+        'errors': errors,
+        'labels': labels,
+        'colors': {n: _hex(B.color_params[n]) for n in names
+                   if n in B.color_params},
+    }
+
+
+def export(B, path, quantities=None, fill_variables=None, x_axes=None,
+           error=True, title='beNNch-plot', ylabel='',
+           fraction_ylabel='relative wall-clock time [%]'):
+    """
+    Write an interactive HTML dashboard.
+
+    Attributes
+    ----------
+    B : Plot
+        plot holding the aggregated data
+    path : str
+        path of the HTML file
+    quantities, fill_variables, x_axes, error
+        see `payload`
+    title : str
+        title of the page
+    ylabel, fraction_ylabel : str
+        labels of the y-axes of the main and the fraction panel
+
+    Raises
+    ------
+    ValueError
+    """
+    data = payload(B, quantities, fill_variables, x_axes, error)
+    data['ylabel'] = ylabel
+    data['fraction_ylabel'] = fraction_ylabel
+    # the payload must not close the script element it is embedded in
+    encoded = json.dumps(data, separators=(',', ':')).replace('</', '<\\/')
+    page = (TEMPLATE.replace('{{title}}', html.escape(title))
+                    .replace('{{payload}}', encoded))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{title}}</title>
+<style>
+body { font-family: sans-serif; margin: 1em 2em; color: #222; }
+#controls, #toggles { display: flex; flex-wrap: wrap; gap: 0.5em 1.5em;
+                      margin-bottom: 0.5em; align-items: center; }
+fieldset { border: 1px solid #ccc; }
+.swatch { display: inline-block; width: 0.9em; height: 0.9em;
+          margin-right: 0.3em; vertical-align: middle;
+          border: 1px solid #444; }
+svg { display: block; max-width: 60em; width: 100%; }
+svg text { font-size: 12px; }
+.message { fill: #888; }
+</style>
+</head>
+<body>
+<h1>{{title}}</h1>
+<div id="controls">
+<label>x-axis <select id="x"></select></label>
+<span id="filters"></span>
+<label><input type="checkbox" id="logx"> log x</label>
+<label><input type="checkbox" id="logy"> log y</label>
+<label><input type="checkbox" id="error"> error bars</label>
+</div>
+<div id="toggles">
+<fieldset id="quantities"><legend>Quantities</legend></fieldset>
+<fieldset id="fractions"><legend>Fractions</legend></fieldset>
+</div>
+<svg id="main" viewBox="0 0 760 420"></svg>
+<svg id="fraction-panel" viewBox="0 0 760 220"></svg>
+<script type="application/json" id="payload">{{payload}}</script>
+<script>
+(function () {
+'use strict';
+const P = JSON.parse(document.getElementById('payload').textContent);
+const TYPES = {'<f4': Float32Array, '<f8': Float64Array, '<i4': Int32Array};
+const SVGNS = 'http://www.w3.org/2000/svg';
+const WIDTH = 760, MARGIN = {left: 75, right: 15, top: 10, bottom: 45};
+
+// columns are views of one buffer, as in columnar.ColumnStore
+const raw = atob(P.buffer);
+const bytes = new Uint8Array(raw.length);
+for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+const C = {};
+for (const name in P.index) {
+  const [dtype, offset] = P.index[name];
+  C[name] = new TYPES[dtype](bytes.buffer, offset, P.length);
+}
+
+const state = {x: P.x_axes[0], logx: false, logy: false,
+               error: Object.keys(P.errors).length > 0, filters: {},
+               quantities: new Set(P.shown),
+               fractions: new Set(P.fractions)};
+
+function label(name) { return P.labels[name] || name; }
+// value of a configuration key, with the label of a category code
+function value(k, v) { return P.categories[k] ? P.categories[k][v] : v; }
+// rows split into the series of the group_by metadata
+function series(selected) {
+  const groups = new Map();
+  for (const i of selected) {
+    const id = P.series.map(k => C[k][i]).join(',');
+    if (!groups.has(id)) groups.set(id, []);
+    groups.get(id).push(i);
+  }
+  return Array.from(groups.values());
+}
+function fmt(v) {
+  const a = Math.abs(v);
+  return a !== 0 && (a >= 1e5 || a < 1e-3) ? v.toExponential(2)
+                                           : String(+v.toPrecision(4));
+}
+function unique(values) {
+  return Array.from(new Set(values)).filter(Number.isFinite)
+    .sort((a, b) => a - b);
+}
+function el(tag, attrs, parent) {
+  const e = document.createElementNS(SVGNS, tag);
+  for (const k in attrs) e.setAttribute(k, attrs[k]);
+  if (parent) parent.appendChild(e);
+  return e;
+}
+function text(content, attrs, parent) {
+  el('text', attrs, parent).textContent = content;
+}
+
+// rows passing the filters, sorted by the x-axis variable
+function rows() {
+  const x = C[state.x], selected = [];
+  for (let i = 0; i < P.length; i++) {
+    if (!Number.isFinite(x[i])) continue;
+    let keep = true;
+    for (const k in state.filters) {
+      if (k !== state.x && state.filters[k] !== 'all' &&
+          C[k][i] !== +state.filters[k]) { keep = false; break; }
+    }
+    if (keep) selected.push(i);
+  }
+  return selected.sort((a, b) => x[a] - x[b]);
+}
+
+// lower and upper end of the error bar of a quantity at a row
+function bounds(name, i, value) {
+  const e = P.errors[name];
+  if (!e) return null;
+  if (e.std) return [value - C[e.std][i], value + C[e.std][i]];
+  return [C[e.low][i], C[e.high][i]];
+}
+
+function linearTicks(lo, hi, n) {
+  const rough = (hi - lo) / n;
+  const mag = Math.pow(10, Math.floor(Math.log10(rough)));
+  const r = rough / mag;
+  const step = mag * (r >= 7.5 ? 10 : r >= 3.5 ? 5 : r >= 1.5 ? 2 : 1);
+  const ticks = [];
+  for (let t = Math.ceil(lo / step) * step; t <= hi + step * 1e-9;
+       t += step) ticks.push(+t.toPrecision(12));
+  return ticks;
+}
+function logTicks(lo, hi) {
+  const ticks = [];
+  const mults = Math.log10(hi / lo) < 2 ? [1, 2, 5] : [1];
+  for (let e = Math.floor(Math.log10(lo)); e <= Math.ceil(Math.log10(hi));
+       e++) {
+    for (const m of mults) {
+      const t = m * Math.pow(10, e);
+      if (t >= lo && t <= hi) ticks.push(+t.toPrecision(12));
+    }
+  }
+  return ticks;
+}
+
+// axis mapping values in [lo, hi] to pixels in [a, b], padded by 5 %
+function axis(values, log, a, b) {
+  values = values.filter(v => Number.isFinite(v) && (!log || v > 0));
+  if (!values.length) return null;
+  let lo = Math.min(...values), hi = Math.max(...values);
+  const t = log ? Math.log10 : v => v;
+  let tlo = t(lo), thi = t(hi);
+  if (thi === tlo) { tlo -= 0.5; thi += 0.5; }
+  const pad = 0.05 * (thi - tlo);
+  tlo -= pad; thi += pad;
+  const inv = log ? v => Math.pow(10, v) : v => v;
+  const map = v => a + (t(v) - tlo) / (thi - tlo) * (b - a);
+  map.lo = inv(tlo); map.hi = inv(thi);
+  map.ticks = log ? logTicks(map.lo, map.hi) : linearTicks(map.lo, map.hi, 6);
+  return map;
+}
+
+// axes, ticks and labels of a panel; returns the x and y mappings
+function frame(svg, height, xs, ys, logy, ylabel) {
+  svg.textContent = '';
+  const sx = axis(xs, state.logx, MARGIN.left, WIDTH - MARGIN.right);
+  const sy = axis(ys, logy, height - MARGIN.bottom, MARGIN.top);
+  if (!sx || !sy) {
+    text('No data for the current selection.',
+         {x: WIDTH / 2, y: height / 2, 'text-anchor': 'middle',
+          class: 'message'}, svg);
+    return null;
+  }
+  const bottom = height - MARGIN.bottom;
+  el('rect', {x: MARGIN.left, y: MARGIN.top, fill: 'none', stroke: '#222',
+              width: WIDTH - MARGIN.left - MARGIN.right,
+              height: bottom - MARGIN.top}, svg);
+  // ticks at the data as for x_ticks='data', thinned if too dense
+  let xticks = unique(xs).filter(v => !state.logx || v > 0);
+  const every = Math.ceil(xticks.length / 12);
+  xticks = xticks.filter((_, k) => k % every === 0);
+  for (const v of xticks) {
+    el('line', {x1: sx(v), x2: sx(v), y1: bottom, y2: bottom + 5,
+                stroke: '#222'}, svg);
+    text(fmt(v), {x: sx(v), y: bottom + 18, 'text-anchor': 'middle'}, svg);
+  }
+  for (const v of sy.ticks) {
+    el('line', {x1: MARGIN.left - 5, x2: MARGIN.left, y1: sy(v), y2: sy(v),
+                stroke: '#222'}, svg);
+    text(fmt(v), {x: MARGIN.left - 8, y: sy(v) + 4, 'text-anchor': 'end'},
+         svg);
+  }
+  text(label(state.x), {x: (MARGIN.left + WIDTH - MARGIN.right) / 2,
+                        y: height - 8, 'text-anchor': 'middle'}, svg);
+  text(ylabel, {x: 0, y: 0, 'text-anchor': 'middle',
+                transform: `translate(15 ${(MARGIN.top + bottom) / 2}) ` +
+                           'rotate(-90)'}, svg);
+  return [sx, sy];
+}
+
+function errorBar(g, x, lo, hi, color) {
+  el('line', {x1: x, x2: x, y1: lo, y2: hi, stroke: color}, g);
+  for (const y of [lo, hi]) {
+    el('line', {x1: x - 3, x2: x + 3, y1: y, y2: y, stroke: color}, g);
+  }
+}
+
+function drawMain(selected) {
+  const svg = document.getElementById('main');
+  const names = P.quantities.filter(q => state.quantities.has(q));
+  const x = C[state.x], xs = selected.map(i => x[i]), ys = [];
+  for (const q of names) {
+    for (const i of selected) {
+      ys.push(C[q][i]);
+      const b = state.error && bounds(q, i, C[q][i]);
+      if (b) ys.push(...b);
+    }
+  }
+  const s = frame(svg, 420, xs, ys, state.logy, P.ylabel);
+  if (!s) return;
+  const [sx, sy] = s;
+  const ok = v => Number.isFinite(v) && (!state.logy || v > 0);
+  for (const q of names) {
+    const color = P.colors[q] || '#000000';
+    const g = el('g', {}, svg);
+    for (const part of series(selected)) {
+      const points = part.filter(i => ok(C[q][i]))
+        .map(i => `${sx(x[i]).toFixed(1)},${sy(C[q][i]).toFixed(1)}`);
+      el('polyline', {points: points.join(' '), fill: 'none', stroke: color,
+                      'stroke-width': 2}, g);
+    }
+    for (const i of selected) {
+      const v = C[q][i];
+      if (!ok(v)) continue;
+      const b = bounds(q, i, v);
+      if (state.error && b && ok(b[0]) && ok(b[1])) {
+        errorBar(g, sx(x[i]), sy(b[0]), sy(b[1]), color);
+      }
+      const dot = el('circle', {cx: sx(x[i]), cy: sy(v), r: 3, fill: color},
+                     g);
+      const spread = b ? ` [${fmt(b[0])}, ${fmt(b[1])}]` : '';
+      el('title', {}, dot).textContent =
+        `${label(q)}: ${fmt(v)}${spread}\n` +
+        P.keys.map(k => `${label(k)}: ${value(k, C[k][i])}`).join('\n');
+    }
+  }
+}
+
+function drawFractions(selected) {
+  const svg = document.getElementById('fraction-panel');
+  const names = P.fractions.filter(q => state.fractions.has(q));
+  svg.style.display = P.fractions.length ? '' : 'none';
+  const x = C[state.x];
+  if (series(selected).length > 1) {
+    svg.textContent = '';
+    text('Select a single value of ' + P.series.map(label).join(', ') +
+         ' to stack the fractions.',
+         {x: WIDTH / 2, y: 110, 'text-anchor': 'middle', class: 'message'},
+         svg);
+    return;
+  }
+  selected = selected.filter(i => names.every(q => Number.isFinite(C[q][i])));
+  const bottom = selected.map(() => 0), layers = [];
+  for (const q of names) {
+    const top = selected.map((i, k) => bottom[k] + C[q][i]);
+    layers.push([q, bottom.slice(), top]);
+    top.forEach((v, k) => { bottom[k] = v; });
+  }
+  const s = frame(svg, 220, selected.map(i => x[i]),
+                  [0, ...bottom], false, P.fraction_ylabel);
+  if (!s) return;
+  const [sx, sy] = s;
+  for (const [q, lower, upper] of layers) {
+    const px = selected.map(i => sx(x[i]).toFixed(1));
+    const points = upper.map((v, k) => `${px[k]},${sy(v).toFixed(1)}`)
+      .concat(lower.map((v, k) => `${px[k]},${sy(v).toFixed(1)}`).reverse());
+    const area = el('polygon', {points: points.join(' '),
+                                fill: P.colors[q] || '#bbbbbb',
+                                stroke: '#444444', 'stroke-width': 0.5}, svg);
+    el('title', {}, area).textContent = label(q);
+    if (!state.error) continue;
+    selected.forEach((i, k) => {
+      const b = bounds(q, i, upper[k]);
+      if (b && Number.isFinite(b[0]) && Number.isFinite(b[1])) {
+        errorBar(svg, sx(x[i]), sy(b[0]), sy(b[1]), '#000000');
+      }
+    });
+  }
+}
+
+function draw() {
+  const selected = rows();
+  drawMain(selected);
+  drawFractions(selected);
+}
+
+function toggles(id, names, shown) {
+  const box = document.getElementById(id);
+  box.style.display = names.length ? '' : 'none';
+  for (const q of names) {
+    const item = document.createElement('label');
+    const input = document.createElement('input');
+    input.type = 'checkbox';
+    input.checked = shown.has(q);
+    input.addEventListener('change', () => {
+      if (input.checked) shown.add(q); else shown.delete(q);
+      draw();
+    });
+    const swatch = document.createElement('span');
+    swatch.className = 'swatch';
+    swatch.style.background = P.colors[q] || 'transparent';
+    item.append(input, swatch, label(q), ' ');
+    box.appendChild(item);
+  }
+}
+
+function filters() {
+  const box = document.getElementById('filters');
+  box.textContent = '';
+  for (const k of P.keys) {
+    const values = unique(C[k]);
+    if (k === state.x || values.length < 2) continue;
+    const select = document.createElement('select');
+    for (const v of ['all', ...values]) {
+      const option = document.createElement('option');
+      option.value = String(v);
+      option.textContent = v === 'all' ? v : String(value(k, v));
+      select.appendChild(option);
+    }
+    select.value = state.filters[k] || 'all';
+    select.addEventListener('change', () => {
+      state.filters[k] = select.value;
+      draw();
+    });
+    const item = document.createElement('label');
+    item.append(label(k) + ' ', select, ' ');
+    box.appendChild(item);
+  }
+}
+
+const xSelect = document.getElementById('x');
+for (const k of P.x_axes) {
+  const option = document.createElement('option');
+  option.value = k;
+  option.textContent = label(k);
+  xSelect.appendChild(option);
+}
+xSelect.addEventListener('change', () => {
+  state.x = xSelect.value;
+  filters();
+  draw();
+});
+for (const k of ['logx', 'logy', 'error']) {
+  const input = document.getElementById(k);
+  input.checked = state[k];
+  input.disabled = k === 'error' && !Object.keys(P.errors).length;
+  input.addEventListener('change', () => { state[k] = input.checked; draw(); });
+}
+toggles('quantities', P.quantities, state.quantities);
+toggles('fractions', P.fractions, state.fractions);
+filters();
+draw();
+})();
+</script>
+</body>
+</html>
+"""
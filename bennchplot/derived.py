@@ -0,0 +1,272 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Registry of quantities derived from aggregated benchmark data
+"""
+import numpy as np
+
+
+class Derived():
+    """
+    Quantity computed from other quantities.
+
+    Attributes
+    ----------
+    name : str
+        name of the quantity
+    func : callable
+        function receiving a `Quantities` mapping and returning the values
+        of the quantity as array
+    depends : tuple of str
+        names of the quantities accessed by func
+    """
+
+    def __init__(self, name, func, depends=()):
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+
+    def __repr__(self):
+        return f'Derived({self.name!r}, depends={self.depends!r})'
+
+
+class Quantities():
+    """
+    Mapping resolving quantities, computing derived ones on demand.
+
+    Every quantity is computed at most once; computed values are kept in
+    `computed`.
+
+    Attributes
+    ----------
+    lookup : callable
+        function returning the values of a stored quantity, raising
+        KeyError if it is not stored
+    registry : dict
+        derived quantities by name
+    """
+
+    def __init__(self, lookup, registry):
+        self.lookup = lookup
+        self.registry = registry
+        self.computed = {}
+
+    def __getitem__(self, name):
+        if name in self.computed:
+            return self.computed[name]
+        try:
+            return self.lookup(name)
+        except KeyError:
+            if name not in self.registry:
+                raise KeyError(f'Unknown quantity {name!r}.')
+        value = self.registry[name].func(self)
+        self.computed[name] = value
+        return value
+
+
+REGISTRY = {}
+
+
+def register(name, func=None, depends=(), registry=None):
+    """
+    Register a derived quantity.
+
+    Can be used as decorator if func is not given.
+
+    Attributes
+    ----------
+    name : str
+        name of the quantity
+    func : callable, optional
+        function receiving a `Quantities` mapping `q`, from which other
+        quantities are retrieved as arrays via `q['name']`, and returning
+        the values of the new quantity
+    depends : list of str
+        names of quantities accessed by func
+    registry : dict, optional
+        registry to add the quantity to, defaults to the global one
+    """
+    if registry is None:
+        registry = REGISTRY
+
+    def decorator(func):
+        registry[name] = Derived(name, func, depends)
+        return func
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def requirements(names, registry=None):
+    """
+    Resolve quantities to the stored quantities they are computed from.
+
+    Attributes
+    ----------
+    names : list of str
+        quantity names, stored or derived
+    registry : dict, optional
+        derived quantities by name, defaults to the global registry
+
+    Returns
+    -------
+    required : list of str
+        names of quantities that are not derived
+    """
+    if registry is None:
+        registry = REGISTRY
+    required = []
+    stack = list(names)
+    seen = set()
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        if name in registry:
+            stack.extend(registry[name].depends)
+        else:
+            required.append(name)
+    return sorted(required)
+
+
+def _ratio(name, num, den, scale=1):
+    register(name, lambda q: scale * q[num] / q[den], depends=(num, den))
+
+
+_ratio('sim_factor', 'time_simulate', 'model_time_sim')
+_ratio('sim_factor_std', 'time_simulate_std', 'model_time_sim')
+
+register('num_nvp',
+         lambda q: q['threads_per_task'] * q['tasks_per_node'],
+         depends=('threads_per_task', 'tasks_per_node'))
+
+register('time_construction_create+time_construction_connect',
+         lambda q: q['py_time_create'] + q['py_time_connect'],
+         depends=('py_time_create', 'py_time_connect'))
+register('time_construction_create+time_construction_connect_std',
+         lambda q: np.sqrt(q['time_construction_create_std']**2 +
+                           q['time_construction_connect_std']**2),
+         depends=('time_construction_create_std',
+                  'time_construction_connect_std'))
+
+PHASES = ['update', 'communicate', 'deliver', 'collocate']
+_phase_timers = ['time_' + phase + '_spike_data' for phase in PHASES]
+
+register('time_phase_total',
+         lambda q: sum(q[t] for t in _phase_timers),
+         depends=_phase_timers)
+register('time_phase_total_std',
+         lambda q: np.sqrt(sum(q[t + '_std']**2 for t in _phase_timers)),
+         depends=[t + '_std' for t in _phase_timers])
+_ratio('phase_total_factor', 'time_phase_total', 'model_time_sim')
+_ratio('phase_total_factor_std', 'time_phase_total_std', 'model_time_sim')
+
+for _phase, _timer in zip(PHASES, _phase_timers):
+    _ratio('phase_' + _phase + '_factor', _timer, 'model_time_sim')
+    _ratio('phase_' + _phase + '_factor_std', _timer + '_std',
+           'model_time_sim')
+    _ratio('frac_phase_' + _phase, _timer, 'time_phase_total', scale=100)
+    _ratio('frac_phase_' + _phase + '_std', _timer + '_std',
+           'time_phase_total', scale=100)
+
+_ratio('total_memory_per_node', 'total_memory', 'num_nodes')
+_ratio('total_memory_per_node_std', 'total_memory_std', 'num_nodes')
+
+# Memory is measured in kB per rank and summed over the ranks of a run
+MEMORY_UNIT = 1024
+
+register('num_ranks',
+         lambda q: q['num_nodes'] * q['tasks_per_node'],
+         depends=('num_nodes', 'tasks_per_node'))
+# all virtual processes of a run, unlike num_nvp, which counts those per node
+register('num_vp',
+         lambda q: q['num_ranks'] * q['threads_per_task'],
+         depends=('num_ranks', 'threads_per_task'))
+
+_ratio('bytes_per_connection', 'network_memory', 'num_connections',
+       scale=MEMORY_UNIT)
+_ratio('bytes_per_connection_std', 'network_memory_std', 'num_connections',
+       scale=MEMORY_UNIT)
+_ratio('network_memory_per_vp', 'network_memory', 'num_vp')
+_ratio('network_memory_per_vp_std', 'network_memory_std', 'num_vp')
+_ratio('total_memory_per_rank', 'total_memory', 'num_ranks')
+_ratio('total_memory_per_rank_std', 'total_memory_std', 'num_ranks')
+for _memory in ['base_memory', 'network_memory']:
+    _ratio(_memory + '_per_node', _memory, 'num_nodes')
+    _ratio(_memory + '_per_node_std', _memory + '_std', 'num_nodes')
+
+# memory neither taken by the kernel at startup nor by the network
+register('other_memory',
+         lambda q: q['total_memory'] - q['base_memory'] - q['network_memory'],
+         depends=('total_memory', 'base_memory', 'network_memory'))
+register('other_memory_std',
+         lambda q: np.sqrt(q['total_memory_std']**2 +
+                           q['base_memory_std']**2 +
+                           q['network_memory_std']**2),
+         depends=('total_memory_std', 'base_memory_std',
+                  'network_memory_std'))
+
+_ratio('memory_overhead_factor', 'total_memory', 'base_memory')
+register('memory_overhead_factor_std',
+         lambda q: q['memory_overhead_factor'] * np.sqrt(
+             (q['total_memory_std'] / q['total_memory'])**2 +
+             (q['base_memory_std'] / q['base_memory'])**2),
+         depends=('memory_overhead_factor', 'total_memory', 'base_memory',
+                  'total_memory_std', 'base_memory_std'))
+
+for _memory in ['base', 'network', 'other']:
+    _ratio('frac_memory_' + _memory, _memory + '_memory', 'total_memory',
+           scale=100)
+    _ratio('frac_memory_' + _memory + '_std', _memory + '_memory_std',
+           'total_memory', scale=100)
+
+# Cost of a run, counting one core per virtual process. The time to solution
+# comprises network construction and state propagation. Energy requires the
+# power drawn per node in W, `power_per_node`, which is registered by
+# `Plot.power_model`, and is given in kWh.
+SECONDS_PER_HOUR = 3600.
+
+register('time_to_solution',
+         lambda q: (q['time_construction_create+time_construction_connect'] +
+                    q['time_simulate']),
+         depends=('time_construction_create+time_construction_connect',
+                  'time_simulate'))
+register('time_to_solution_std',
+         lambda q: np.sqrt(
+             q['time_construction_create+time_construction_connect_std']**2 +
+             q['time_simulate_std']**2),
+         depends=('time_construction_create+time_construction_connect_std',
+                  'time_simulate_std'))
+
+
+def _product(name, resource, time, scale):
+    register(name, lambda q: scale * q[resource] * q[time],
+             depends=(resource, time))
+    register(name + '_std', lambda q: scale * q[resource] * q[time + '_std'],
+             depends=(resource, time + '_std'))
+
+
+for _suffix, _time, _energy in [
+        ('', 'time_to_solution', 'energy_to_solution'),
+        ('_per_model_time', 'sim_factor', 'energy_per_model_time')]:
+    _product('node_hours' + _suffix, 'num_nodes', _time,
+             1. / SECONDS_PER_HOUR)
+    _product('core_hours' + _suffix, 'num_vp', _time, 1. / SECONDS_PER_HOUR)
+    _product(_energy, 'power_per_node', 'node_hours' + _suffix, 1e-3)
@@ -0,0 +1,108 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Batched weighted least-squares fits of linear models
+"""
+import numpy as np
+
+
+def wls(X, Y, sigma=None):
+    """
+    Fit a linear model to several data sets at once.
+
+    Solves the weighted normal equations for all columns of Y in one
+    batched operation. Columns whose uncertainties are all finite and
+    positive are weighted by 1 / sigma**2 and their parameter covariance is
+    absolute; other columns are fitted unweighted and their covariance is
+    scaled by the residual variance. Rows with non-finite values in Y are
+    ignored for the respective column.
+
+    Attributes
+    ----------
+    X : numpy.ndarray
+        design matrix of shape (n, p), shared by all data sets
+    Y : numpy.ndarray
+        data of shape (n, k), one data set per column
+    sigma : numpy.ndarray, optional
+        standard deviations of Y, shape (n, k)
+
+    Returns
+    -------
+    coef : numpy.ndarray
+        fitted parameters, shape (k, p)
+    cov : numpy.ndarray
+        parameter covariance matrices, shape (k, p, p)
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    n, p = X.shape
+
+    valid = np.isfinite(Y)
+    if sigma is None:
+        absolute = np.zeros(Y.shape[1], dtype=bool)
+        W = np.ones_like(Y)
+    else:
+        sigma = np.asarray(sigma, dtype=float).reshape(Y.shape)
+        good = np.isfinite(sigma) & (sigma > 0)
+        absolute = np.all(good | ~valid, axis=0)
+        with np.errstate(divide='ignore'):
+            W = np.where(absolute, 1. / sigma**2, 1.)
+    W = np.where(valid, W, 0.)
+    Y0 = np.where(valid, Y, 0.)
+
+    A = np.einsum('np,nk,nq->kpq', X, W, X)
+    b = np.einsum('np,nk,nk->kp', X, W, Y0)
+    A_inv = np.linalg.pinv(A)
+    coef = np.einsum('kpq,kq->kp', A_inv, b)
+
+    dof = valid.sum(axis=0) - p
+    residuals = np.where(valid, Y0 - X @ coef.T, 0.)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(absolute, 1.,
+                         (W * residuals**2).sum(axis=0) / dof)
+    scale = np.where(dof > 0, scale, np.nan)
+    cov = A_inv * scale[:, None, None]
+    return coef, cov
+
+
+def predict(X, coef, cov):
+    """
+    Evaluate fitted linear models with their standard errors.
+
+    Attributes
+    ----------
+    X : numpy.ndarray
+        design matrix of shape (m, p) at which to evaluate
+    coef : numpy.ndarray
+        fitted parameters, shape (k, p)
+    cov : numpy.ndarray
+        parameter covariance matrices, shape (k, p, p)
+
+    Returns
+    -------
+    y : numpy.ndarray
+        model values, shape (m, k)
+    y_std : numpy.ndarray
+        standard errors of the model values, shape (m, k)
+    """
+    X = np.asarray(X, dtype=float)
+    y = X @ coef.T
+    var = np.einsum('mp,kpq,mq->mk', X, cov, X)
+    return y, np.sqrt(np.clip(var, 0, None))
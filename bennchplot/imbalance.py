@@ -0,0 +1,170 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Load imbalance between MPI ranks and threads
+
+Per-rank timer dumps hold one row per worker (MPI rank and, optionally,
+thread) and repetition, with the configuration keys of `schema.GROUP_KEYS`,
+a repetition identifier (`rng_seed` or the file UUID) and timers named as in
+`schema.SCHEMA`. For every configuration and repetition, the timers are
+reduced over all workers to their minimum, maximum and mean and to the
+imbalance ratio max / mean, which is 1 for perfectly balanced load. These
+statistics are then aggregated over repetitions to mean and standard
+deviation. All reductions are grouped operations over the full table.
+"""
+import pandas as pd
+
+try:
+    from . import derived
+    from . import loader
+    from . import schema
+except ImportError:
+    import derived
+    import loader
+    import schema
+
+WORKER_COLUMNS = [
+    schema.Column('rank', 'worker', 'int32', aliases=('mpi_rank',)),
+    schema.Column('thread', 'worker', 'int32', aliases=('thread_id',)),
+]
+
+STATISTICS = ('min', 'max', 'mean', 'imbalance')
+
+PHASE_TIMERS = ['time_' + phase + '_spike_data' for phase in derived.PHASES]
+
+# columns identifying a repetition of a configuration
+REPETITION_KEYS = ('uuid', 'rng_seed')
+
+
+def read_rank_data(data_file, timers=None, max_workers=None):
+    """
+    Read per-rank timer dumps.
+
+    Attributes
+    ----------
+    data_file : str or list
+        file, directory, glob pattern or list thereof, see
+        `loader.resolve_data_files`
+    timers : list, optional
+        timers to be read; the timers of the update phases if not given
+    max_workers : int, optional
+        number of workers used to read the files concurrently
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        normalized per-rank data
+
+    Raises
+    ------
+    FileNotFoundError
+    ValueError
+    """
+    columns = schema.select_columns(timers or PHASE_TIMERS) + WORKER_COLUMNS
+    df = loader.read_data_files(data_file, max_workers=max_workers,
+                                **schema.read_csv_kwargs(columns))
+    return normalize(df, columns)
+
+
+def normalize(df, columns=None):
+    """
+    Normalize per-rank data, see `schema.normalize`.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        raw per-rank data
+    columns : list of schema.Column, optional
+        columns of the data; all known timers and worker columns if not
+        given
+
+    Returns
+    -------
+    df : pandas.DataFrame
+
+    Raises
+    ------
+    ValueError
+    """
+    if columns is None:
+        columns = schema.select_columns() + WORKER_COLUMNS
+    present = [c for c in columns
+               if c.group != 'worker' or
+               any(n in df for n in (c.name,) + c.aliases)]
+    if not any(c.name == 'rank' for c in present):
+        raise ValueError('Per-rank data need a `rank` column.')
+    return schema.normalize(df, present)
+
+
+def rank_statistics(df, timers):
+    """
+    Reduce timers over the workers of every configuration and repetition.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        normalized per-rank data
+    timers : list
+        timers to be reduced
+
+    Returns
+    -------
+    stats : pandas.DataFrame
+        indexed by configuration and repetition, with columns
+        `<timer>_<statistic>` for all `STATISTICS`
+    """
+    keys = schema.GROUP_KEYS + [k for k in REPETITION_KEYS if k in df]
+    grouped = df.groupby(keys, sort=True, observed=True)[timers]
+    reduced = {'min': grouped.min(), 'max': grouped.max(),
+               'mean': grouped.mean()}
+    reduced['imbalance'] = reduced['max'] / reduced['mean']
+    stats = pd.concat(reduced, axis=1)
+    stats.columns = [f'{timer}_{stat}' for stat, timer in stats.columns]
+    return stats[[f'{timer}_{stat}' for timer in timers
+                  for stat in STATISTICS]]
+
+
+def imbalance(df, timers=None):
+    """
+    Load-imbalance statistics per configuration.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        normalized per-rank data
+    timers : list, optional
+        timers to be analyzed; all timers in the data if not given
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        one row per configuration with the configuration keys and columns
+        `<timer>_<statistic>` and `<timer>_<statistic>_std` (mean and
+        standard deviation over repetitions)
+    """
+    if timers is None:
+        timers = [c.name for c in schema.COLUMNS
+                  if c.group in ('timer', 'phase_timer') and c.name in df and
+                  df[c.name].notna().any()]
+    stats = rank_statistics(df, timers)
+    grouped = stats.groupby(level=schema.GROUP_KEYS, sort=True)
+    mean = grouped.mean()
+    std = grouped.std().add_suffix('_std')
+    agg = pd.concat([mean, std], axis=1)
+    agg = agg[[n + s for n in stats.columns for s in ('', '_std')]]
+    return agg.reset_index()
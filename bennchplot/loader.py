@@ -0,0 +1,263 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Loading of beNNch result files
+"""
+import glob
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pandas as pd
+
+
+def resolve_data_files(data_file):
+    """
+    Expand a data specification into a sorted list of csv files.
+
+    Attributes
+    ----------
+    data_file : str or list
+        path to a single file, a directory containing beNNch result files,
+        a glob pattern or a list of any of those
+
+    Returns
+    -------
+    files : list
+        paths of all csv files found
+
+    Raises
+    ------
+    FileNotFoundError
+    """
+    if isinstance(data_file, (str, os.PathLike)):
+        data_file = [data_file]
+
+    files = []
+    for entry in data_file:
+        entry = os.fspath(entry)
+        if os.path.isdir(entry):
+            matches = glob.glob(os.path.join(entry, '*.csv'))
+        elif glob.has_magic(entry):
+            matches = glob.glob(entry)
+        elif os.path.isfile(entry):
+            matches = [entry]
+        else:
+            raise FileNotFoundError(entry)
+        files.extend(sorted(matches))
+
+    if not files:
+        raise FileNotFoundError(data_file)
+    return files
+
+
+def run_uuid(data_file):
+    """
+    UUID of the run of a result file, named `<uuid>.csv` by beNNch.
+    """
+    return os.path.splitext(os.path.basename(data_file))[0]
+
+
+def executor_class(executor):
+    """
+    Worker pool class of an executor name.
+
+    Attributes
+    ----------
+    executor : {'thread', 'process'}
+        kind of worker pool
+
+    Returns
+    -------
+    pool_cls : type
+
+    Raises
+    ------
+    ValueError
+    """
+    if executor == 'thread':
+        return ThreadPoolExecutor
+    if executor == 'process':
+        return ProcessPoolExecutor
+    raise ValueError(f'Unknown executor {executor!r}, ' +
+                     'use "thread" or "process".')
+
+
+def read_data_file(data_file, **read_csv_kwargs):
+    """
+    Read a single beNNch result file and tag its rows with the run UUID.
+
+    The UUID is taken from the file name, as beNNch names its result files
+    `<uuid>.csv`.
+
+    Attributes
+    ----------
+    data_file : str
+        path to csv file
+    read_csv_kwargs
+        additional keyword arguments passed to `pandas.read_csv`
+
+    Returns
+    -------
+    df : pandas.DataFrame
+    """
+    df = pd.read_csv(data_file, delimiter=',', **read_csv_kwargs)
+    df['uuid'] = run_uuid(data_file)
+    return df
+
+
+def read_data_files(data_file, max_workers=None, executor='thread',
+                    **read_csv_kwargs):
+    """
+    Read all beNNch result files into a single dataframe.
+
+    Files are parsed concurrently. The default thread pool is sufficient
+    as the C parser of pandas releases the GIL; a process pool can be
+    selected for very many small files where parsing is dominated by
+    Python overhead.
+
+    Attributes
+    ----------
+    data_file : str or list
+        file, directory, glob pattern or list thereof, see
+        `resolve_data_files`
+    max_workers : int, optional
+        number of concurrent workers, defaults to the executor's choice
+    executor : {'thread', 'process'}
+        kind of worker pool
+    read_csv_kwargs
+        additional keyword arguments passed to `pandas.read_csv`
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        concatenated rows of all files with an additional `uuid` column
+
+    Raises
+    ------
+    FileNotFoundError
+    ValueError
+    """
+    files = resolve_data_files(data_file)
+    pool_cls = executor_class(executor)
+
+    if len(files) == 1:
+        frames = [read_data_file(files[0], **read_csv_kwargs)]
+    else:
+        with pool_cls(max_workers=max_workers) as pool:
+            futures = [pool.submit(read_data_file, f, **read_csv_kwargs)
+                       for f in files]
+            frames = [future.result() for future in futures]
+
+    df = pd.concat(frames, ignore_index=True)
+    df['uuid'] = df['uuid'].astype('category')
+    return df
+
+
+def iter_data_chunks(data_file, chunksize, **read_csv_kwargs):
+    """
+    Read beNNch result files in chunks of bounded size.
+
+    Files are read one after another, such that at most chunksize rows are
+    held in memory at any time.
+
+    Attributes
+    ----------
+    data_file : str or list
+        file, directory, glob pattern or list thereof, see
+        `resolve_data_files`
+    chunksize : int
+        maximal number of rows per chunk
+    read_csv_kwargs
+        additional keyword arguments passed to `pandas.read_csv`
+
+    Yields
+    ------
+    df : pandas.DataFrame
+        rows of a chunk tagged with the run UUID
+
+    Raises
+    ------
+    FileNotFoundError
+    """
+    for path in resolve_data_files(data_file):
+        uuid = run_uuid(path)
+        with pd.read_csv(path, delimiter=',', chunksize=chunksize,
+                         **read_csv_kwargs) as reader:
+            for chunk in reader:
+                chunk['uuid'] = uuid
+                yield chunk
+
+
+def read_new_rows(data_file, offset=0, header=None, **read_csv_kwargs):
+    """
+    Read the rows appended to a result file since a previous read.
+
+    Only complete lines are read, such that rows currently being written
+    are picked up by the next call. A file shorter than the offset has been
+    truncated or rewritten since the previous read; its rows read before
+    cannot be told apart from the new ones, which raises an error.
+
+    Attributes
+    ----------
+    data_file : str
+        path to csv file
+    offset : int
+        byte offset up to which the file has been read before
+    header : list, optional
+        column names, read from the file if offset is 0
+    read_csv_kwargs
+        additional keyword arguments passed to `pandas.read_csv`
+
+    Returns
+    -------
+    df : pandas.DataFrame or None
+        new rows tagged with the run UUID, None if there are none
+    offset : int
+        byte offset up to which the file has been read
+    header : list
+        column names
+
+    Raises
+    ------
+    ValueError
+    """
+    if os.path.getsize(data_file) < offset:
+        raise ValueError(f'{data_file} is shorter than when it was read '
+                         'before; it has been truncated or rewritten and '
+                         'has to be loaded again.')
+    with open(data_file, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset, header
+    data = data[:end]
+
+    if header is None:
+        first = data.find(b'\n') + 1
+        header = data[:first].decode().strip().split(',')
+        data = data[first:]
+    new_offset = offset + end
+    if not data.strip():
+        return None, new_offset, header
+
+    df = pd.read_csv(io.BytesIO(data), delimiter=',', header=None,
+                     names=header, **read_csv_kwargs)
+    df['uuid'] = run_uuid(data_file)
+    return df, new_offset, header
@@ -0,0 +1,283 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Metadata sidecars of beNNch result files
+
+beNNch writes the metadata of a run (machine, software versions, model
+parameters) to a YAML file next to the result file, `<uuid>.yaml` beside
+`<uuid>.csv`. Nested mappings are flattened to keys joined by dots, e.g.
+`software.nest.version`, and all values are kept as strings, as in
+`store.ResultStore`. Parsed sidecars are cached by path, modification time
+and size, such that repeated loading only parses new or changed files.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import loader
+except ImportError:
+    import loader
+
+SUFFIXES = ('.yaml', '.yml')
+
+# parsed sidecars by (path, modification time, size)
+_CACHE = {}
+MAX_CACHED = 4096
+
+
+def sidecar(data_file):
+    """
+    Path of the metadata sidecar of a result file.
+
+    Attributes
+    ----------
+    data_file : str
+        path of a result file
+
+    Returns
+    -------
+    path : str or None
+        path of the sidecar, None if there is none
+    """
+    base = os.path.splitext(os.fspath(data_file))[0]
+    for suffix in SUFFIXES:
+        if os.path.isfile(base + suffix):
+            return base + suffix
+    return None
+
+
+def flatten(mapping, prefix=''):
+    """
+    Flatten nested mappings to keys joined by dots and string values.
+
+    Attributes
+    ----------
+    mapping : dict
+        nested metadata
+    prefix : str
+        prefix of all keys
+
+    Returns
+    -------
+    flat : dict
+        metadata without null values
+    """
+    flat = {}
+    for key, value in mapping.items():
+        key = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, key + '.'))
+        elif value is not None:
+            flat[key] = str(value)
+    return flat
+
+
+def read_sidecar(path):
+    """
+    Read a metadata sidecar.
+
+    Attributes
+    ----------
+    path : str
+        path of the YAML file
+
+    Returns
+    -------
+    metadata : dict
+        flattened metadata
+
+    Raises
+    ------
+    ValueError
+    """
+    import yaml
+    loader_cls = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path) as f:
+        content = yaml.load(f, Loader=loader_cls)
+    if content is None:
+        return {}
+    if not isinstance(content, dict):
+        raise ValueError(f'Metadata in {path} is not a mapping.')
+    return flatten(content)
+
+
+def read_metadata(files, max_workers=None, executor='thread'):
+    """
+    Read the metadata sidecars of result files.
+
+    Sidecars that were not parsed before or changed since are parsed
+    concurrently, see `loader.read_data_files` for the choice of workers.
+
+    Attributes
+    ----------
+    files : list
+        paths of result files
+    max_workers : int, optional
+        number of concurrent workers, defaults to the executor's choice
+    executor : {'thread', 'process'}
+        kind of worker pool
+
+    Returns
+    -------
+    metadata : pandas.DataFrame
+        one row per run with a sidecar, indexed by UUID, one column per
+        metadata key; NaN where a run lacks a key
+
+    Raises
+    ------
+    ValueError
+    """
+    entries = {}
+    for path in files:
+        side = sidecar(path)
+        if side is not None:
+            stat = os.stat(side)
+            entries[loader.run_uuid(path)] = (
+                os.path.abspath(side), stat.st_mtime_ns, stat.st_size)
+
+    missing = [e for e in dict.fromkeys(entries.values()) if e not in _CACHE]
+    if len(_CACHE) + len(missing) > MAX_CACHED:
+        _CACHE.clear()
+    if len(missing) == 1:
+        _CACHE[missing[0]] = read_sidecar(missing[0][0])
+    elif missing:
+        with loader.executor_class(executor)(max_workers=max_workers) as pool:
+            parsed = pool.map(read_sidecar, [e[0] for e in missing])
+            _CACHE.update(zip(missing, parsed))
+
+    return pd.DataFrame.from_records(
+        [_CACHE[e] for e in entries.values()], index=pd.Index(
+            list(entries), name='uuid', dtype=object))
+
+
+def select(metadata, required):
+    """
+    Select runs by metadata.
+
+    Attributes
+    ----------
+    metadata : pandas.DataFrame
+        metadata as returned by `read_metadata`
+    required : dict
+        required metadata values; a list of values selects runs matching
+        any of them
+
+    Returns
+    -------
+    uuids : pandas.Index
+        UUIDs of the selected runs
+    """
+    mask = np.ones(len(metadata), dtype=bool)
+    for key, value in required.items():
+        if key not in metadata:
+            mask[:] = False
+            break
+        mask &= metadata[key].isin(_as_strings(value)).to_numpy()
+    return metadata.index[mask]
+
+
+def filter_rows(df, required):
+    """
+    Select rows of benchmark data by attached metadata columns.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        benchmark data with metadata columns, see `attach`
+    required : dict
+        required metadata values; a list of values selects rows matching
+        any of them
+
+    Returns
+    -------
+    df : pandas.DataFrame
+
+    Raises
+    ------
+    ValueError
+    """
+    missing = [key for key in required if key not in df]
+    if missing:
+        raise ValueError(f'The data have no metadata {missing}.')
+    mask = np.ones(len(df), dtype=bool)
+    for key, value in required.items():
+        column = df[key]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # compare the categories only; code -1 selects False
+            hit = column.cat.categories.astype(str).isin(_as_strings(value))
+            mask &= np.append(hit, False)[column.cat.codes.to_numpy()]
+        else:
+            mask &= column.astype(str).isin(_as_strings(value)).to_numpy()
+    return df[mask].reset_index(drop=True)
+
+
+def _as_strings(value):
+    if not isinstance(value, (list, tuple, set)):
+        value = [value]
+    return [str(v) for v in value]
+
+
+def attach(df, metadata, keys=None):
+    """
+    Add metadata to the rows of benchmark data as categorical columns.
+
+    Rows are matched to runs by their `uuid`; the values of every key are
+    looked up once per run and broadcast to the rows through the codes of
+    the run. Keys which are already columns of the data are skipped.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        benchmark data with a `uuid` column
+    metadata : pandas.DataFrame
+        metadata as returned by `read_metadata`
+    keys : list, optional
+        metadata keys to be added; all keys if not given
+
+    Returns
+    -------
+    df : pandas.DataFrame
+
+    Raises
+    ------
+    ValueError
+    """
+    if keys is None:
+        keys = list(metadata.columns)
+    unknown = [key for key in keys if key not in metadata]
+    if unknown:
+        raise ValueError(f'Unknown metadata {unknown}.')
+    keys = [key for key in keys if key not in df]
+    if not keys:
+        return df
+
+    uuid = df['uuid']
+    if not isinstance(uuid.dtype, pd.CategoricalDtype):
+        uuid = uuid.astype('category')
+    run = metadata.reindex(uuid.cat.categories.astype(str))
+    codes = uuid.cat.codes.to_numpy()
+    columns = {}
+    for key in keys:
+        values = pd.Categorical(run[key])
+        # code -1 of missing UUIDs selects the appended missing value
+        value_codes = np.append(values.codes, -1)
+        columns[key] = pd.Categorical.from_codes(value_codes[codes],
+                                                 values.categories)
+    return df.assign(**columns)
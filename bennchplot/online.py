@@ -0,0 +1,125 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Online aggregation of benchmark data
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from . import schema
+except ImportError:
+    import schema
+
+
+class OnlineAggregator():
+    """
+    Running mean and standard deviation per configuration.
+
+    For every configuration and measured quantity, the number of values,
+    their mean and the sum of squared deviations from the mean (M2) are
+    kept. Batches of new rows are reduced group-wise and merged into this
+    state with the pairwise update of Chan et al., which is numerically
+    stable, unlike accumulating sums of squares. The cost of an update is
+    proportional to the number of new rows and configurations, independent
+    of the number of rows seen before.
+
+    Attributes
+    ----------
+    columns : list of schema.Column
+        columns of the data, as selected by `schema.select_columns`
+    keys : list, optional
+        columns identifying a configuration, see `schema.aggregate`
+    """
+
+    def __init__(self, columns, keys=None):
+        self.keys = list(keys or schema.GROUP_KEYS)
+        self.measured = [c.name for c in columns
+                         if c.group in schema.MEASURED_GROUPS]
+        self.dtypes = {c.name: c.dtype for c in columns}
+        self.count = None
+        self.mean = None
+        self.m2 = None
+
+    def update(self, df):
+        """
+        Merge a batch of normalized raw rows into the running aggregates.
+
+        Attributes
+        ----------
+        df : pandas.DataFrame
+            raw benchmark data, normalized with `schema.normalize`
+        """
+        if len(df) == 0:
+            return
+        grouped = df.groupby(self.keys, sort=False,
+                             observed=True)[self.measured]
+        count_b = grouped.count().astype('float64')
+        mean_b = grouped.mean().astype('float64')
+        m2_b = (grouped.var(ddof=0).astype('float64') * count_b).fillna(0.)
+        mean_b = mean_b.fillna(0.)
+
+        if self.count is None:
+            self.count, self.mean, self.m2 = count_b, mean_b, m2_b
+            return
+
+        index = self.count.index.union(count_b.index)
+        count_a = self.count.reindex(index, fill_value=0.).to_numpy()
+        mean_a = self.mean.reindex(index, fill_value=0.).to_numpy()
+        m2_a = self.m2.reindex(index, fill_value=0.).to_numpy()
+        n_b = count_b.reindex(index, fill_value=0.).to_numpy()
+        mu_b = mean_b.reindex(index, fill_value=0.).to_numpy()
+        m2b = m2_b.reindex(index, fill_value=0.).to_numpy()
+
+        count = count_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mu_b - mean_a
+            weight = np.where(count > 0, n_b / count, 0.)
+            mean = mean_a + delta * weight
+            m2 = m2_a + m2b + delta**2 * count_a * weight
+
+        self.count = pd.DataFrame(count, index=index, columns=self.measured)
+        self.mean = pd.DataFrame(mean, index=index, columns=self.measured)
+        self.m2 = pd.DataFrame(m2, index=index, columns=self.measured)
+
+    def result(self):
+        """
+        Aggregated data in the layout returned by `schema.aggregate`.
+
+        Returns
+        -------
+        df : pandas.DataFrame
+
+        Raises
+        ------
+        ValueError
+        """
+        if self.count is None:
+            raise ValueError('No data has been aggregated yet.')
+        count = self.count.sort_index()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.mean.sort_index().where(count > 0)
+            std = np.sqrt(self.m2.sort_index() / (count - 1)).where(count > 1)
+        agg = pd.concat([mean, std.add_suffix('_std')], axis=1)
+        agg = agg[[n + s for n in self.measured for s in ('', '_std')]]
+        agg = agg.astype({n + s: self.dtypes[n] for n in self.measured
+                          for s in ('', '_std')})
+        agg['num_repetitions'] = count.max(axis=1).astype('int32')
+        agg = agg.reset_index()
+        extra = [k for k in self.keys if k not in schema.GROUP_KEYS]
+        return agg.astype({k: 'category' for k in extra})
@@ -0,0 +1,447 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Scaling-law extrapolation and resource planning
+
+Every quantity is modelled as a linear combination of terms in the
+resources of a configuration, e.g. the update phase as a + b / V with the
+number of virtual processes V and spike communication as a + b log2(M) + c M
+with the number of MPI processes M, see `TERMS` and `MODELS`. Quantities
+sharing the same terms are fitted at once by `fitting.wls`, weighted by
+their standard deviations.
+
+State propagation is modelled per phase on the real-time factors
+`phase_<phase>_factor`; the time not covered by the phases is fitted as
+`sim_factor_unaccounted`, and the predicted `sim_factor` is the sum of all
+parts. Without phase timers, `sim_factor` is fitted directly.
+
+Uncertainty bands are confidence bands of the fitted models, assuming
+normally distributed parameters. Extrapolation is meaningful only along
+resources that were varied in the benchmarks; the fits are not constrained
+along the others.
+"""
+import itertools
+import statistics
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import derived
+    from . import fitting
+except ImportError:
+    import derived
+    import fitting
+
+RESOURCES = ('num_nodes', 'tasks_per_node', 'threads_per_task')
+
+# terms as functions of the numbers of nodes n, MPI processes m and virtual
+# processes v
+TERMS = {
+    'constant': lambda n, m, v: np.ones_like(n),
+    'inverse_vp': lambda n, m, v: 1. / v,
+    'inverse_nodes': lambda n, m, v: 1. / n,
+    'log_processes': lambda n, m, v: np.log2(m),
+    'processes': lambda n, m, v: m,
+    'tasks_per_node': lambda n, m, v: m / n,
+}
+
+PHASE_FACTORS = ['phase_' + phase + '_factor' for phase in derived.PHASES]
+REMAINDER = 'sim_factor_unaccounted'
+
+MODELS = {
+    'phase_update_factor': ('constant', 'inverse_vp'),
+    'phase_deliver_factor': ('constant', 'inverse_vp'),
+    'phase_collocate_factor': ('constant', 'inverse_vp'),
+    'phase_communicate_factor': ('constant', 'log_processes', 'processes'),
+    REMAINDER: ('constant', 'inverse_vp'),
+    'sim_factor': ('constant', 'inverse_vp', 'log_processes'),
+    'time_construction_create+time_construction_connect': (
+        'constant', 'inverse_vp', 'log_processes'),
+    'total_memory_per_node': ('constant', 'inverse_nodes', 'tasks_per_node'),
+    'base_memory_per_node': ('constant', 'tasks_per_node'),
+    'network_memory_per_node': ('constant', 'inverse_nodes',
+                                'tasks_per_node'),
+}
+
+CONSTRUCTION = 'time_construction_create+time_construction_connect'
+MEMORY = 'total_memory_per_node'
+
+
+def design(resources, terms):
+    """
+    Design matrix of a model.
+
+    Attributes
+    ----------
+    resources : dict
+        arrays of the numbers of nodes, tasks per node and threads per task,
+        keyed as in `RESOURCES`
+    terms : tuple
+        names of terms in `TERMS`
+
+    Returns
+    -------
+    X : numpy.ndarray
+        shape (configurations, terms)
+
+    Raises
+    ------
+    ValueError
+    """
+    unknown = [t for t in terms if t not in TERMS]
+    if unknown:
+        raise ValueError(f'Unknown terms {unknown}, use any of '
+                         f'{list(TERMS)}.')
+    n = np.asarray(resources['num_nodes'], dtype=float)
+    m = n * np.asarray(resources['tasks_per_node'], dtype=float)
+    v = m * np.asarray(resources['threads_per_task'], dtype=float)
+    return np.column_stack([TERMS[t](n, m, v) for t in terms])
+
+
+class ScalingModel():
+    """
+    Scaling laws fitted to the aggregated data of a plot.
+
+    Attributes
+    ----------
+    B : Plot
+        plot object holding aggregated data with the configuration keys
+        in `RESOURCES`
+    models : dict, optional
+        terms per quantity, added to or replacing those of `MODELS`;
+        quantities not available in the data are skipped
+
+    Raises
+    ------
+    ValueError
+    """
+
+    def __init__(self, B, models=None):
+        self.models = dict(MODELS, **(models or {}))
+        missing = [r for r in RESOURCES if r not in B.df]
+        if missing:
+            raise ValueError(f'The data have no resources {missing}.')
+        resources = {r: B.df[r].to_numpy() for r in RESOURCES}
+        self.observed = {r: np.unique(v) for r, v in resources.items()}
+
+        data = {}
+        for q in self.models:
+            try:
+                y = B.get_quantity(q).to_numpy(dtype=float)
+                y_std = B.get_quantity(q + '_std').to_numpy(dtype=float)
+            except KeyError:
+                continue
+            if np.isfinite(y).any():
+                data[q] = (y, y_std)
+
+        self.parts = {}
+        if all(q in data for q in PHASE_FACTORS) and 'sim_factor' in data:
+            # phases and time_simulate are correlated, fit unweighted
+            remainder = data['sim_factor'][0] - sum(
+                data[q][0] for q in PHASE_FACTORS)
+            data[REMAINDER] = (remainder, np.full_like(remainder, np.nan))
+            self.parts['sim_factor'] = PHASE_FACTORS + [REMAINDER]
+            del data['sim_factor']
+        else:
+            data.pop(REMAINDER, None)
+        if not data:
+            raise ValueError('None of the modelled quantities is available.')
+
+        self.coef = {}
+        self.cov = {}
+        by_terms = {}
+        for q in data:
+            by_terms.setdefault(tuple(self.models[q]), []).append(q)
+        for terms, quantities in by_terms.items():
+            X = design(resources, terms)
+            Y = np.column_stack([data[q][0] for q in quantities])
+            sigma = np.column_stack([data[q][1] for q in quantities])
+            coef, cov = fitting.wls(X, Y, sigma)
+            for i, q in enumerate(quantities):
+                self.coef[q] = coef[i]
+                self.cov[q] = cov[i]
+
+    @property
+    def quantities(self):
+        """
+        Quantities that can be predicted.
+        """
+        return list(self.coef) + list(self.parts)
+
+    def _defaults(self, values):
+        """
+        Candidate values of the resources, the observed ones if not given.
+        """
+        resolved = []
+        for name, value in zip(RESOURCES, values):
+            if value is None:
+                if len(self.observed[name]) != 1:
+                    raise ValueError(f'{name} varies in the data and must '
+                                     'be given.')
+                value = self.observed[name]
+            resolved.append(np.atleast_1d(np.asarray(value, dtype=float)))
+        return resolved
+
+    def predict(self, num_nodes, tasks_per_node=None, threads_per_task=None,
+                confidence=0.95):
+        """
+        Predict all quantities for given resources.
+
+        Attributes
+        ----------
+        num_nodes, tasks_per_node, threads_per_task : int or array_like
+            resources, broadcast against each other; the values of the data
+            are used for resources not given which do not vary there
+        confidence : float
+            confidence level of the bands
+
+        Returns
+        -------
+        prediction : pandas.DataFrame
+            the resources, the number of virtual processes `num_vp` and per
+            quantity its value, `_std`, `_low` and `_high`
+
+        Raises
+        ------
+        ValueError
+        """
+        resources = dict(zip(RESOURCES, np.broadcast_arrays(
+            *self._defaults((num_nodes, tasks_per_node, threads_per_task)))))
+        z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        columns = dict(resources)
+        columns['num_vp'] = np.prod(list(resources.values()), axis=0)
+
+        by_terms = {}
+        for q in self.coef:
+            by_terms.setdefault(tuple(self.models[q]), []).append(q)
+        values = {}
+        for terms, quantities in by_terms.items():
+            X = design(resources, terms)
+            y, y_std = fitting.predict(
+                X, np.stack([self.coef[q] for q in quantities]),
+                np.stack([self.cov[q] for q in quantities]))
+            for i, q in enumerate(quantities):
+                values[q] = (y[:, i], y_std[:, i])
+        for q, parts in self.parts.items():
+            # parts are fitted independently
+            values[q] = (sum(values[p][0] for p in parts),
+                         np.sqrt(sum(values[p][1]**2 for p in parts)))
+
+        for q in self.quantities:
+            y, y_std = values[q]
+            columns[q] = y
+            columns[q + '_std'] = y_std
+            columns[q + '_low'] = y - z * y_std
+            columns[q + '_high'] = y + z * y_std
+        return pd.DataFrame(columns)
+
+    def plan(self, model_time, num_nodes, tasks_per_node=None,
+             threads_per_task=None, max_memory_per_node=None,
+             cores_per_node=None, confidence=0.95):
+        """
+        Rank candidate configurations of a production run by node-hours.
+
+        All combinations of the candidate resources are predicted. The
+        wall time of a run is the construction time, if modelled, plus
+        the predicted `sim_factor` times the model time; a configuration is
+        feasible if the upper end of the band of `total_memory_per_node`
+        stays below the memory cap.
+
+        Attributes
+        ----------
+        model_time : float
+            simulated model time, in the units of `model_time_sim` of the
+            data, i.e. after `time_scaling`
+        num_nodes, tasks_per_node, threads_per_task : int or list
+            candidate resources; the values of the data are used for
+            resources not given which do not vary there
+        max_memory_per_node : float, optional
+            memory cap per node, in the units of `total_memory`
+        cores_per_node : int, optional
+            if given, configurations with more tasks times threads per node
+            are left out
+        confidence : float
+            confidence level of the bands
+
+        Returns
+        -------
+        plan : pandas.DataFrame
+            one row per candidate with its predictions, `wall_time` and
+            `node_hours` with their `_std`, `_low` and `_high`, and
+            `feasible`; feasible candidates first, by node-hours
+
+        Raises
+        ------
+        ValueError
+        """
+        candidates = self._defaults((num_nodes, tasks_per_node,
+                                     threads_per_task))
+        grid = np.array(list(itertools.product(*candidates)), dtype=float)
+        if cores_per_node is not None:
+            grid = grid[grid[:, 1] * grid[:, 2] <= cores_per_node]
+        if 'sim_factor' not in self.quantities:
+            raise ValueError('Planning requires a model of sim_factor.')
+        if max_memory_per_node is not None and MEMORY not in self.coef:
+            raise ValueError(f'A memory cap requires a model of {MEMORY}.')
+
+        plan = self.predict(*grid.T, confidence=confidence)
+        z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        time = plan['sim_factor'] * model_time
+        var = (plan['sim_factor_std'] * model_time)**2
+        if CONSTRUCTION in self.coef:
+            time = time + plan[CONSTRUCTION]
+            var = var + plan[CONSTRUCTION + '_std']**2
+        for name, scale in [('wall_time', 1.),
+                            ('node_hours', plan['num_nodes'] / 3600.)]:
+            plan[name] = time * scale
+            plan[name + '_std'] = np.sqrt(var) * scale
+            plan[name + '_low'] = plan[name] - z * plan[name + '_std']
+            plan[name + '_high'] = plan[name] + z * plan[name + '_std']
+
+        feasible = np.isfinite(plan['node_hours'].to_numpy())
+        if max_memory_per_node is not None:
+            feasible &= (plan[MEMORY + '_high'] <= max_memory_per_node
+                         ).to_numpy()
+        plan['feasible'] = feasible
+        return plan.sort_values(['feasible', 'node_hours'],
+                                ascending=[False, True],
+                                ignore_index=True)
+
+    def min_nodes(self, max_memory_per_node, tasks_per_node=None,
+                  threads_per_task=None, max_nodes=4096, confidence=0.95):
+        """
+        Smallest number of nodes on which a run fits into memory.
+
+        This is the out-of-memory boundary: on fewer nodes, the upper end
+        of the band of `total_memory_per_node` exceeds the memory cap.
+
+        Attributes
+        ----------
+        max_memory_per_node : float
+            memory cap per node, in the units of `total_memory`
+        tasks_per_node, threads_per_task : int, optional
+            resources; the values of the data are used if not given and they
+            do not vary there
+        max_nodes : int
+            largest number of nodes considered
+        confidence : float
+            confidence level of the bands
+
+        Returns
+        -------
+        num_nodes : int
+
+        Raises
+        ------
+        ValueError
+        """
+        if MEMORY not in self.coef:
+            raise ValueError(f'The boundary requires a model of {MEMORY}.')
+        nodes = np.arange(1, max_nodes + 1)
+        prediction = self.predict(nodes, tasks_per_node, threads_per_task,
+                                  confidence)
+        fits = (prediction[MEMORY + '_high'] <= max_memory_per_node
+                ).to_numpy()
+        if not fits.any():
+            raise ValueError(f'The run does not fit into memory on up to '
+                             f'{max_nodes} nodes.')
+        return int(nodes[np.argmax(fits)])
+
+    def recommend(self, model_time, num_nodes, **kwargs):
+        """
+        Feasible configuration with the fewest node-hours, see `plan`.
+
+        Returns
+        -------
+        configuration : pandas.Series
+            row of `plan`
+
+        Raises
+        ------
+        ValueError
+        """
+        plan = self.plan(model_time, num_nodes, **kwargs)
+        if not plan['feasible'].any():
+            raise ValueError('No candidate configuration is feasible.')
+        return plan.iloc[0]
+
+
+def pareto(time, cost):
+    """
+    Configurations on the Pareto front of time and cost.
+
+    A configuration is on the front if no other one is at least as fast
+    and cheaper, or faster and at most as expensive.
+
+    Attributes
+    ----------
+    time, cost : array_like
+        time to solution (or real-time factor) and cost per configuration
+
+    Returns
+    -------
+    front : numpy.ndarray
+        boolean mask of the configurations on the front; configurations
+        with non-finite values are never on it
+    """
+    time = np.asarray(time, dtype=float)
+    cost = np.asarray(cost, dtype=float)
+    order = np.lexsort((cost, time))
+    order = order[np.isfinite(time[order]) & np.isfinite(cost[order])]
+    cost = cost[order]
+    # cheaper than all faster configurations
+    best = np.minimum.accumulate(cost)
+    on_front = np.ones(len(order), dtype=bool)
+    on_front[1:] = cost[1:] < best[:-1]
+    front = np.zeros(len(time), dtype=bool)
+    front[order[on_front]] = True
+    return front
+
+
+def plot_prediction(prediction, quantity, axis, x_axis='num_nodes',
+                    color=None, label=None, alpha=0.3, limit=None):
+    """
+    Plot a predicted quantity with its uncertainty band.
+
+    Attributes
+    ----------
+    prediction : pandas.DataFrame
+        output of `ScalingModel.predict`
+    quantity : str
+        predicted quantity
+    axis : axis object
+        axis object used when plotting
+    x_axis : str
+        column of prediction on the x-axis
+    color : str, optional
+    label : str, optional
+    alpha : float
+        alpha value of the band
+    limit : float, optional
+        drawn as horizontal line, e.g. the memory available per node
+    """
+    prediction = prediction.sort_values(x_axis)
+    x = prediction[x_axis].to_numpy()
+    line, = axis.plot(x, prediction[quantity].to_numpy(), color=color,
+                      label=label, linestyle='--')
+    axis.fill_between(x, prediction[quantity + '_low'].to_numpy(),
+                      prediction[quantity + '_high'].to_numpy(),
+                      color=line.get_color(), alpha=alpha, linewidth=0)
+    if limit is not None:
+        axis.axhline(limit, color='k', linestyle=':', linewidth=1)
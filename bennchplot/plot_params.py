@@ -17,9 +17,11 @@ SPDX-License-Identifier: GPL-3.0-or-later
 
 """
 Default parameters for plotting
-"""
-import tol_colors
 
+The colour sets `bright`, `vibrant` and `light` and the colour table
+`color_params` are created on first access, since importing `tol_colors`
+loads matplotlib.
+"""
 size_factor = 1.3
 matplotlib_params = {
     'text.latex.preamble': ['\\usepackage{gensymb}'],
@@ -40,36 +42,66 @@ additional_params = {
     'figsize_double': [12.2, 6.1 * 1.1]
 }
 
-bright = tol_colors.tol_cset('bright')
-vibrant = tol_colors.tol_cset('vibrant')
-light = tol_colors.tol_cset('light')
+_COLOR_SETS = ('bright', 'vibrant', 'light')
+
+
+def _color_params(light):
+    return {
+        'wall_time_total': light.pale_grey,
+        'sim_factor': light.pink,
+        'phase_total_factor': light.orange,
+        'time_simulate': light.pink,
+        'time_construction_create+time_construction_connect': light.light_cyan,
+        'time_construction': light.light_cyan,
+        'py_time_create': light.pear,
+        'time_construction_create': light.pear,
+        'py_time_connect': light.olive,
+        'time_construction_connect': light.olive,
+        'time_communicate_prepare': light.mint,
+        'time_gather_target_data': light.light_yellow,
+        'time_communicate_target_data': light.orange,
+        'time_update_spike_data': light.orange,
+        'time_gather_spike_data': light.light_cyan,
+        'time_deliver_spike_data': light.light_blue,
+        'time_communicate_spike_data': light.mint,
+        'wall_time_phase_collocate': light.light_yellow,
+        'time_collocate_spike_data': light.light_yellow,
+        'frac_phase_update': light.orange,
+        'frac_phase_deliver': light.light_blue,
+        'frac_phase_communicate': light.mint,
+        'frac_phase_collocate': light.light_yellow,
+        'phase_update_factor': light.orange,
+        'phase_deliver_factor': light.light_blue,
+        'phase_communicate_factor': light.mint,
+        'phase_collocate_factor': light.light_yellow,
+        'total_memory': light.olive,
+        'total_memory_per_node': light.pear,
+        'total_memory_per_rank': light.light_cyan,
+        'bytes_per_connection': light.orange,
+        'network_memory_per_vp': light.light_blue,
+        'memory_overhead_factor': light.pink,
+        'frac_memory_base': light.pale_grey,
+        'frac_memory_network': light.light_blue,
+        'frac_memory_other': light.light_yellow,
+    }
+
+
+def __getattr__(name):
+    if name in _COLOR_SETS or name == 'color_params':
+        import tol_colors
+        for cset in _COLOR_SETS:
+            globals()[cset] = tol_colors.tol_cset(cset)
+        globals()['color_params'] = _color_params(globals()['light'])
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-color_params = {
-    'wall_time_total': light.pale_grey,
-    'sim_factor': light.pink,
-    'phase_total_factor': light.orange,
-    'time_simulate': light.pink,
-    'time_construction_create+time_construction_connect': light.light_cyan,
-    'time_update_spike_data': light.orange,
-    'time_deliver_spike_data': light.light_blue,
-    'time_communicate_spike_data': light.mint,
-    'wall_time_phase_collocate': light.light_yellow,
-    'frac_phase_update': light.orange,
-    'frac_phase_deliver': light.light_blue,
-    'frac_phase_communicate': light.mint,
-    'frac_phase_collocate': light.light_yellow,
-    'phase_update_factor': light.orange,
-    'phase_deliver_factor': light.light_blue,
-    'phase_communicate_factor': light.mint,
-    'phase_collocate_factor': light.light_yellow,
-    'total_memory': light.olive,
-    'total_memory_per_node': light.pear,
-}
 
 label_params = {
     'threads_per_node': 'OMP threads',
+    'threads_per_task': 'OMP threads',
     'tasks_per_node': 'MPI processes',
     'num_nodes': 'Nodes',
+    'num_nvp': 'Virtual processes',
     'wall_time_total': 'Total',
     'wall_time_preparation': 'Preparation',
     'wall_time_presim': 'Presimulation',
@@ -79,9 +111,19 @@ label_params = {
     'wall_time_phase_total': 'All phases',
     'time_update_spike_data': 'Update',
     'wall_time_phase_collocate': 'Collocation',
+    'time_collocate_spike_data': 'Collocation',
     'time_communicate_spike_data': 'Communication',
     'time_deliver_spike_data': 'Delivery',
     'time_construction_create+time_construction_connect': 'Network construction',
+    'time_construction': 'Network construction',
+    'py_time_create': 'Creation',
+    'py_time_connect': 'Connection',
+    'time_construction_create': 'Creation (kernel)',
+    'time_construction_connect': 'Connection (kernel)',
+    'time_communicate_prepare': 'Connection infrastructure',
+    'time_gather_target_data': 'Gather target data',
+    'time_communicate_target_data': 'Communicate target data',
+    'time_gather_spike_data': 'Spike exchange',
     'max_memory': 'Memory',
     'sim_factor': 'State propagation',
     'frac_phase_update': 'Update',
@@ -95,4 +137,36 @@ label_params = {
     'phase_total_factor': 'All phases',
     'total_memory': 'Memory',
     'total_memory_per_node': 'Memory per node',
+    'total_memory_per_rank': 'Memory per MPI process',
+    'base_memory_per_node': 'Base memory per node',
+    'network_memory_per_node': 'Network memory per node',
+    'bytes_per_connection': 'Bytes per connection',
+    'network_memory_per_vp': 'Network memory per virtual process',
+    'memory_overhead_factor': 'Memory overhead over base',
+    'frac_memory_base': 'Base',
+    'frac_memory_network': 'Network',
+    'frac_memory_other': 'Other',
+    'num_ranks': 'MPI processes',
+    'num_vp': 'Virtual processes',
+    'time_to_solution': 'Time to solution',
+    'node_hours': 'Node-hours',
+    'core_hours': 'Core-hours',
+    'energy_to_solution': 'Energy to solution (kWh)',
+    'node_hours_per_model_time': 'Node-hours per model time',
+    'core_hours_per_model_time': 'Core-hours per model time',
+    'energy_per_model_time': 'Energy per model time (kWh)',
+}
+
+aggregation_params = {
+    'method': 'mean',
+    'trim': 0.1,
+    'iqr_factor': 1.5,
+    'reject_on': None,
+}
+
+ci_params = {
+    'method': 'bootstrap',
+    'confidence': 0.95,
+    'n_boot': 1000,
+    'seed': None,
 }
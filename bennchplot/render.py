@@ -0,0 +1,400 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Rendering of figures described by a declarative figure specification
+
+A figure specification is a dictionary (typically read from YAML) of the
+form
+
+    plot:               # keyword arguments of `Plot`
+      x_axis: [num_nvp]
+      time_scaling: 1e3
+    figsize: [6, 6]
+    grid:               # keyword arguments of `GridSpec`
+      nrows: 2
+      ncols: 1
+      height_ratios: [3, 1]
+    panels:
+      - row: 0          # int or slice given as 'start:stop'
+        col: 0
+        plots:          # calls of plotting methods of `Plot`
+          - method: plot_main
+            quantities: [sim_factor]
+            log: [false, true]
+        ylabel: Real-time factor   # passed to `Axes.set`
+        legend: true
+      - row: 1
+        col: 0
+        plots:
+          - method: plot_fractions
+            fill_variables: [frac_phase_update, frac_phase_deliver]
+    merge_legends: [[0, 1]]   # pairs of panel indices
+
+Figures are drawn on `matplotlib.figure.Figure` objects directly, without
+pyplot, and can therefore be rendered in parallel worker processes. With a
+render cache (see `cache.RenderCache`), figures whose data, specification
+and parameters are unchanged are copied from the cache instead of being
+rendered again.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+from matplotlib.figure import Figure
+
+try:
+    from . import __version__
+    from . import cache as cache_
+    from . import loader
+    from . import metadata as metadata_
+    from . import plot_params as pp
+    from .bennchplot import Plot
+except ImportError:
+    from bennchplot import __version__
+    from bennchplot import cache as cache_
+    from bennchplot import loader
+    from bennchplot import metadata as metadata_
+    from bennchplot import plot_params as pp
+    from bennchplot import Plot
+
+PLOT_METHODS = ('plot_main', 'plot_fractions')
+
+_PANEL_KEYS = ('row', 'col', 'plots', 'legend', 'simple_axis')
+
+_PARAMS = ('matplotlib_params', 'color_params', 'additional_params',
+           'label_params')
+
+
+def _index(value):
+    """
+    Convert a grid position given as int or 'start:stop' to an index.
+    """
+    if isinstance(value, str):
+        start, _, stop = value.partition(':')
+        return slice(int(start) if start else None,
+                     int(stop) if stop else None)
+    return value
+
+
+def plot_kwargs(spec, data_file=None):
+    """
+    Keyword arguments of `Plot` for a figure specification.
+
+    Attributes
+    ----------
+    spec : dict
+        figure specification
+    data_file : str or list, optional
+        data overriding the `data_file` given in the specification
+
+    Returns
+    -------
+    kwargs : dict
+    """
+    kwargs = dict(spec.get('plot', {}))
+    if data_file is not None:
+        kwargs['data_file'] = data_file
+    if isinstance(kwargs.get('time_scaling'), str):
+        # YAML 1.1 parses numbers like 1e3 as strings
+        kwargs['time_scaling'] = float(kwargs['time_scaling'])
+    return kwargs
+
+
+def data_digest(data_file):
+    """
+    Digest of the content of data files and their metadata sidecars.
+
+    Attributes
+    ----------
+    data_file : str or list
+        data file(s), see `loader.resolve_data_files`
+
+    Returns
+    -------
+    digest : str
+
+    Raises
+    ------
+    FileNotFoundError
+    """
+    files = loader.resolve_data_files(data_file)
+    sidecars = [s for s in map(metadata_.sidecar, files) if s]
+    return cache_.hash_files(files + sidecars)
+
+
+def figure_key(cache, spec, fmt, data_file=None, data_hash=None):
+    """
+    Fingerprint of a figure in the render cache.
+
+    The key covers the content of the data and their metadata sidecars, the
+    figure specification including all plotting calls and their arguments,
+    the remaining `Plot` arguments, the parameter dictionaries
+    (`matplotlib_params`, `color_params`, `additional_params`,
+    `label_params`; the defaults of `plot_params` unless given), the file
+    format, and the versions of beNNch-plot and matplotlib.
+
+    Attributes
+    ----------
+    cache : cache.RenderCache
+        render cache
+    spec : dict
+        figure specification
+    fmt : str
+        file format of the figure
+    data_file : str or list, optional
+        data overriding the `data_file` given in the specification
+    data_hash : str, optional
+        digest of the data files and their sidecars, computed by
+        `data_digest` if not given
+
+    Returns
+    -------
+    key : str
+
+    Raises
+    ------
+    FileNotFoundError
+    """
+    kwargs = plot_kwargs(spec, data_file)
+    if data_hash is None:
+        data_hash = data_digest(kwargs.get('data_file'))
+    kwargs.pop('data_file', None)
+    params = {name: kwargs.pop(name, getattr(pp, name)) for name in _PARAMS}
+    figure = {k: v for k, v in spec.items() if k != 'plot'}
+    return cache.key(data_hash, figure=figure, plot=kwargs, params=params,
+                     format=fmt,
+                     versions=[__version__, matplotlib.__version__])
+
+
+def _format(output):
+    return os.path.splitext(output)[1].lstrip('.')
+
+
+def _as_cache(cache):
+    if cache is None or isinstance(cache, cache_.RenderCache):
+        return cache
+    return cache_.RenderCache(cache)
+
+
+def draw_figure(B, spec):
+    """
+    Draw a figure according to its specification.
+
+    Attributes
+    ----------
+    B : Plot
+        plot object holding the data
+    spec : dict
+        figure specification
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+
+    Raises
+    ------
+    ValueError
+    """
+    fig = Figure(figsize=spec.get('figsize'), layout='constrained')
+    grid = fig.add_gridspec(**spec.get('grid', {'nrows': 1, 'ncols': 1}))
+
+    axes = []
+    for panel in spec.get('panels', []):
+        ax = fig.add_subplot(grid[_index(panel.get('row', 0)),
+                                  _index(panel.get('col', 0))])
+        for call in panel.get('plots', []):
+            call = dict(call)
+            method = call.pop('method')
+            if method not in PLOT_METHODS:
+                raise ValueError(f'Unknown plotting method {method!r}.')
+            if 'log' in call and isinstance(call['log'], list):
+                call['log'] = tuple(call['log'])
+            getattr(B, method)(axis=ax, **call)
+        settings = {k: v for k, v in panel.items() if k not in _PANEL_KEYS}
+        if settings:
+            ax.set(**settings)
+        if panel.get('simple_axis', False):
+            B.simple_axis(ax)
+        if panel.get('legend', False):
+            ax.legend()
+        axes.append(ax)
+
+    for i, j in spec.get('merge_legends', []):
+        B.merge_legends(axes[i], axes[j])
+    return fig
+
+
+def render_figure(spec, output, data_file=None, B=None, cache=None):
+    """
+    Render a figure to a file.
+
+    Attributes
+    ----------
+    spec : dict
+        figure specification
+    output : str
+        path of the output file; the format is inferred from its suffix
+    data_file : str or list, optional
+        data overriding the `data_file` given in the specification
+    B : Plot, optional
+        plot object holding the data, created from spec if not given
+    cache : str or cache.RenderCache, optional
+        directory (or cache object) of the render cache; the cache key is
+        computed from spec and data_file, also if B is given
+
+    Returns
+    -------
+    rendered : bool
+        False if the figure was taken from the cache
+    """
+    cache = _as_cache(cache)
+    key = None
+    if cache is not None:
+        try:
+            key = figure_key(cache, spec, _format(output), data_file)
+        except FileNotFoundError:
+            pass
+        if key is not None and cache.fetch(key, output):
+            return False
+
+    if B is None:
+        B = Plot(**plot_kwargs(spec, data_file))
+    _save(draw_figure(B, spec), output)
+    if key is not None:
+        cache.store(key, output)
+    return True
+
+
+def _save(fig, output):
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig.savefig(output)
+
+
+def _render_group(kwargs, jobs, cache=None):
+    """
+    Render all figures sharing data and `Plot` arguments in one worker.
+
+    Jobs are triples of figure specification, output path and render cache
+    key (None if not cached). Returns pairs of output path and error
+    message of failed figures.
+    """
+    try:
+        B = Plot(**kwargs)
+    except SystemExit:
+        # Plot quits if the data cannot be found
+        return [(output, 'data could not be found') for _, output, _ in jobs]
+    except Exception as e:
+        return [(output, repr(e)) for _, output, _ in jobs]
+    errors = []
+    for spec, output, key in jobs:
+        try:
+            _save(draw_figure(B, spec), output)
+            if key is not None:
+                cache.store(key, output)
+        except Exception as e:
+            errors.append((output, repr(e)))
+    return errors
+
+
+def _lookup_cached(cache, kwargs, jobs, fmt):
+    """
+    Copy cached figures of a group and return the jobs left to render.
+    """
+    try:
+        data_hash = data_digest(kwargs.get('data_file'))
+    except FileNotFoundError:
+        return [(spec, output, None) for spec, output in jobs]
+    remaining = []
+    for spec, output in jobs:
+        key = figure_key(cache, spec, fmt, kwargs.get('data_file'),
+                         data_hash=data_hash)
+        if not cache.fetch(key, output):
+            remaining.append((spec, output, key))
+    return remaining
+
+
+def render_all(figures, data_files=None, output_dir='.', fmt='pdf',
+               max_workers=None, cache=None):
+    """
+    Render figures in parallel worker processes.
+
+    Figures sharing their data and `Plot` arguments are rendered by the
+    same worker, such that the data are loaded only once. With a render
+    cache, unchanged figures are copied from the cache and their data are
+    not loaded at all.
+
+    Attributes
+    ----------
+    figures : dict
+        figure specifications by figure name
+    data_files : list, optional
+        data sets each figure is rendered for; if not given, the
+        `data_file` of each figure specification is used
+    output_dir : str
+        directory for the rendered figures
+    fmt : str
+        file format of the rendered figures
+    max_workers : int, optional
+        number of worker processes; figures are rendered in the calling
+        process if 1
+    cache : str or cache.RenderCache, optional
+        directory (or cache object) of the render cache
+
+    Returns
+    -------
+    errors : list
+        pairs of output path and error message of failed figures
+    """
+    groups = {}
+    for name, spec in figures.items():
+        for data_file in (data_files or [None]):
+            kwargs = plot_kwargs(spec, data_file)
+            if data_file is None:
+                fname = f'{name}.{fmt}'
+            else:
+                stem = os.path.splitext(
+                    os.path.basename(os.path.normpath(data_file)))[0]
+                fname = f'{stem}_{name}.{fmt}'
+            key = repr(sorted(kwargs.items()))
+            groups.setdefault(key, (kwargs, []))[1].append(
+                (spec, os.path.join(output_dir, fname)))
+
+    cache = _as_cache(cache)
+    pending = []
+    for kwargs, jobs in groups.values():
+        if cache is None:
+            jobs = [(spec, output, None) for spec, output in jobs]
+        else:
+            jobs = _lookup_cached(cache, kwargs, jobs, fmt)
+        if jobs:
+            pending.append((kwargs, jobs))
+
+    errors = []
+    if max_workers == 1 or not pending:
+        for kwargs, jobs in pending:
+            errors.extend(_render_group(kwargs, jobs, cache))
+        return errors
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_render_group, kwargs, jobs, cache)
+                   for kwargs, jobs in pending]
+        for future in as_completed(futures):
+            errors.extend(future.result())
+    return errors
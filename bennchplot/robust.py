@@ -0,0 +1,294 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Outlier-robust aggregation of repetitions
+
+Repetitions of all configurations are arranged in one padded array of shape
+(configurations, repetitions, quantities), which `confidence` resamples as
+well, and reduced along the repetitions at once:
+
+- 'median': median and scaled median absolute deviation (MAD), which
+  estimates the standard deviation of normally distributed values
+- 'trimmed': mean and standard deviation of the values left after removing
+  the `trim` fraction of smallest and largest values of every quantity
+- 'iqr': repetitions for which any of the `reject_on` quantities lies
+  outside [Q1 - f IQR, Q3 + f IQR] of its configuration are rejected as a
+  whole; mean and standard deviation of the remaining repetitions
+
+The result has the layout of `schema.aggregate`, with the number of values
+aggregated per quantity in `<name>_count`. Removed values are listed
+in a report with one row per raw row and quantity; for 'iqr', these are all
+measured values of the rejected repetitions.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import schema
+except ImportError:
+    import schema
+
+METHODS = ('mean', 'median', 'trimmed', 'iqr')
+
+# scale of the MAD estimating the standard deviation of a normal
+MAD_SCALE = 1.4826
+
+# columns identifying a raw row in the report besides the group keys
+ID_COLUMNS = ('uuid', 'rng_seed')
+
+
+def group_rows(df, names, keys):
+    """
+    Arrange repetitions of each configuration in a padded array.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        normalized raw benchmark data
+    names : list of str
+        measured quantities
+    keys : list
+        columns identifying a configuration
+
+    Returns
+    -------
+    configurations : pandas.DataFrame
+        key values of the configurations, sorted as by `schema.aggregate`
+    values : numpy.ndarray
+        shape (configurations, max. repetitions, quantities), padded with
+        NaN
+    rows : numpy.ndarray
+        positions of the raw rows in df, shape (configurations, max.
+        repetitions), padded with -1
+
+    Raises
+    ------
+    ValueError
+        if a key is missing in some rows, which would not be grouped
+    """
+    missing = [k for k in keys if df[k].isna().any()]
+    if missing:
+        raise ValueError(f'Configuration keys {missing} are missing in some '
+                         'rows.')
+    grouped = df.groupby(keys, sort=True, observed=True)
+    group = grouped.ngroup().to_numpy()
+    repetition = grouped.cumcount().to_numpy()
+    sizes = grouped.size()
+    shape = (len(sizes), sizes.max() if len(sizes) else 0)
+    values = np.full(shape + (len(names),), np.nan)
+    values[group, repetition] = df[names].to_numpy(dtype=float)
+    rows = np.full(shape, -1)
+    rows[group, repetition] = np.arange(len(df))
+    return sizes.index.to_frame(index=False), values, rows
+
+
+def mean_std(values, mask):
+    """
+    Mean and standard deviation of the values selected by a mask.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        shape (configurations, repetitions, quantities)
+    mask : numpy.ndarray
+        boolean array broadcastable to values
+
+    Returns
+    -------
+    mean, std : numpy.ndarray
+        shape (configurations, quantities); NaN where no value, or for the
+        standard deviation fewer than two values, are selected
+    """
+    mask = mask & np.isfinite(values)
+    n = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, values, 0.).sum(axis=1) / n
+        deviation = np.where(mask, values - mean[:, None], 0.)
+        std = np.sqrt((deviation**2).sum(axis=1) / (n - 1))
+    return (np.where(n > 0, mean, np.nan), np.where(n > 1, std, np.nan))
+
+
+def median_mad(values):
+    """
+    Median and scaled median absolute deviation along the repetitions.
+    """
+    with warnings.catch_warnings():
+        # configurations without any value of a quantity
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(values, axis=1)
+        mad = np.nanmedian(np.abs(values - median[:, None]), axis=1)
+    return median, MAD_SCALE * mad
+
+
+def trimmed(values, trim):
+    """
+    Trimmed mean and standard deviation along the repetitions.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        shape (configurations, repetitions, quantities), padded with NaN
+    trim : float
+        fraction of values removed at either end, per configuration and
+        quantity
+
+    Returns
+    -------
+    mean, std : numpy.ndarray
+        shape (configurations, quantities)
+    removed : numpy.ndarray
+        boolean array of the shape of values marking removed values
+    """
+    if not 0. <= trim < 0.5:
+        raise ValueError('The trimmed fraction must be in [0, 0.5).')
+    # NaN sorts last, such that the values of every quantity come first
+    order = np.argsort(values, axis=1)
+    ordered = np.take_along_axis(values, order, axis=1)
+    n = np.isfinite(values).sum(axis=1)
+    k = np.floor(trim * n).astype(int)
+    position = np.arange(values.shape[1])[None, :, None]
+    kept = (position >= k[:, None]) & (position < (n - k)[:, None])
+    mean, std = mean_std(ordered, kept)
+    removed = np.zeros(values.shape, dtype=bool)
+    np.put_along_axis(removed, order,
+                      ~kept & np.isfinite(ordered), axis=1)
+    return mean, std, removed
+
+
+def iqr_outliers(values, factor):
+    """
+    Values outside the interquartile fences of their configuration.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        shape (configurations, repetitions, quantities), padded with NaN
+    factor : float
+        multiple of the interquartile range between quartiles and fences
+
+    Returns
+    -------
+    outliers : numpy.ndarray
+        boolean array of the shape of values
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=1)
+    spread = factor * (q3 - q1)
+    with np.errstate(invalid='ignore'):
+        return ((values < (q1 - spread)[:, None]) |
+                (values > (q3 + spread)[:, None]))
+
+
+def aggregate(df, columns, keys=None, method='mean', trim=0.1,
+              iqr_factor=1.5, reject_on=None):
+    """
+    Aggregate repetitions of each configuration robustly.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        normalized raw benchmark data
+    columns : list of schema.Column
+    keys : list, optional
+        columns identifying a configuration, see `schema.aggregate`
+    method : {'mean', 'median', 'trimmed', 'iqr'}
+        aggregation method, see above; 'mean' is `schema.aggregate`
+    trim : float
+        fraction of values removed at either end by 'trimmed'
+    iqr_factor : float
+        distance of the fences of 'iqr' from the quartiles in multiples of
+        the interquartile range
+    reject_on : list, optional
+        quantities whose outliers reject a repetition with 'iqr';
+        `time_simulate` if it is measured, otherwise all measured timers
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        aggregated data in the layout of `schema.aggregate`, where
+        `num_repetitions` counts the repetitions retained by 'trimmed' and
+        'iqr', and `<name>_count` the values of each quantity, which are
+        fewer where the quantity is missing in some repetitions
+    rejected : pandas.DataFrame
+        one row per removed value, with the label of its raw row (`row`),
+        the configuration keys, the run identifiers, the quantity and its
+        value; a repetition rejected by 'iqr' contributes all its measured
+        values
+
+    Raises
+    ------
+    ValueError
+    """
+    if method not in METHODS:
+        raise ValueError(f'Unknown method {method!r}, use one of {METHODS}.')
+    keys = list(keys or schema.GROUP_KEYS)
+    ids = [c for c in ID_COLUMNS if c in df]
+    measured = [c.name for c in columns if c.group in schema.MEASURED_GROUPS]
+    dtypes = {c.name: c.dtype for c in columns}
+    report = ['row'] + keys + ids + ['quantity', 'value']
+    if method == 'mean':
+        return (schema.aggregate(df, columns, keys),
+                pd.DataFrame(columns=report))
+
+    configurations, values, rows = group_rows(df, measured, keys)
+    kept = rows >= 0
+    removed = np.zeros(values.shape, dtype=bool)
+    if method == 'median':
+        mean, std = median_mad(values)
+    elif method == 'trimmed':
+        mean, std, removed = trimmed(values, trim)
+    else:
+        if reject_on is None:
+            reject_on = (['time_simulate'] if 'time_simulate' in measured
+                         else [c.name for c in columns
+                               if c.name in measured and
+                               c.group in ('timer', 'phase_timer')])
+        unknown = [q for q in reject_on if q not in measured]
+        if unknown:
+            raise ValueError(f'Cannot reject repetitions on {unknown}, '
+                             'which are not measured.')
+        selected = [measured.index(q) for q in reject_on]
+        outliers = np.zeros(values.shape, dtype=bool)
+        outliers[..., selected] = iqr_outliers(values[..., selected],
+                                               iqr_factor)
+        kept = (rows >= 0) & ~outliers.any(axis=2)
+        mean, std = mean_std(values, kept[..., None])
+        removed = ((rows >= 0) & ~kept)[..., None] & np.isfinite(values)
+    counts = (kept[..., None] & np.isfinite(values) & ~removed).sum(axis=1)
+
+    agg = pd.DataFrame(np.concatenate([mean, std], axis=1),
+                       columns=measured + [n + '_std' for n in measured])
+    agg = agg[[n + s for n in measured for s in ('', '_std')]]
+    agg = agg.astype({n + s: dtypes[n] for n in measured
+                      for s in ('', '_std')})
+    agg['num_repetitions'] = counts.max(axis=1, initial=0).astype('int32')
+    agg = pd.concat([configurations, agg, pd.DataFrame(
+        counts.astype('int32'), columns=[n + '_count' for n in measured])],
+        axis=1)
+
+    config, repetition, quantity = np.nonzero(removed)
+    position = rows[config, repetition]
+    rejected = pd.DataFrame({'row': df.index[position]})
+    for column in keys + ids:
+        rejected[column] = df[column].to_numpy()[position]
+    rejected['quantity'] = np.asarray(measured, dtype=object)[quantity]
+    rejected['value'] = values[config, repetition, quantity]
+    return agg, rejected[report]
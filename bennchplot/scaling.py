@@ -0,0 +1,287 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Parallel scaling analysis
+
+All functions operate on arrays of resources p (e.g. number of nodes or
+virtual processes) of shape (n,) and times T of shape (n, k), holding k
+timers at once. Resources are taken relative to the smallest configuration,
+r = p / min(p), which serves as baseline. Standard deviations are
+propagated to first order, assuming independent measurements.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from . import fitting
+except ImportError:
+    import fitting
+
+
+def _prepare(p, T, T_std):
+    p = np.asarray(p, dtype=float)
+    T = np.asarray(T, dtype=float)
+    if T.ndim == 1:
+        T = T[:, None]
+    if T_std is None:
+        T_std = np.full_like(T, np.nan)
+    T_std = np.asarray(T_std, dtype=float).reshape(T.shape)
+    base = np.argmin(p)
+    r = p / p[base]
+    return r, T, T_std, base
+
+
+def speedup(p, T, T_std=None):
+    """
+    Speedup relative to the smallest configuration.
+
+    Attributes
+    ----------
+    p : numpy.ndarray
+        resources, shape (n,)
+    T : numpy.ndarray
+        times, shape (n, k)
+    T_std : numpy.ndarray, optional
+        standard deviations of T
+
+    Returns
+    -------
+    S, S_std : numpy.ndarray
+        speedup T(p_min) / T(p) and its standard deviation, shape (n, k)
+    """
+    r, T, T_std, base = _prepare(p, T, T_std)
+    S = T[base] / T
+    S_std = S * np.sqrt((T_std[base] / T[base])**2 + (T_std / T)**2)
+    # other configurations on the smallest resources keep the error of
+    # the baseline
+    S_std[base] = 0.
+    return S, S_std
+
+
+def efficiency(p, T, T_std=None, mode='strong'):
+    """
+    Parallel efficiency relative to the smallest configuration.
+
+    Attributes
+    ----------
+    p : numpy.ndarray
+        resources, shape (n,)
+    T : numpy.ndarray
+        times, shape (n, k)
+    T_std : numpy.ndarray, optional
+        standard deviations of T
+    mode : {'strong', 'weak'}
+        'strong' for a fixed problem size, where the efficiency is the
+        speedup divided by the relative resources; 'weak' for a problem
+        size growing with the resources, where it is T(p_min) / T(p)
+
+    Returns
+    -------
+    E, E_std : numpy.ndarray
+        efficiency and its standard deviation, shape (n, k)
+
+    Raises
+    ------
+    ValueError
+    """
+    r, _, _, _ = _prepare(p, T, T_std)
+    S, S_std = speedup(p, T, T_std)
+    if mode == 'strong':
+        return S / r[:, None], S_std / r[:, None]
+    elif mode == 'weak':
+        return S, S_std
+    raise ValueError(f'Unknown scaling mode {mode!r}.')
+
+
+def karp_flatt(p, T, T_std=None):
+    """
+    Experimentally determined serial fraction after Karp and Flatt.
+
+    e = (1/S - 1/r) / (1 - 1/r), undefined for the baseline configuration.
+
+    Attributes
+    ----------
+    p : numpy.ndarray
+        resources, shape (n,)
+    T : numpy.ndarray
+        times, shape (n, k)
+    T_std : numpy.ndarray, optional
+        standard deviations of T
+
+    Returns
+    -------
+    e, e_std : numpy.ndarray
+        serial fraction and its standard deviation, shape (n, k)
+    """
+    r, _, _, _ = _prepare(p, T, T_std)
+    S, S_std = speedup(p, T, T_std)
+    r = r[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        norm = np.where(r > 1, 1. - 1. / r, np.nan)
+        e = (1. / S - 1. / r) / norm
+        e_std = S_std / (S**2 * norm)
+    return e, e_std
+
+
+def fit_amdahl(p, T, T_std=None):
+    """
+    Fit Amdahl's law T(r) = T_1 (s + (1 - s) / r) to strong scaling data.
+
+    The model is linear in a = T_1 s and b = T_1 (1 - s) and is fitted by
+    weighted least squares for all timers at once.
+
+    Attributes
+    ----------
+    p : numpy.ndarray
+        resources, shape (n,)
+    T : numpy.ndarray
+        times, shape (n, k)
+    T_std : numpy.ndarray, optional
+        standard deviations of T, used as weights
+
+    Returns
+    -------
+    fit : dict
+        arrays of shape (k,) for the serial fraction `s`, the extrapolated
+        time on the baseline resources `T_1`, and their standard deviations
+        `s_std`, `T_1_std`; `coef` and `cov` of the linear fit
+    """
+    r, T, T_std, _ = _prepare(p, T, T_std)
+    X = np.column_stack([np.ones_like(r), 1. / r])
+    coef, cov = fitting.wls(X, T, T_std)
+    a, b = coef[:, 0], coef[:, 1]
+    T_1 = a + b
+    s = a / T_1
+    # gradients of s and T_1 with respect to (a, b)
+    grad_s = np.stack([b, -a], axis=1) / T_1[:, None]**2
+    s_std = np.sqrt(np.einsum('kp,kpq,kq->k', grad_s, cov, grad_s))
+    T_1_std = np.sqrt(cov[:, 0, 0] + cov[:, 1, 1] + 2 * cov[:, 0, 1])
+    return {'s': s, 's_std': s_std, 'T_1': T_1, 'T_1_std': T_1_std,
+            'coef': coef, 'cov': cov}
+
+
+def fit_gustafson(p, T, T_std=None):
+    """
+    Fit Gustafson's law S(r) = r - s (r - 1) to weak scaling data.
+
+    The scaled speedup is S = r T(p_min) / T(p), i.e. the problem size is
+    assumed to grow proportionally to the resources.
+
+    Attributes
+    ----------
+    p : numpy.ndarray
+        resources, shape (n,)
+    T : numpy.ndarray
+        times, shape (n, k)
+    T_std : numpy.ndarray, optional
+        standard deviations of T, used as weights
+
+    Returns
+    -------
+    fit : dict
+        arrays of shape (k,) for the serial fraction `s` and its standard
+        deviation `s_std`; `coef` and `cov` of the linear fit
+    """
+    r, _, _, base = _prepare(p, T, T_std)
+    S, S_std = speedup(p, T, T_std)
+    Y = r[:, None] * S - r[:, None]
+    Y_std = r[:, None] * S_std
+    # the baseline does not constrain s and has zero variance by
+    # construction, exclude it from the fit
+    Y[base] = np.nan
+    X = (1. - r)[:, None]
+    coef, cov = fitting.wls(X, Y, Y_std)
+    return {'s': coef[:, 0], 's_std': np.sqrt(cov[:, 0, 0]),
+            'coef': coef, 'cov': cov}
+
+
+def analyze(B, quantities, mode='strong'):
+    """
+    Speedup, efficiency and Karp-Flatt serial fraction of a plot's data.
+
+    Attributes
+    ----------
+    B : Plot
+        plot object holding the data; its x-axis variable is used as
+        resources
+    quantities : list
+        timers or derived times, e.g. 'time_simulate' or 'sim_factor'
+    mode : {'strong', 'weak'}
+        scaling mode used for the efficiency
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        indexed by the x-axis variable, with columns `<quantity>_speedup`,
+        `<quantity>_efficiency`, `<quantity>_karp_flatt` and their `_std`
+        companions
+    """
+    p = B._x_values()
+    T = np.column_stack([B.get_quantity(q).to_numpy() for q in quantities])
+    T_std = np.column_stack([B.get_quantity(q + '_std').to_numpy()
+                             for q in quantities])
+    results = {'speedup': speedup(p, T, T_std),
+               'efficiency': efficiency(p, T, T_std, mode),
+               'karp_flatt': karp_flatt(p, T, T_std)}
+
+    columns = {}
+    for i, q in enumerate(quantities):
+        for name, (value, std) in results.items():
+            columns[f'{q}_{name}'] = value[:, i]
+            columns[f'{q}_{name}_std'] = std[:, i]
+    x_axis = B.x_axis if isinstance(B.x_axis, str) else B.x_axis[0]
+    return pd.DataFrame(columns, index=pd.Index(p, name=x_axis))
+
+
+def fit(B, quantities, model='amdahl'):
+    """
+    Fit a scaling model to a plot's data.
+
+    Attributes
+    ----------
+    B : Plot
+        plot object holding the data; its x-axis variable is used as
+        resources
+    quantities : list
+        timers or derived times
+    model : {'amdahl', 'gustafson'}
+        scaling model
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        indexed by quantity, with the serial fraction `s`, its standard
+        deviation `s_std` and, for Amdahl's law, `T_1` and `T_1_std`
+
+    Raises
+    ------
+    ValueError
+    """
+    p = B._x_values()
+    T = np.column_stack([B.get_quantity(q).to_numpy() for q in quantities])
+    T_std = np.column_stack([B.get_quantity(q + '_std').to_numpy()
+                             for q in quantities])
+    if model == 'amdahl':
+        result = fit_amdahl(p, T, T_std)
+    elif model == 'gustafson':
+        result = fit_gustafson(p, T, T_std)
+    else:
+        raise ValueError(f'Unknown scaling model {model!r}.')
+    return pd.DataFrame({k: v for k, v in result.items()
+                         if k not in ('coef', 'cov')},
+                        index=pd.Index(quantities, name='quantity'))
@@ -0,0 +1,218 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Column schema of beNNch result files
+"""
+import pandas as pd
+
+
+class Column():
+    """
+    Description of a column in beNNch result files.
+
+    Attributes
+    ----------
+    name : str
+        canonical name used in the aggregated data
+    group : str
+        one of 'key', 'id', 'timer', 'phase_timer', 'memory', 'counter',
+        or 'worker' for the worker columns of per-rank data (see
+        `imbalance`)
+    dtype : str
+        dtype used when parsing the column
+    aliases : tuple of str, optional
+        alternative names of the column in result files
+    """
+
+    def __init__(self, name, group, dtype, aliases=()):
+        self.name = name
+        self.group = group
+        self.dtype = dtype
+        self.aliases = tuple(aliases)
+
+    def __repr__(self):
+        return f'Column({self.name!r}, {self.group!r})'
+
+
+# Columns identifying a configuration, used to group repetitions.
+GROUP_KEYS = ['num_nodes', 'threads_per_task', 'tasks_per_node',
+              'model_time_sim']
+
+# Groups aggregated to mean and standard deviation over repetitions.
+MEASURED_GROUPS = ('timer', 'phase_timer', 'memory', 'counter')
+
+COLUMNS = [
+    Column('num_nodes', 'key', 'int32'),
+    Column('threads_per_task', 'key', 'int32'),
+    Column('tasks_per_node', 'key', 'int32'),
+    Column('model_time_sim', 'key', 'float64'),
+    Column('rng_seed', 'id', 'int64'),
+    Column('time_construction_create', 'timer', 'float32',
+           aliases=('wall_time_create',)),
+    Column('time_construction_connect', 'timer', 'float32',
+           aliases=('wall_time_connect',)),
+    Column('time_simulate', 'timer', 'float32',
+           aliases=('wall_time_sim',)),
+    Column('time_communicate_prepare', 'timer', 'float32',
+           aliases=('wall_time_communicate_prepare',)),
+    Column('py_time_create', 'timer', 'float32'),
+    Column('py_time_connect', 'timer', 'float32'),
+    Column('time_update_spike_data', 'phase_timer', 'float32',
+           aliases=('time_update', 'wall_time_phase_update')),
+    Column('time_collocate_spike_data', 'phase_timer', 'float32',
+           aliases=('wall_time_phase_collocate',)),
+    Column('time_communicate_spike_data', 'phase_timer', 'float32',
+           aliases=('wall_time_phase_communicate',)),
+    Column('time_deliver_spike_data', 'phase_timer', 'float32',
+           aliases=('wall_time_phase_deliver',)),
+    Column('time_communicate_target_data', 'phase_timer', 'float32',
+           aliases=('wall_time_communicate_target_data',)),
+    Column('time_gather_spike_data', 'phase_timer', 'float32',
+           aliases=('wall_time_gather_spike_data',)),
+    Column('time_gather_target_data', 'phase_timer', 'float32',
+           aliases=('wall_time_gather_target_data',)),
+    Column('base_memory', 'memory', 'float64'),
+    Column('network_memory', 'memory', 'float64'),
+    Column('init_memory', 'memory', 'float64'),
+    Column('total_memory', 'memory', 'float64'),
+    Column('num_connections', 'counter', 'float64'),
+    Column('local_spike_counter', 'counter', 'float64'),
+]
+
+SCHEMA = {c.name: c for c in COLUMNS}
+
+
+def select_columns(quantities=None, detailed_timers=True):
+    """
+    Select the columns needed for the given quantities.
+
+    Grouping keys and identifiers are always selected.
+
+    Attributes
+    ----------
+    quantities : list, optional
+        canonical names of measured columns to be loaded; all measured
+        columns if not given
+    detailed_timers : bool
+        whether to include the timers of the individual update phases when
+        no quantities are given
+
+    Returns
+    -------
+    columns : list of Column
+
+    Raises
+    ------
+    ValueError
+    """
+    if quantities is None:
+        groups = set(MEASURED_GROUPS)
+        if not detailed_timers:
+            groups.remove('phase_timer')
+        return [c for c in COLUMNS
+                if c.group in groups or c.group in ('key', 'id')]
+
+    unknown = [q for q in quantities if q not in SCHEMA]
+    if unknown:
+        raise ValueError(f'Unknown quantities {unknown}.')
+    return [c for c in COLUMNS
+            if c.name in quantities or c.group in ('key', 'id')]
+
+
+def read_csv_kwargs(columns):
+    """
+    Keyword arguments for `pandas.read_csv` restricting parsing to columns.
+
+    Attributes
+    ----------
+    columns : list of Column
+
+    Returns
+    -------
+    kwargs : dict
+        `usecols` and `dtype` arguments
+    """
+    dtype = {}
+    for c in columns:
+        for name in (c.name,) + c.aliases:
+            dtype[name] = c.dtype
+    # a bound method of a frozenset can be pickled for process pools
+    return {'usecols': frozenset(dtype).__contains__, 'dtype': dtype}
+
+
+def normalize(df, columns):
+    """
+    Rename aliased columns to canonical names and cast to compact dtypes.
+
+    Requested columns missing from the data are added as NaN.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        raw benchmark data
+    columns : list of Column
+
+    Returns
+    -------
+    df : pandas.DataFrame
+    """
+    rename = {alias: c.name for c in columns for alias in c.aliases
+              if alias in df and c.name not in df}
+    df = df.rename(columns=rename)
+    for c in columns:
+        if c.name not in df:
+            if c.group in ('key', 'id'):
+                continue
+            df[c.name] = pd.Series(float('nan'), index=df.index,
+                                   dtype=c.dtype)
+        elif df[c.name].dtype != c.dtype:
+            df[c.name] = df[c.name].astype(c.dtype)
+    return df
+
+
+def aggregate(df, columns, keys=None):
+    """
+    Aggregate repetitions of each configuration to mean and std.
+
+    The result has a flat column layout, where the mean of a measured
+    quantity keeps its name and the standard deviation is stored in
+    `<name>_std`. The number of repetitions of each configuration is
+    stored in `num_repetitions`.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        normalized raw benchmark data
+    columns : list of Column
+    keys : list, optional
+        columns identifying a configuration, `GROUP_KEYS` if not given;
+        further keys, such as metadata, split configurations
+
+    Returns
+    -------
+    df : pandas.DataFrame
+    """
+    measured = [c.name for c in columns if c.group in MEASURED_GROUPS]
+    grouped = df.groupby(keys or GROUP_KEYS, sort=True,
+                         observed=True)[measured]
+    mean = grouped.mean()
+    std = grouped.std().add_suffix('_std')
+    agg = pd.concat([mean, std], axis=1)
+    agg = agg[[n + s for n in measured for s in ('', '_std')]]
+    agg['num_repetitions'] = grouped.size().astype('int32')
+    return agg.reset_index()
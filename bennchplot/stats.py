@@ -0,0 +1,171 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Vectorized distribution functions of Student's t-distribution
+"""
+import math
+
+import numpy as np
+
+_lgamma = np.frompyfunc(math.lgamma, 1, 1)
+
+
+def _betacf(a, b, x, iterations=200, eps=1e-14):
+    """
+    Continued fraction of the regularized incomplete beta function.
+    """
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1.
+    qam = a - 1.
+    c = np.ones_like(x)
+    d = 1. - qab * x / qap
+    d = np.where(np.abs(d) < tiny, tiny, d)
+    d = 1. / d
+    h = d
+    for m in range(1, iterations + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1. + aa * d
+        d = np.where(np.abs(d) < tiny, tiny, d)
+        c = 1. + aa / c
+        c = np.where(np.abs(c) < tiny, tiny, c)
+        d = 1. / d
+        h = h * d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1. + aa * d
+        d = np.where(np.abs(d) < tiny, tiny, d)
+        c = 1. + aa / c
+        c = np.where(np.abs(c) < tiny, tiny, c)
+        d = 1. / d
+        delta = d * c
+        h = h * delta
+        if np.all(np.abs(delta - 1.) < eps):
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """
+    Regularized incomplete beta function I_x(a, b).
+
+    Attributes
+    ----------
+    a, b : numpy.ndarray
+        positive parameters
+    x : numpy.ndarray
+        values in [0, 1]
+
+    Returns
+    -------
+    I : numpy.ndarray
+    """
+    a, b, x = np.broadcast_arrays(np.asarray(a, dtype=float),
+                                  np.asarray(b, dtype=float),
+                                  np.asarray(x, dtype=float))
+    x = np.clip(x, 0., 1.)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_front = np.asarray(_lgamma(a + b) - _lgamma(a) - _lgamma(b),
+                               dtype=float)
+        log_front = log_front + a * np.log(x) + b * np.log1p(-x)
+        front = np.exp(log_front)
+        # the continued fraction converges quickly below (a+1) / (a+b+2)
+        direct = x < (a + 1.) / (a + b + 2.)
+        xs = np.where(direct, x, 1. - x)
+        As = np.where(direct, a, b)
+        Bs = np.where(direct, b, a)
+        cf = _betacf(As, Bs, xs)
+        result = np.where(direct, front * cf / a, 1. - front * cf / b)
+    result = np.where(x == 0., 0., result)
+    return np.where(x == 1., 1., result)
+
+
+def t_cdf(t, df):
+    """
+    Cumulative distribution function of Student's t-distribution.
+
+    Attributes
+    ----------
+    t : numpy.ndarray
+        values
+    df : numpy.ndarray
+        degrees of freedom
+
+    Returns
+    -------
+    p : numpy.ndarray
+    """
+    t = np.asarray(t, dtype=float)
+    df = np.asarray(df, dtype=float)
+    x = df / (df + t**2)
+    tail = 0.5 * betainc(df / 2., 0.5, x)
+    return np.where(t > 0, 1. - tail, tail)
+
+
+def t_sf2(t, df):
+    """
+    Two-sided p-value of a t statistic, P(|T| >= |t|).
+
+    Attributes
+    ----------
+    t : numpy.ndarray
+        values
+    df : numpy.ndarray
+        degrees of freedom
+
+    Returns
+    -------
+    p : numpy.ndarray
+    """
+    t = np.asarray(t, dtype=float)
+    df = np.asarray(df, dtype=float)
+    return betainc(df / 2., 0.5, df / (df + t**2))
+
+
+def t_ppf(q, df, iterations=60):
+    """
+    Quantile function of Student's t-distribution.
+
+    Computed by bisection on `t_cdf`.
+
+    Attributes
+    ----------
+    q : numpy.ndarray
+        probabilities in (0, 1)
+    df : numpy.ndarray
+        degrees of freedom
+
+    Returns
+    -------
+    t : numpy.ndarray
+    """
+    q, df = np.broadcast_arrays(np.asarray(q, dtype=float),
+                                np.asarray(df, dtype=float))
+    # typically only few distinct pairs, e.g. one per number of repetitions
+    pairs, inverse = np.unique(np.stack([q.ravel(), df.ravel()]), axis=1,
+                               return_inverse=True)
+    uq, udf = pairs
+    lo = np.full(uq.shape, -1e3)
+    hi = np.full(uq.shape, 1e3)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        below = t_cdf(mid, udf) < uq
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    t = np.where(np.isfinite(udf) & (udf > 0), 0.5 * (lo + hi), np.nan)
+    return t[inverse.ravel()].reshape(q.shape)
@@ -0,0 +1,264 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+SQLite store of benchmark results
+"""
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+try:
+    from . import cache
+    from . import loader
+    from . import metadata as metadata_
+    from . import schema
+except ImportError:
+    import cache
+    import loader
+    import metadata as metadata_
+    import schema
+
+_SQL_TYPES = {'int32': 'INTEGER', 'int64': 'INTEGER',
+              'float32': 'REAL', 'float64': 'REAL'}
+
+
+class ResultStore():
+    """
+    Local index of benchmark results backed by SQLite.
+
+    Result files are parsed once on ingestion; their rows are stored in a
+    table with one column per entry of `schema.COLUMNS`, indexed by run
+    UUID and configuration. Arbitrary metadata (e.g. model, machine or
+    software versions) can be attached to each run and used for querying.
+
+    Attributes
+    ----------
+    path : str
+        path of the database file, created if necessary
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.conn = sqlite3.connect(self.path)
+        self._create_tables()
+
+    def _create_tables(self):
+        columns = ', '.join(f'"{c.name}" {_SQL_TYPES[c.dtype]}'
+                            for c in schema.COLUMNS)
+        keys = ', '.join(f'"{k}"' for k in schema.GROUP_KEYS)
+        with self.conn:
+            self.conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS runs (
+                    uuid TEXT PRIMARY KEY,
+                    path TEXT,
+                    digest TEXT,
+                    ingested REAL);
+                CREATE TABLE IF NOT EXISTS metadata (
+                    uuid TEXT REFERENCES runs(uuid),
+                    key TEXT,
+                    value TEXT,
+                    PRIMARY KEY (uuid, key));
+                CREATE INDEX IF NOT EXISTS metadata_key_value
+                    ON metadata (key, value);
+                CREATE TABLE IF NOT EXISTS measurements (
+                    uuid TEXT REFERENCES runs(uuid), {columns});
+                CREATE INDEX IF NOT EXISTS measurements_uuid
+                    ON measurements (uuid);
+                CREATE INDEX IF NOT EXISTS measurements_config
+                    ON measurements ({keys});
+                """)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.conn.close()
+
+    def ingest(self, data_file, metadata=None, max_workers=None):
+        """
+        Add result files to the store.
+
+        Files already in the store with unchanged content and sidecar are
+        skipped; changed files replace their previous rows and metadata.
+        The metadata sidecars of the files (see `metadata`) are attached to
+        their runs.
+
+        Attributes
+        ----------
+        data_file : str or list
+            file, directory, glob pattern or list thereof, see
+            `loader.resolve_data_files`
+        metadata : dict, optional
+            metadata attached to all ingested runs, taking precedence over
+            the sidecars
+        max_workers : int, optional
+            number of workers used to read the files concurrently
+
+        Returns
+        -------
+        uuids : list
+            UUIDs of the ingested runs
+
+        Raises
+        ------
+        FileNotFoundError
+        """
+        known = dict(self.conn.execute('SELECT uuid, digest FROM runs'))
+        files = {}
+        for path in loader.resolve_data_files(data_file):
+            uuid = loader.run_uuid(path)
+            side = metadata_.sidecar(path)
+            digest = cache.hash_files([path] + ([side] if side else []))
+            if known.get(uuid) != digest:
+                files[uuid] = (path, digest)
+        if not files:
+            return []
+
+        df = loader.read_data_files(
+            [path for path, _ in files.values()], max_workers=max_workers,
+            **schema.read_csv_kwargs(schema.COLUMNS))
+        df = schema.normalize(df, schema.COLUMNS)
+        columns = ['uuid'] + [c.name for c in schema.COLUMNS if c.name in df]
+        df = df[columns].astype({'uuid': str})
+
+        now = time.time()
+        placeholders = ', '.join('?' for _ in files)
+        with self.conn:
+            for table in ['measurements', 'metadata']:
+                self.conn.execute(
+                    f'DELETE FROM {table} WHERE uuid IN ({placeholders})',
+                    list(files))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)',
+                [(uuid, os.path.abspath(path), digest, now)
+                 for uuid, (path, digest) in files.items()])
+            df.to_sql('measurements', self.conn, if_exists='append',
+                      index=False)
+        sidecars = metadata_.read_metadata(
+            [path for path, _ in files.values()], max_workers=max_workers)
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)',
+                [(uuid, key, value) for uuid, values in sidecars.iterrows()
+                 for key, value in values.dropna().items()])
+        if metadata:
+            self.set_metadata(list(files), metadata)
+        return list(files)
+
+    def set_metadata(self, uuids, metadata):
+        """
+        Attach metadata to runs.
+
+        Attributes
+        ----------
+        uuids : list
+            UUIDs of runs
+        metadata : dict
+            metadata as key-value pairs; values are stored as text
+        """
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)',
+                [(uuid, str(key), str(value))
+                 for uuid in uuids for key, value in metadata.items()])
+
+    def runs(self):
+        """
+        List all runs together with their metadata.
+
+        Returns
+        -------
+        df : pandas.DataFrame
+            one row per run, one column per metadata key
+        """
+        runs = pd.read_sql_query('SELECT uuid, path, ingested FROM runs',
+                                 self.conn)
+        metadata = pd.read_sql_query('SELECT * FROM metadata', self.conn)
+        if len(metadata):
+            metadata = metadata.pivot(index='uuid', columns='key',
+                                      values='value')
+            runs = runs.join(metadata, on='uuid')
+        return runs
+
+    def query(self, uuids=None, metadata=None, with_metadata=False, **where):
+        """
+        Select benchmark data by run, metadata and configuration.
+
+        The result has the layout of raw benchmark data, such that it can
+        be passed as `df` to `Plot`, see also `Plot.from_store`.
+
+        Attributes
+        ----------
+        uuids : list, optional
+            UUIDs of runs to select
+        metadata : dict, optional
+            required metadata values; a list of values selects runs matching
+            any of them
+        with_metadata : bool
+            whether to add the metadata of the runs as categorical columns,
+            see `metadata.attach`
+        where
+            required values of columns in `schema.SCHEMA`, e.g.
+            `num_nodes=[1, 2, 4]`; a list of values matches any of them
+
+        Returns
+        -------
+        df : pandas.DataFrame
+
+        Raises
+        ------
+        ValueError
+        """
+        clauses = []
+        params = []
+
+        def condition(column, value):
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                params.extend(value)
+                return f'{column} IN ({", ".join("?" for _ in value)})'
+            params.append(value)
+            return f'{column} = ?'
+
+        if uuids is not None:
+            clauses.append(condition('uuid', uuids))
+        for key, value in (metadata or {}).items():
+            if not isinstance(value, (list, tuple, set)):
+                value = [value]
+            params.append(str(key))
+            clauses.append(
+                'uuid IN (SELECT uuid FROM metadata WHERE key = ? AND ' +
+                condition('value', [str(v) for v in value]) + ')')
+        for column, value in where.items():
+            if column not in schema.SCHEMA:
+                raise ValueError(f'Unknown column {column!r}.')
+            clauses.append(condition(f'"{column}"', value))
+
+        sql = 'SELECT * FROM measurements'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        # keep NULL-only columns numeric
+        df = df.astype({c.name: 'float64' for c in schema.COLUMNS
+                        if c.name in df and df[c.name].dtype == object})
+        if with_metadata:
+            runs = self.runs().set_index('uuid')
+            df = metadata_.attach(df, runs.drop(columns=['path', 'ingested']))
+        return df
@@ -0,0 +1,232 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Hierarchy of timers
+
+The timers of beNNch nest into each other: the Python-level construction
+timers contain the corresponding NEST timers, state propagation consists of
+the update phase and the gathering of spike data, which in turn comprises
+collocation, communication and delivery, and so forth. A measured timer
+with children in the hierarchy gets an additional child
+`<timer>_unaccounted` holding the time not covered by its children. Nodes
+which are not measured are the sums of their children. Timers missing from
+the data are left out of the hierarchy.
+"""
+import numpy as np
+import pandas as pd
+
+RESIDUAL_SUFFIX = '_unaccounted'
+
+
+class Timer():
+    """
+    Node of the timer hierarchy.
+
+    Attributes
+    ----------
+    name : str
+        name of the quantity holding the node's time
+    children : list of Timer
+        timers contained in this one
+    measured : bool
+        whether the time is measured, otherwise it is the sum of the
+        children
+    """
+
+    def __init__(self, name, children=(), measured=True):
+        self.name = name
+        self.children = list(children)
+        self.measured = measured
+
+    def __repr__(self):
+        return f'Timer({self.name!r}, {len(self.children)} children)'
+
+
+# Hierarchy of the timers of `schema` as measured by the beNNch workflow for
+# NEST 3, where the connection infrastructure is prepared at the end of the
+# connection phase.
+TREE = Timer('wall_time_total', measured=False, children=[
+    Timer('time_construction', measured=False, children=[
+        Timer('py_time_create', [Timer('time_construction_create')]),
+        Timer('py_time_connect', [
+            Timer('time_construction_connect'),
+            Timer('time_communicate_prepare', [
+                Timer('time_gather_target_data'),
+                Timer('time_communicate_target_data'),
+            ]),
+        ]),
+    ]),
+    Timer('time_simulate', [
+        Timer('time_update_spike_data'),
+        Timer('time_gather_spike_data', [
+            Timer('time_collocate_spike_data'),
+            Timer('time_communicate_spike_data'),
+            Timer('time_deliver_spike_data'),
+        ]),
+    ]),
+])
+
+
+def breakdown(lookup, tree=TREE):
+    """
+    Times of all nodes of the hierarchy, including residuals.
+
+    Attributes
+    ----------
+    lookup : callable
+        function returning the values of a quantity as array, raising
+        KeyError if it is not available
+    tree : Timer
+        root of the hierarchy
+
+    Returns
+    -------
+    structure : pandas.DataFrame
+        nodes in depth-first order with columns `name`, `parent`, `depth`
+        and `kind` ('measured', 'sum' or 'residual')
+    values : pandas.DataFrame
+        times of the nodes, one column per node
+
+    Raises
+    ------
+    ValueError
+    """
+    nodes = []
+    values = {}
+
+    def lookup_values(name):
+        try:
+            v = np.asarray(lookup(name), dtype=float)
+        except KeyError:
+            return None
+        return v if np.isfinite(v).any() else None
+
+    def visit(node, parent, depth):
+        # placeholder, such that parents precede their children
+        nodes.append(None)
+        index = len(nodes) - 1
+        children = [c for c in node.children
+                    if visit(c, node.name, depth + 1)]
+        own = lookup_values(node.name) if node.measured else None
+        if own is None and not children:
+            nodes.pop()
+            return False
+        if own is None:
+            values[node.name] = sum(values[c.name] for c in children)
+            nodes[index] = (node.name, parent, depth, 'sum')
+            return True
+        values[node.name] = own
+        nodes[index] = (node.name, parent, depth, 'measured')
+        if children:
+            residual = node.name + RESIDUAL_SUFFIX
+            values[residual] = own - sum(values[c.name] for c in children)
+            nodes.append((residual, node.name, depth + 1, 'residual'))
+        return True
+
+    if not visit(tree, None, 0):
+        raise ValueError('None of the timers of the hierarchy is available.')
+    structure = pd.DataFrame(nodes, columns=['name', 'parent', 'depth',
+                                             'kind'])
+    return structure, pd.DataFrame(values)[list(structure['name'])]
+
+
+def subtree(structure, root):
+    """
+    Nodes of the subtree below and including a node.
+
+    Attributes
+    ----------
+    structure : pandas.DataFrame
+        nodes as returned by `breakdown`
+    root : str
+        name of the root of the subtree
+
+    Returns
+    -------
+    structure : pandas.DataFrame
+
+    Raises
+    ------
+    ValueError
+    """
+    if root not in set(structure['name']):
+        raise ValueError(f'{root!r} is not a timer of the hierarchy.')
+    names = {root}
+    # parents precede their children
+    for name, parent in zip(structure['name'], structure['parent']):
+        if parent in names:
+            names.add(name)
+    return structure[structure['name'].isin(names)]
+
+
+def leaves(structure):
+    """
+    Names of the nodes without children.
+    """
+    parents = set(structure['parent'])
+    return [n for n in structure['name'] if n not in parents]
+
+
+def dominant(structure, values, root=None):
+    """
+    Leaf timer taking the longest time per configuration.
+
+    Attributes
+    ----------
+    structure, values : pandas.DataFrame
+        hierarchy as returned by `breakdown`
+    root : str, optional
+        node whose subtree is considered, the root of the hierarchy if not
+        given
+
+    Returns
+    -------
+    table : pandas.DataFrame
+        per configuration, the dominant timer (`phase`), its time, its
+        fraction of the time of root and the path from root to it
+
+    Raises
+    ------
+    ValueError
+    """
+    if root is None:
+        root = structure['name'].iloc[0]
+    nodes = subtree(structure, root)
+    names = leaves(nodes)
+    times = values[names].to_numpy()
+    valid = np.isfinite(times).any(axis=1)
+    index = np.argmax(np.where(np.isfinite(times), times, -np.inf), axis=1)
+    time = np.where(valid, times[np.arange(len(times)), index], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = time / values[root].to_numpy()
+
+    parent = dict(zip(nodes['name'], nodes['parent']))
+
+    def path(name):
+        names = [name]
+        while names[-1] != root:
+            names.append(parent[names[-1]])
+        return ' / '.join(reversed(names))
+
+    phase = np.where(valid, np.asarray(names, dtype=object)[index], None)
+    return pd.DataFrame({
+        'phase': phase,
+        'time': time,
+        'fraction': fraction,
+        'path': [path(p) if p is not None else None for p in phase],
+    })
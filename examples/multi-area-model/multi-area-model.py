@@ -55,8 +55,8 @@ ax3 = fig.add_subplot(spec[1, 1])
 
 # Add plots
 B.plot_fractions(axis=ax1,
-                 fill_variables=['wall_time_create+wall_time_connect',
-                                 'wall_time_sim'],
+                 fill_variables=['time_construction_create+time_construction_connect',
+                                 'time_simulate'],
                  interpolate=True,
                  step=None,
                  error=True)
@@ -41,4 +41,6 @@ setup(
     packages=["bennchplot"],
     include_package_data=True,
     install_requires=["pandas", "matplotlib", "pyyaml", "tol_colors"],
+    extras_require={"cache": ["pyarrow"], "test": ["pytest"]},
+    entry_points={"console_scripts": ["bennchplot=bennchplot.cli:main"]},
 )
@@ -0,0 +1,63 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+
+"""
+Fixtures shared by the tests
+
+Result files are derived from the microcircuit example, which holds three
+repetitions of five configurations.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'examples', 'microcircuit',
+    '8d196bc5-b5f5-448b-8571-bf695ed64d4a.csv')
+
+UUIDS = ['00000000-0000-0000-0000-000000000001',
+         '00000000-0000-0000-0000-000000000002']
+
+
+@pytest.fixture
+def raw():
+    """
+    Raw benchmark data of the example.
+    """
+    return pd.read_csv(EXAMPLE)
+
+
+@pytest.fixture
+def result_dir(tmp_path, raw):
+    """
+    Directory holding two runs, the second with 50% longer state
+    propagation.
+    """
+    raw.to_csv(tmp_path / f'{UUIDS[0]}.csv', index=False)
+    slower = raw.copy()
+    slower['wall_time_sim'] *= 1.5
+    slower.to_csv(tmp_path / f'{UUIDS[1]}.csv', index=False)
+    return tmp_path
+
+
+def write_sidecar(directory, uuid, text):
+    """
+    Write the metadata sidecar of a run.
+    """
+    with open(os.path.join(directory, f'{uuid}.yaml'), 'w') as f:
+        f.write(text)
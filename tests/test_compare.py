@@ -0,0 +1,78 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+"""
+Tests of the comparison of runs against reference values
+"""
+import numpy as np
+import pytest
+
+import bennchplot as bp
+from bennchplot import compare
+
+# extra sleep of two groups of patients (Student, 1908), `sleep` data set of
+# R; t.test(extra ~ group, data = sleep) reports t = -1.8608,
+# df = 17.776, p-value = 0.07939
+SLEEP_1 = np.array([0.7, -1.6, -0.2, -1.2, -0.1, 3.4, 3.7, 0.8, 0.0, 2.0])
+SLEEP_2 = np.array([1.9, 0.8, 1.1, 0.1, -0.1, 4.4, 5.5, 1.6, 4.6, 3.4])
+
+
+def summary(values):
+    return values.mean(), values.std(ddof=1), float(len(values))
+
+
+def test_welch_reference_values():
+    t, dof, p = compare.welch(*summary(SLEEP_1), *summary(SLEEP_2))
+    assert t == pytest.approx(1.8608, abs=1e-4)
+    assert dof == pytest.approx(17.776, abs=1e-3)
+    assert p == pytest.approx(0.07939, abs=1e-5)
+
+
+def test_welch_needs_two_values():
+    t, dof, p = compare.welch(np.array([1., 1.]), np.array([.1, .1]),
+                              np.array([3., 1.]), np.array([2., 2.]),
+                              np.array([.1, .1]), np.array([3., 3.]))
+    assert np.isfinite(p[0])
+    assert np.isnan([t[1], dof[1], p[1]]).all()
+
+
+def test_benjamini_hochberg_reference_values():
+    p = np.array([0.005, 0.009, 0.019, 0.022, 0.051, 0.101, 0.361, 0.387])
+    q = compare.benjamini_hochberg(p[::-1])[::-1]
+    np.testing.assert_allclose(
+        q, [0.036, 0.036, 0.044, 0.044, 0.0816, 0.134667, 0.387, 0.387],
+        rtol=1e-5)
+
+
+def test_benjamini_hochberg_skips_missing_values():
+    p = np.array([[0.01, np.nan], [0.04, 0.03]])
+    q = compare.benjamini_hochberg(p)
+    assert np.isnan(q[0, 1])
+    np.testing.assert_allclose(q[~np.isnan(p)], [0.03, 0.04, 0.04])
+
+
+def test_compare_flags_regression(result_dir):
+    files = sorted(result_dir.glob('*.csv'))
+    base, slower = (bp.Plot(x_axis='num_nvp', data_file=str(f))
+                    for f in files)
+    result = compare.compare([base, slower], ['time_simulate'],
+                             labels=['base', 'slower'])
+    np.testing.assert_allclose(result['change'], 0.5, rtol=1e-5)
+    # the state propagation of the largest configurations is too noisy for
+    # three repetitions
+    assert result['regression'].iloc[:3].all()
+    assert (result['regression'] == result['significant']).all()
+    assert not result['improvement'].any()
@@ -0,0 +1,83 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+"""
+Tests of reading result files in full, in chunks and incrementally
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import bennchplot as bp
+from bennchplot import loader
+
+from conftest import UUIDS
+
+
+def assert_same_aggregates(a, b):
+    # running aggregates differ from pandas' in rounding only
+    columns = [c for c in a.columns if c in b.columns]
+    pd.testing.assert_frame_equal(a[columns], b[columns], check_dtype=False,
+                                  check_categorical=False, rtol=1e-5)
+
+
+@pytest.mark.parametrize('chunksize', [1, 4, 100])
+def test_chunked_load_equals_full_load(result_dir, chunksize):
+    full = bp.Plot(x_axis='num_nvp', data_file=str(result_dir))
+    chunked = bp.Plot(x_axis='num_nvp', data_file=str(result_dir),
+                      chunksize=chunksize)
+    assert list(chunked.df.columns) == list(full.df.columns)
+    assert_same_aggregates(full.df, chunked.df)
+    assert full.df['num_repetitions'].tolist() == [6] * 5
+
+
+def test_resolve_data_files(result_dir):
+    files = loader.resolve_data_files(str(result_dir))
+    assert [loader.run_uuid(f) for f in files] == UUIDS
+    assert loader.resolve_data_files(str(result_dir / '*.csv')) == files
+    with pytest.raises(FileNotFoundError):
+        loader.resolve_data_files(str(result_dir / 'missing'))
+
+
+def test_incremental_update_equals_full_load(tmp_path, raw):
+    path = tmp_path / f'{UUIDS[0]}.csv'
+    raw.iloc[:6].to_csv(path, index=False)
+    B = bp.Plot(x_axis='num_nvp', data_file=str(path), incremental=True)
+    assert B.df['num_repetitions'].sum() == 6
+
+    # a partially written row is picked up by the next update
+    text = raw.iloc[6:].to_csv(index=False, header=False)
+    with open(path, 'a') as f:
+        f.write(text[:-10])
+    assert B.update(str(path))
+    assert B.df['num_repetitions'].sum() == 14
+    with open(path, 'a') as f:
+        f.write(text[-10:])
+    assert B.update(str(path))
+    assert not B.update(str(path))
+
+    full = bp.Plot(x_axis='num_nvp', data_file=str(path))
+    assert_same_aggregates(full.df, B.df)
+
+
+def test_truncated_file_raises(tmp_path, raw):
+    path = tmp_path / f'{UUIDS[0]}.csv'
+    raw.to_csv(path, index=False)
+    B = bp.Plot(x_axis='num_nvp', data_file=str(path), incremental=True)
+    raw.iloc[:3].to_csv(path, index=False)
+    with pytest.raises(ValueError, match='truncated'):
+        B.update(str(path))
+    assert np.isfinite(B.df['time_simulate']).all()
@@ -0,0 +1,71 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+"""
+Tests of metadata sidecars, selection and grouping by metadata
+"""
+import numpy as np
+import pytest
+
+import bennchplot as bp
+from bennchplot import metadata
+
+from conftest import UUIDS, write_sidecar
+
+
+def test_flattened_sidecar(result_dir):
+    write_sidecar(result_dir, UUIDS[0],
+                  'machine: A\nsoftware:\n  nest:\n    version: 3.0\n')
+    meta = metadata.read_metadata(sorted(result_dir.glob('*.csv')))
+    assert meta.index.tolist() == [UUIDS[0]]
+    assert meta.loc[UUIDS[0], 'software.nest.version'] == '3.0'
+
+
+def test_group_by_splits_configurations(result_dir):
+    write_sidecar(result_dir, UUIDS[0], 'machine: A\n')
+    write_sidecar(result_dir, UUIDS[1], 'machine: B\n')
+    B = bp.Plot(x_axis='num_nvp', data_file=str(result_dir),
+                group_by=['machine'])
+    assert B.df['machine'].tolist() == ['A', 'B'] * 5
+    assert B.df['num_repetitions'].tolist() == [3] * 10
+    B.compute_confidence_intervals(['time_simulate'])
+    assert (B.df['time_simulate_ci_high'] >
+            B.df['time_simulate_ci_low']).all()
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'aggregation_params': {'method': 'median'}},
+    {'aggregation_params': {'method': 'iqr'}},
+    {'chunksize': 4},
+])
+def test_group_by_with_partial_metadata_raises(result_dir, params):
+    write_sidecar(result_dir, UUIDS[0], 'machine: A\n')
+    with pytest.raises(ValueError, match=UUIDS[1]):
+        bp.Plot(x_axis='num_nvp', data_file=str(result_dir),
+                group_by=['machine'], **params)
+
+
+def test_select_runs_by_metadata(result_dir):
+    write_sidecar(result_dir, UUIDS[0], 'machine: A\n')
+    write_sidecar(result_dir, UUIDS[1], 'machine: B\n')
+    B = bp.Plot(x_axis='num_nvp', data_file=str(result_dir),
+                metadata={'machine': 'B'})
+    assert B.raw_df['uuid'].astype(str).unique().tolist() == [UUIDS[1]]
+    A = bp.Plot(x_axis='num_nvp',
+                data_file=str(result_dir / f'{UUIDS[0]}.csv'))
+    np.testing.assert_allclose(B.df['time_simulate'],
+                               1.5 * A.df['time_simulate'], rtol=1e-6)
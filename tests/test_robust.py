@@ -0,0 +1,89 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+"""
+Tests of the robust aggregation of repetitions
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import bennchplot as bp
+from bennchplot import robust
+
+
+def aggregate(raw, **params):
+    return bp.Plot(x_axis='num_nvp', df=raw, aggregation_params=params)
+
+
+@pytest.mark.parametrize('method', ['median', 'trimmed', 'iqr'])
+def test_missing_values_are_not_counted(raw, method):
+    raw.loc[[0, 1], 'wall_time_sim'] = np.nan
+    B = aggregate(raw, method=method, trim=0.)
+    assert B.df['num_repetitions'].tolist() == [3] * 5
+    assert B.df['time_simulate_count'].tolist() == [1, 3, 3, 3, 3]
+    assert B.df['time_construction_create_count'].tolist() == [3] * 5
+    assert B.df.loc[0, 'time_simulate'] == pytest.approx(
+        raw.loc[2, 'wall_time_sim'], rel=1e-6)
+    assert np.isfinite(B.df['time_simulate']).all()
+
+
+def test_median_and_mad(raw):
+    B = aggregate(raw, method='median')
+    values = raw['wall_time_sim'].to_numpy().reshape(5, 3)
+    median = np.median(values, axis=1)
+    mad = robust.MAD_SCALE * np.median(np.abs(values - median[:, None]),
+                                       axis=1)
+    np.testing.assert_allclose(B.df['time_simulate'], median, rtol=1e-6)
+    # timers are stored as float32
+    np.testing.assert_allclose(B.df['time_simulate_std'], mad, rtol=1e-4)
+
+
+def test_iqr_rejects_whole_repetitions(raw):
+    # six repetitions of the first configuration, one of them an outlier
+    first = raw.iloc[[0, 1, 2] * 2].copy()
+    first['rng_seed'] = range(6)
+    first.iloc[5, first.columns.get_loc('wall_time_sim')] *= 10.
+    B = aggregate(pd.concat([first, raw.iloc[3:]], ignore_index=True),
+                  method='iqr', reject_on=['time_simulate'])
+    assert B.df['num_repetitions'].tolist() == [5, 3, 3, 3, 3]
+    rejected = B.rejected
+    assert rejected['row'].unique().tolist() == [5]
+    # all measured values of the repetition are listed
+    assert len(rejected) == rejected['quantity'].nunique() > 1
+    assert len(B.raw_df) == 17
+    assert B.df.loc[0, 'time_simulate'] == pytest.approx(
+        raw['wall_time_sim'].iloc[[0, 1, 2, 0, 1]].mean(), rel=1e-6)
+
+
+def test_trimmed_mean(raw):
+    B = aggregate(raw, method='trimmed', trim=0.34)
+    np.testing.assert_allclose(
+        B.df['time_simulate'],
+        np.median(raw['wall_time_sim'].to_numpy().reshape(5, 3), axis=1),
+        rtol=1e-6)
+    assert B.df['num_repetitions'].tolist() == [1] * 5
+    assert len(B.rejected) == 2 * 5 * B.rejected['quantity'].nunique()
+
+
+def test_group_rows_rejects_missing_keys():
+    df = pd.DataFrame({'key': [1., np.nan, 2.], 'x': [1., 2., 3.]})
+    with pytest.raises(ValueError, match='key'):
+        robust.group_rows(df, ['x'], ['key'])
+    configurations, values, rows = robust.group_rows(df.dropna(), ['x'],
+                                                     ['key'])
+    assert configurations['key'].tolist() == [1., 2.]
+    assert rows.tolist() == [[0], [1]]
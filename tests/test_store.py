@@ -0,0 +1,72 @@
+"""
+beNNch-plot - standardized plotting routines for performance benchmarks.
+Copyright (C) 2021 Forschungszentrum Juelich GmbH, INM-6
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+"""
+"""
+Tests of the SQLite result store
+"""
+import pandas as pd
+import pytest
+
+import bennchplot as bp
+
+from conftest import UUIDS, write_sidecar
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = bp.ResultStore(str(tmp_path / 'results.db'))
+    yield store
+    store.close()
+
+
+def test_round_trip(store, result_dir):
+    assert store.ingest(str(result_dir), metadata={'model': 'mc'}) == UUIDS
+    for uuid in UUIDS:
+        B = bp.Plot.from_store(store, 'num_nvp', uuids=[uuid])
+        A = bp.Plot(x_axis='num_nvp',
+                    data_file=str(result_dir / f'{uuid}.csv'))
+        columns = [c for c in A.df.columns if c != 'uuid']
+        pd.testing.assert_frame_equal(B.df[columns], A.df[columns])
+    assert len(store.query(num_nodes=1, threads_per_task=[4, 8])) == 12
+    assert store.runs()['model'].tolist() == ['mc', 'mc']
+
+
+def test_unchanged_runs_are_skipped(store, result_dir):
+    store.ingest(str(result_dir))
+    assert store.ingest(str(result_dir)) == []
+    assert len(store.query()) == 30
+
+
+def test_changed_sidecar_replaces_metadata(store, result_dir):
+    write_sidecar(result_dir, UUIDS[0], 'machine: A\nold: 1\n')
+    store.ingest(str(result_dir))
+    write_sidecar(result_dir, UUIDS[0], 'machine: B\n')
+    assert store.ingest(str(result_dir)) == [UUIDS[0]]
+    runs = store.runs().set_index('uuid')
+    assert runs.loc[UUIDS[0], 'machine'] == 'B'
+    assert 'old' not in runs or runs['old'].isna().all()
+    assert len(store.query()) == 30
+
+
+def test_select_by_metadata(store, result_dir):
+    write_sidecar(result_dir, UUIDS[0], 'machine: A\n')
+    write_sidecar(result_dir, UUIDS[1], 'machine: B\n')
+    store.ingest(str(result_dir))
+    B = bp.Plot.from_store(store, 'num_nvp', metadata={'machine': 'B'},
+                           group_by=['machine'])
+    assert B.df['machine'].astype(str).tolist() == ['B'] * 5
+    with pytest.raises(ValueError, match='machine'):
+        bp.Plot.from_store(store, 'num_nvp', metadata={'machine': 'C'})